@@ -0,0 +1,351 @@
+"""
+Request/stage latency instrumentation.
+
+- Counter / Gauge / Histogram: minimal, thread-safe Prometheus metric types
+  rendered in the text exposition format by render() (served on /metrics).
+- MetricsMiddleware: per-request context, request counters/histograms and a
+  Server-Timing response header listing the stages that ran.
+- stage(name): context manager that times one pipeline stage (scrape, llm, tts, ...)
+  into the stage histogram and the current request's Server-Timing entries.
+- set_label(key, value): attach request-level labels (platform, upstream_status).
+- record_upstream(upstream, status): count upstream responses by status.
+"""
+
+from __future__ import annotations
+
+import bisect
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+__all__ = [
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "MetricsMiddleware",
+    "stage",
+    "set_label",
+    "record_upstream",
+    "render",
+    "CONTENT_TYPE",
+]
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    20.0,
+    30.0,
+    60.0,
+)
+
+_registry: List["_Metric"] = []
+_registry_lock = threading.Lock()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt_float(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        with _registry_lock:
+            _registry.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_fmt_labels(self.labelnames, k)} {_fmt_float(v)}"
+            for k, v in items
+        ]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_fmt_labels(self.labelnames, k)} {_fmt_float(v)}"
+            for k, v in items
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = _DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> (bucket counts, sum, count)
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], float, int]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total, count = self._values.get(key) or (
+                [0] * len(self.buckets),
+                0.0,
+                0,
+            )
+            if idx < len(counts):
+                counts[idx] += 1
+            self._values[key] = (counts, total + value, count + 1)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(
+                (k, (list(c), s, n)) for k, (c, s, n) in self._values.items()
+            )
+        lines = []
+        inf = 'le="+Inf"'
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, c in zip(self.buckets, counts):
+                cumulative += c
+                le = 'le="' + _fmt_float(bound) + '"'
+                lines.append(
+                    f"{self.name}_bucket{_fmt_labels(self.labelnames, key, le)} {cumulative}"
+                )
+            lines.append(
+                f"{self.name}_bucket{_fmt_labels(self.labelnames, key, inf)} {count}"
+            )
+            lines.append(
+                f"{self.name}_sum{_fmt_labels(self.labelnames, key)} {_fmt_float(total)}"
+            )
+            lines.append(
+                f"{self.name}_count{_fmt_labels(self.labelnames, key)} {count}"
+            )
+        return lines
+
+
+def render() -> str:
+    """
+    All registered metrics in the Prometheus text exposition format.
+    """
+    with _registry_lock:
+        metrics = list(_registry)
+    out: List[str] = []
+    for m in metrics:
+        out.append(f"# HELP {m.name} {m.documentation}")
+        out.append(f"# TYPE {m.name} {m.kind}")
+        out.extend(m.render())
+    return "\n".join(out) + "\n"
+
+
+REQUESTS = Counter(
+    "freelancer_toolkit_http_requests_total",
+    "HTTP requests by endpoint, platform, status and upstream status",
+    ("endpoint", "method", "status", "platform", "upstream_status"),
+)
+REQUEST_DURATION = Histogram(
+    "freelancer_toolkit_http_request_duration_seconds",
+    "Time until the response headers were sent",
+    ("endpoint", "method", "status", "platform", "upstream_status"),
+)
+STAGE_DURATION = Histogram(
+    "freelancer_toolkit_stage_duration_seconds",
+    "Pipeline stage latency (scrape, prompt_build, llm, parse, tts, file_write, ...)",
+    ("endpoint", "stage", "platform"),
+)
+UPSTREAM_RESPONSES = Counter(
+    "freelancer_toolkit_upstream_responses_total",
+    "Upstream responses by service and status (network errors are status=error)",
+    ("upstream", "status"),
+)
+
+
+class _RequestContext:
+    __slots__ = ("scope", "timings", "labels")
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.timings: List[Tuple[str, float]] = []
+        self.labels: Dict[str, str] = {}
+
+    @property
+    def endpoint(self) -> str:
+        route = self.scope.get("route")
+        path = getattr(route, "path", None)
+        return path or "unmatched"
+
+
+_current: ContextVar[Optional[_RequestContext]] = ContextVar(
+    "freelancer_toolkit_request", default=None
+)
+
+_TOKEN_RE = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def set_label(key: str, value: Optional[str]) -> None:
+    """
+    Attach a request-level label (e.g. platform, upstream_status) to the current request.
+    """
+    ctx = _current.get()
+    if ctx is not None and value:
+        ctx.labels[key] = str(value)
+
+
+def record_upstream(upstream: str, status) -> None:
+    """
+    Count one upstream response and remember it as the request's upstream status.
+    """
+    UPSTREAM_RESPONSES.inc(upstream=upstream, status=str(status))
+    set_label("upstream_status", f"{upstream}:{status}")
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Time a pipeline stage. Works outside requests too (endpoint label "none").
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        ctx = _current.get()
+        if ctx is not None:
+            ctx.timings.append((name, elapsed))
+            STAGE_DURATION.observe(
+                elapsed,
+                endpoint=ctx.endpoint,
+                stage=name,
+                platform=ctx.labels.get("platform", ""),
+            )
+        else:
+            STAGE_DURATION.observe(elapsed, endpoint="none", stage=name, platform="")
+
+
+def _server_timing(timings: List[Tuple[str, float]], total: float) -> str:
+    entries = []
+    for name, seconds in timings:
+        entries.append(f"{_TOKEN_RE.sub('_', name)};dur={seconds * 1000:.1f}")
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (keeps the request context in the handler's task, and
+    does not buffer streaming responses).
+    """
+
+    def __init__(self, app, skip_paths: Sequence[str] = ("/metrics",)):
+        self.app = app
+        self.skip_paths = tuple(skip_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("path") in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+        ctx = _RequestContext(scope)
+        token = _current.set(ctx)
+        started = time.perf_counter()
+        status_holder = {"status": 500}
+
+        def observe(status: int) -> float:
+            elapsed = time.perf_counter() - started
+            labels = dict(
+                endpoint=ctx.endpoint,
+                method=scope.get("method", ""),
+                status=str(status),
+                platform=ctx.labels.get("platform", ""),
+                upstream_status=ctx.labels.get("upstream_status", ""),
+            )
+            REQUESTS.inc(**labels)
+            REQUEST_DURATION.observe(elapsed, **labels)
+            return elapsed
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder["status"] = message["status"]
+                elapsed = observe(message["status"])
+                headers = list(message.get("headers", []))
+                headers.append(
+                    (
+                        b"server-timing",
+                        _server_timing(ctx.timings, elapsed).encode("latin-1"),
+                    )
+                )
+                message = {**message, "headers": headers}
+                status_holder["sent"] = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            if not status_holder.get("sent"):
+                observe(500)
+            raise
+        finally:
+            _current.reset(token)
@@ -1,3 +1,92 @@
 # Shared utility functions
+import asyncio
+import ipaddress
+import json
+import os
+import socket
+from typing import List
+from urllib.parse import urlparse
 
 #is debug mode?
+
+# Allow job callbacks to localhost/private addresses (off by default: the server would call into its own network)
+JOBS_CALLBACK_ALLOW_PRIVATE = os.getenv(
+    "JOBS_CALLBACK_ALLOW_PRIVATE", "false"
+).lower() in ("1", "true", "yes", "on")
+
+# Response headers for streamed responses (SSE, NDJSON); X-Accel-Buffering stops nginx from buffering the stream
+STREAMING_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def sse_event(event: str, data) -> str:
+    """
+    Format one Server-Sent Events frame with a JSON payload.
+    """
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def wants_fresh(cache_control: str | None) -> bool:
+    """
+    True when the client asked to skip caches (Cache-Control: no-cache / no-store).
+    """
+    if not cache_control:
+        return False
+    directives = {d.strip().lower() for d in cache_control.split(",")}
+    return bool(directives & {"no-cache", "no-store"})
+
+
+def _is_internal(addr: ipaddress.IPv4Address | ipaddress.IPv6Address) -> bool:
+    return (
+        addr.is_private
+        or addr.is_loopback
+        or addr.is_link_local
+        or addr.is_reserved
+        or addr.is_unspecified
+    )
+
+
+def check_callback_url(url: str) -> str:
+    """
+    Validate a callback URL; raises ValueError. Literal private, loopback and
+    link-local addresses (and localhost) are refused unless JOBS_CALLBACK_ALLOW_PRIVATE.
+    Host names are only resolved at send time, see check_callback_host().
+    """
+    parts = urlparse(url.strip())
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError("callback_url must be an absolute http(s) URL")
+    if JOBS_CALLBACK_ALLOW_PRIVATE:
+        return url.strip()
+    host = parts.hostname.lower()
+    if host == "localhost" or host.endswith(".localhost"):
+        raise ValueError("callback_url must not point to localhost")
+    try:
+        addr = ipaddress.ip_address(host)
+    except ValueError:
+        return url.strip()
+    if _is_internal(addr):
+        raise ValueError("callback_url must not point to a private address")
+    return url.strip()
+
+
+async def _resolve(host: str) -> List[str]:
+    infos = await asyncio.get_running_loop().getaddrinfo(
+        host, None, type=socket.SOCK_STREAM
+    )
+    return [str(info[4][0]) for info in infos]
+
+
+async def check_callback_host(url: str) -> None:
+    """
+    Resolve the callback host right before a delivery and raise ValueError when
+    any address is internal, so a public name pointing into the private network
+    is refused. The HTTP client resolves again when connecting: a DNS answer
+    that changes between the two lookups is not caught. Resolver failures
+    propagate as OSError.
+    """
+    if JOBS_CALLBACK_ALLOW_PRIVATE:
+        return
+    host = urlparse(url).hostname or ""
+    for address in await _resolve(host):
+        # IPv6 link-local answers carry a %scope suffix
+        if _is_internal(ipaddress.ip_address(address.split("%", 1)[0])):
+            raise ValueError(f"callback host {host} resolves to a private address")
@@ -1,9 +1,37 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 import os
-from app.routers import proposal, voice, contract, voice_mood
+from app.core import metrics
+from app.core.metrics import MetricsMiddleware
+from app.routers import admin, jobs as jobs_router, proposal, voice, contract, voice_mood
+from app.services import audio_storage, elevenlabs, ingest, jobs, perplexity, scraper, singleflight
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Process-wide resources: create shared upstream clients, the browser pool, the
+    async job runner, the audio storage sweeper and (when enabled) the ingestion
+    crawler on startup; drain and close them on shutdown.
+    """
+    await perplexity.startup()
+    await elevenlabs.startup()
+    await scraper.startup()
+    await jobs.startup()
+    await ingest.startup()
+    await audio_storage.startup(elevenlabs.AUDIO_DIR)
+    try:
+        yield
+    finally:
+        await audio_storage.shutdown()
+        await ingest.shutdown()
+        await jobs.shutdown()
+        await scraper.shutdown()
+        await elevenlabs.shutdown()
+        await perplexity.shutdown()
+
 
 app = FastAPI(
     title="Freelancer Toolkit API",
@@ -25,8 +53,11 @@ app = FastAPI(
         {"name": "proposal", "description": "Smart proposal generation"},
         {"name": "voice", "description": "Voice response generation and mood-aware replies"},
         {"name": "contract", "description": "AI contract generation and risk analysis"},
+        {"name": "jobs", "description": "Status of async jobs (202 Accepted endpoints)"},
         {"name": "system", "description": "System and health endpoints"},
+        {"name": "admin", "description": "Operational endpoints (require ADMIN_TOKEN; disabled without it)"},
     ],
+    lifespan=lifespan,
 )
 
 # CORS (env-driven)
@@ -60,15 +91,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Audio-Url", "X-Audio-Cache"],
 )
 
+# Per-request/stage latency: Server-Timing headers and Prometheus metrics on /metrics
+app.add_middleware(MetricsMiddleware)
+
 
 # Static files: serve generated audio under /audio
 _repo_root = Path(__file__).resolve().parents[3]
 _default_audio_dir = _repo_root / "frontend" / "public" / "audio"
 _audio_dir = Path(os.getenv("AUDIO_STORAGE_PATH", str(_default_audio_dir)))
 _audio_dir.mkdir(parents=True, exist_ok=True)
-app.mount("/audio", StaticFiles(directory=str(_audio_dir)), name="audio")
+# Served files count as used for the audio storage sweeper (LRU eviction)
+app.mount("/audio", audio_storage.AudioStaticFiles(directory=str(_audio_dir)), name="audio")
 # Public base URL for generating absolute URLs (used by services)
 app.state.PUBLIC_BASE_URL = os.getenv("PUBLIC_BASE_URL", "").rstrip("/")
 
@@ -78,17 +114,45 @@ app.include_router(proposal.router, prefix="/api/v1/proposal", tags=["proposal"]
 app.include_router(voice.router, prefix="/api/v1/voice", tags=["voice"])
 app.include_router(voice_mood.router, prefix="/api/v1/voice", tags=["voice"])
 app.include_router(contract.router, prefix="/api/v1/contract", tags=["contract"])
+app.include_router(jobs_router.router, prefix="/api/v1/jobs", tags=["jobs"])
+app.include_router(admin.router, prefix="/api/v1/admin", tags=["admin"])
 
 
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the Freelancer Toolkit API"}
 
+
 @app.get("/health", tags=["system"])
 def health_check():
     return {"status": "ok"}
 
 
+@app.get("/metrics", tags=["system"], include_in_schema=False)
+def prometheus_metrics():
+    """
+    Prometheus text exposition of request, stage and upstream metrics.
+    """
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.get("/api/v1/system/stats", tags=["system"])
+def system_stats():
+    """
+    Runtime counters for caches and upstream clients.
+    """
+    return {
+        "llm_cache": perplexity.cache_stats(),
+        "gemini_scheduler": perplexity.scheduler_stats(),
+        "singleflight": singleflight.stats(),
+        "scrape_cache": scraper.cache_stats(),
+        "browser_pool": scraper.pool_stats(),
+        "jobs": jobs.stats(),
+        "tts": elevenlabs.stats(),
+        "audio_storage": audio_storage.stats(),
+    }
+
+
 def custom_openapi():
     """
     Customize OpenAPI schema:
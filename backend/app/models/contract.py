@@ -20,6 +20,10 @@ class ContractRequest(BaseModel):
         max_length=5000,
         description="Client name, company, and any constraints (optional)",
     )
+    llm_risk_analysis: bool = Field(
+        default=False,
+        description="Score risk with an extra LLM call instead of the local rule engine (slower)",
+    )
 
     @model_validator(mode="after")
     def validate_inputs(self):
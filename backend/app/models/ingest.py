@@ -0,0 +1,16 @@
+from pydantic import BaseModel, Field
+
+
+class IngestEnqueueRequest(BaseModel):
+    urls: list[str] = Field(
+        ...,
+        min_length=1,
+        max_length=1000,
+        description="Job posting URLs to add to the crawl frontier",
+    )
+    priority: int = Field(default=0, description="Higher values are crawled first")
+
+
+class IngestEnqueueResponse(BaseModel):
+    submitted: int = Field(..., description="URLs received")
+    added: int = Field(..., description="URLs that were not already in the frontier")
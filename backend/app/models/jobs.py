@@ -0,0 +1,45 @@
+from datetime import datetime
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+
+class JobAccepted(BaseModel):
+    job_id: str = Field(..., description="Job identifier")
+    status: str = Field(..., description="Initial status (queued)")
+    status_url: str = Field(
+        ..., description="Poll this URL for the result (supports ?wait=<seconds>)"
+    )
+    created_at: datetime = Field(..., description="When the job was accepted")
+
+
+class JobError(BaseModel):
+    status_code: int = Field(
+        ...,
+        description="HTTP-style status the synchronous endpoint would have returned",
+    )
+    detail: str = Field(..., description="Error detail")
+
+
+class JobCallbackState(BaseModel):
+    status: str = Field(..., description="pending | delivered | failed")
+    attempts: int = Field(default=0, description="Delivery attempts so far")
+    last_status: int | None = Field(
+        default=None, description="HTTP status of the last attempt"
+    )
+
+
+class JobStatus(BaseModel):
+    job_id: str = Field(..., description="Job identifier")
+    kind: str = Field(..., description="Job type (e.g. proposal)")
+    status: str = Field(..., description="queued | running | succeeded | failed")
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    result: dict[str, Any] | None = Field(
+        default=None, description="Endpoint response body when succeeded"
+    )
+    error: JobError | None = Field(default=None, description="Error when failed")
+    callback: JobCallbackState | None = Field(
+        default=None, description="Callback delivery, when a callback_url was given"
+    )
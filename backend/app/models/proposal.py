@@ -1,4 +1,6 @@
-from pydantic import BaseModel, Field, model_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from app.core.utils import check_callback_url
 
 
 class ProposalRequest(BaseModel):
@@ -17,6 +19,9 @@ class ProposalRequest(BaseModel):
     target_rate: float | None = Field(
         default=None, description="Desired hourly rate (optional)"
     )
+    force_refresh: bool = Field(
+        default=False, description="Re-scrape job_url even if a cached scrape exists"
+    )
 
     @model_validator(mode="after")
     def validate_inputs(self):
@@ -27,6 +32,17 @@ class ProposalRequest(BaseModel):
         return self
 
 
+class ProposalJobRequest(ProposalRequest):
+    callback_url: str | None = Field(
+        default=None, description="POST the final job status here when the job finishes (optional)"
+    )
+
+    @field_validator("callback_url")
+    @classmethod
+    def validate_callback_url(cls, value: str | None):
+        return check_callback_url(value) if value else None
+
+
 class ProposalResponse(BaseModel):
     # Core AI outputs
     proposal_text: str = Field(
@@ -74,3 +90,27 @@ class ProposalResponse(BaseModel):
     client_location: str | None = Field(
         default=None, description="Client location if available"
     )
+    scrape_tier: str | None = Field(
+        default=None, description="Which scraper tier served job_url: cache, static or browser"
+    )
+
+
+class ProposalBatchRequest(BaseModel):
+    items: list[ProposalRequest] = Field(
+        ..., min_length=1, max_length=100, description="Proposal requests to process"
+    )
+    scrape_concurrency: int | None = Field(
+        default=None, ge=1, le=16, description="Max concurrent scrapes (defaults to server setting)"
+    )
+    llm_concurrency: int | None = Field(
+        default=None, ge=1, le=32, description="Max concurrent LLM calls (defaults to server setting)"
+    )
+
+
+class ProposalBatchItem(BaseModel):
+    # One NDJSON line of the batch response, emitted as soon as the item finishes
+    index: int = Field(..., description="Position of the item in the request")
+    ok: bool = Field(..., description="Whether the item succeeded")
+    result: ProposalResponse | None = Field(default=None, description="Proposal when ok")
+    status_code: int | None = Field(default=None, description="HTTP-style status when not ok")
+    error: str | None = Field(default=None, description="Error detail when not ok")
@@ -1,3 +1,5 @@
+from typing import List
+
 from pydantic import BaseModel, Field, field_validator
 
 
@@ -15,3 +17,24 @@ class VoiceRequest(BaseModel):
 
 class VoiceResponse(BaseModel):
     audio_url: str = Field(..., min_length=5, description="URL to generated audio file")
+
+
+class LongVoiceRequest(VoiceRequest):
+    text_to_speak: str = Field(
+        ...,
+        min_length=3,
+        max_length=50000,
+        description="Text to convert to speech; split into chunks",
+    )
+
+
+class LongVoiceResponse(VoiceResponse):
+    parts: List[str] = Field(
+        default_factory=list, description="Chunk audio files in playback order"
+    )
+    chunks: int = Field(
+        ..., ge=1, description="Number of chunks the text was split into"
+    )
+    cached_chunks: int = Field(
+        0, ge=0, description="Chunks served from the audio cache"
+    )
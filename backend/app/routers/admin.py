@@ -0,0 +1,75 @@
+import hmac
+import os
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+
+from app.models.ingest import IngestEnqueueRequest, IngestEnqueueResponse
+from app.services import ingest, scraper
+
+router = APIRouter()
+
+# Admin endpoints require a matching X-Admin-Token header; without a token
+# configured they are disabled (404)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "").strip()
+
+
+def require_admin(x_admin_token: str | None = Header(default=None)) -> None:
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not hmac.compare_digest(x_admin_token or "", ADMIN_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid admin token."
+        )
+
+
+@router.get("/selectors", dependencies=[Depends(require_admin)])
+def get_selector_stats():
+    """
+    Scraper selector registry: per platform field, the current probe order,
+    per-selector hits/misses/success rate and the average probes per lookup.
+    """
+    return scraper.selector_stats()
+
+
+@router.delete(
+    "/selectors",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(require_admin)],
+)
+def reset_selector_stats(platform: str | None = None):
+    """
+    Forget selector statistics (all platforms, or one), restoring the declared order.
+    """
+    scraper.reset_selector_stats(platform)
+
+
+@router.post(
+    "/ingest/urls",
+    response_model=IngestEnqueueResponse,
+    dependencies=[Depends(require_admin)],
+)
+async def enqueue_ingest_urls(request: IngestEnqueueRequest):
+    """
+    Add job URLs to the ingestion frontier (deduplicated by canonical URL, fetched as given).
+    They are crawled when the crawler runs (INGEST_ENABLED).
+    """
+    added = await ingest.enqueue_urls(request.urls, request.priority)
+    return IngestEnqueueResponse(submitted=len(request.urls), added=added)
+
+
+@router.get("/ingest/stats", dependencies=[Depends(require_admin)])
+async def get_ingest_stats():
+    """
+    Frontier counts by status, per-host queues/cooldowns and throughput of the crawler.
+    """
+    return await ingest.stats()
+
+
+@router.get("/ingest/jobs", dependencies=[Depends(require_admin)])
+async def list_ingested_jobs(
+    limit: int = Query(default=50, ge=1, le=500), platform: str | None = None
+):
+    """
+    Most recently ingested job postings.
+    """
+    return await ingest.recent_jobs(limit, platform)
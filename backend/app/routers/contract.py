@@ -1,10 +1,142 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import StreamingResponse
+import json
+from app.core.metrics import stage
+from app.core.utils import wants_fresh, sse_event, STREAMING_HEADERS
 from app.models.contract import ContractRequest, ContractResponse
-from app.services.perplexity import get_text_completion
+from app.services.risk import analyze_contract_risk, risk_level_for
+from app.services.perplexity import AI_RATE_LIMITED, AIServiceError, get_text_completion, stream_text_completion
 
 router = APIRouter()
 
 
+def _build_contract_prompt(request: ContractRequest) -> str:
+    # Build prompt from available fields to make ai in context
+    prompt_parts = [
+        "You are a helpful legal assistant. Draft a clear, friendly, and professional freelance contract.",
+        "Include: Scope, Deliverables, Timeline, Payment Terms, Revisions, IP Ownership, Confidentiality, Termination, and Signatures.",
+    ]
+
+    if request.project_description and request.project_description.strip():
+        prompt_parts.append(f"Project Description:\n{request.project_description.strip()}")
+    if request.proposal and request.proposal.strip():
+        prompt_parts.append(f"Proposal Context:\n{request.proposal.strip()}")
+    if request.client_details and request.client_details.strip():
+        prompt_parts.append(f"Client Details:\n{request.client_details.strip()}")
+
+    # Ensure we have at least one core input
+    if len(prompt_parts) <= 2:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Either project_description or proposal must be provided.",
+        )
+    return "\n\n".join(prompt_parts)
+
+
+def _clean_contract_text(contract_text: str) -> str:
+    try:
+        # If the model accidentally returned JSON, extract a usable markdown body.
+        if isinstance(contract_text, str) and contract_text.strip().startswith("{"):
+            data = json.loads(contract_text)
+            extracted = data.get("contract_text") or data.get("proposal_text")
+            if isinstance(extracted, str) and extracted.strip():
+                contract_text = extracted.strip()
+    except Exception:
+        # Best-effort fallback; keep original text
+        pass
+    return contract_text
+
+
+def _validate_contract_text(contract_text: str) -> str:
+    """
+    Clean the completion and map rate limiting (503) and empty or error results
+    (502) to HTTP errors. Shared by the plain and streaming routes.
+    """
+    if contract_text == AI_RATE_LIMITED:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="AI service busy: rate limit reached, please retry shortly.",
+        )
+    contract_text = _clean_contract_text(contract_text)
+    if not contract_text or "error" in contract_text.lower():
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="AI service error: Unable to generate contract.",
+        )
+    return contract_text
+
+
+async def _analyze_risk(request: ContractRequest, contract_text: str, bypass_cache: bool = False) -> dict:
+    """
+    Local rule engine by default; the LLM scorer only when the request opts in.
+    Falls back to the local engine when the LLM returns no usable score.
+    """
+    if request.llm_risk_analysis:
+        risk = await _analyze_risk_llm(contract_text, bypass_cache=bypass_cache)
+        if risk["risk_score"] is not None:
+            return risk
+    return analyze_contract_risk(contract_text)
+
+
+async def _analyze_risk_llm(contract_text: str, bypass_cache: bool = False) -> dict:
+    """
+    Score contract risk with a second, strict-JSON completion.
+    Returns risk_score, risk_level, risk_flags and recommendations (best effort).
+    """
+    risk_score = None
+    risk_level = None
+    risk_flags = []
+    recommendations = []
+
+    try:
+        # Instruct model to return strict JSON for risk analysis
+        risk_instruction = (
+            "You are a contracts analyst. Analyze the following freelance contract for risks. "
+            "Return STRICT JSON with keys: "
+            "risk_score (integer 0-100), risk_level (one of: low|medium|high), "
+            "risk_flags (array of short strings), recommendations (array of short strings). "
+            "Do not include any extra text."
+        )
+        risk_prompt = f"{risk_instruction}\n\nContract:\n{contract_text}"
+        risk_raw = await get_text_completion(risk_prompt, markdown=False, bypass_cache=bypass_cache)
+        data = {}
+        try:
+            data = json.loads(risk_raw) if isinstance(risk_raw, str) else {}
+        except Exception:
+            data = {}
+        # Extract fields with normalization
+        rs = data.get("risk_score")
+        try:
+            risk_score = max(0, min(100, int(rs))) if rs is not None else None
+        except Exception:
+            risk_score = None
+        rl = data.get("risk_level")
+        if isinstance(rl, str):
+            rl = rl.lower().strip()
+            if rl in {"low", "medium", "high"}:
+                risk_level = rl
+        rf = data.get("risk_flags") or []
+        if isinstance(rf, list):
+            risk_flags = [str(x).strip() for x in rf if str(x).strip()]
+        recs = data.get("recommendations") or []
+        if isinstance(recs, list):
+            recommendations = [str(x).strip() for x in recs if str(x).strip()]
+    except Exception:
+        # keep defaults if analysis fails
+        pass
+
+    # Derive risk_level from score if missing
+    if risk_level is None and isinstance(risk_score, int):
+        risk_level = risk_level_for(risk_score)
+
+    return {
+        "risk_score": risk_score,
+        "risk_level": risk_level,
+        "risk_flags": risk_flags,
+        "recommendations": recommendations,
+    }
+
+
 @router.post(
     "/generate",
     response_model=ContractResponse,
@@ -52,110 +184,90 @@ router = APIRouter()
         }
     },
 )
-async def generate_contract(request: ContractRequest):
+async def generate_contract(
+    request: ContractRequest,
+    cache_control: str | None = Header(default=None),
+):
     """
     Generate a contract from a project description.
+    Risk is scored locally from the generated Markdown unless `llm_risk_analysis` is set.
+    Send `Cache-Control: no-cache` to bypass the completion cache.
     """
+    bypass_cache = wants_fresh(cache_control)
     try:
-        # Build prompt from available fields to make ai in context
-        prompt_parts = [
-            "You are a helpful legal assistant. Draft a clear, friendly, and professional freelance contract.",
-            "Include: Scope, Deliverables, Timeline, Payment Terms, Revisions, IP Ownership, Confidentiality, Termination, and Signatures.",
-        ]
-
-        if request.project_description and request.project_description.strip():
-            prompt_parts.append(f"Project Description:\n{request.project_description.strip()}")
-        if request.proposal and request.proposal.strip():
-            prompt_parts.append(f"Proposal Context:\n{request.proposal.strip()}")
-        if request.client_details and request.client_details.strip():
-            prompt_parts.append(f"Client Details:\n{request.client_details.strip()}")
-
-        # Ensure we have at least one core input
-        if len(prompt_parts) <= 2:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Either project_description or proposal must be provided.",
-            )
-
-        prompt = "\n\n".join(prompt_parts)
-        contract_text = await get_text_completion(prompt, markdown=True)
-        try:
-            import json
-            # If the model accidentally returned JSON, extract a usable markdown body.
-            if isinstance(contract_text, str) and contract_text.strip().startswith("{"):
-                data = json.loads(contract_text)
-                extracted = data.get("contract_text") or data.get("proposal_text")
-                if isinstance(extracted, str) and extracted.strip():
-                    contract_text = extracted.strip()
-        except Exception:
-            # Best-effort fallback; keep original text
-            pass
-        if not contract_text or "error" in contract_text.lower():
-            raise HTTPException(
-                status_code=status.HTTP_502_BAD_GATEWAY,
-                detail="AI service error: Unable to generate contract.",
-            )
+        with stage("prompt_build"):
+            prompt = _build_contract_prompt(request)
+        with stage("llm"):
+            contract_text = await get_text_completion(prompt, markdown=True, bypass_cache=bypass_cache)
+        contract_text = _validate_contract_text(contract_text)
 
         # Risk analysis phase
-        risk_score = None
-        risk_level = None
-        risk_flags = []
-        recommendations = []
+        with stage("risk"):
+            risk = await _analyze_risk(request, contract_text, bypass_cache=bypass_cache)
 
-        try:
-            # Instruct model to return strict JSON for risk analysis
-            risk_instruction = (
-                "You are a contracts analyst. Analyze the following freelance contract for risks. "
-                "Return STRICT JSON with keys: "
-                "risk_score (integer 0-100), risk_level (one of: low|medium|high), "
-                "risk_flags (array of short strings), recommendations (array of short strings). "
-                "Do not include any extra text."
-            )
-            risk_prompt = f"{risk_instruction}\n\nContract:\n{contract_text}"
-            risk_raw = await get_text_completion(risk_prompt, markdown=False)
-            data = {}
-            try:
-                data = json.loads(risk_raw) if isinstance(risk_raw, str) else {}
-            except Exception:
-                data = {}
-            # Extract fields with normalization
-            rs = data.get("risk_score")
-            try:
-                risk_score = max(0, min(100, int(rs))) if rs is not None else None
-            except Exception:
-                risk_score = None
-            rl = data.get("risk_level")
-            if isinstance(rl, str):
-                rl = rl.lower().strip()
-                if rl in {"low", "medium", "high"}:
-                    risk_level = rl
-            rf = data.get("risk_flags") or []
-            if isinstance(rf, list):
-                risk_flags = [str(x).strip() for x in rf if str(x).strip()]
-            recs = data.get("recommendations") or []
-            if isinstance(recs, list):
-                recommendations = [str(x).strip() for x in recs if str(x).strip()]
-        except Exception:
-            # keep defaults if analysis fails
-            pass
-
-        # Derive risk_level from score if missing
-        if risk_level is None and isinstance(risk_score, int):
-            if risk_score <= 30:
-                risk_level = "low"
-            elif risk_score <= 70:
-                risk_level = "medium"
-            else:
-                risk_level = "high"
-
-        return ContractResponse(
-            contract_text=contract_text,
-            risk_score=risk_score,
-            risk_level=risk_level,
-            risk_flags=risk_flags,
-            recommendations=recommendations,
-        )
+        return ContractResponse(contract_text=contract_text, **risk)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
         )
+
+
+@router.post(
+    "/generate-stream",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": (
+                "Server-Sent Events stream. `delta` events carry Markdown chunks as they are "
+                "generated; a final `done` event carries the full ContractResponse; `error` "
+                "and `rate_limited` (upstream 429, retry shortly) events carry a `detail` message."
+            ),
+            "content": {
+                "text/event-stream": {
+                    "example": (
+                        'event: delta\ndata: {"text": "# Freelance Software Development Agreement\\n"}\n\n'
+                        'event: done\ndata: {"contract_text": "...", "risk_score": 45, "risk_level": "medium", '
+                        '"risk_flags": [], "recommendations": []}\n\n'
+                    )
+                }
+            },
+        }
+    },
+)
+async def generate_contract_stream(
+    request: ContractRequest,
+    cache_control: str | None = Header(default=None),
+):
+    """
+    Streaming variant of /generate: relays contract Markdown as it is produced.
+    """
+    prompt = _build_contract_prompt(request)
+    bypass_cache = wants_fresh(cache_control)
+
+    async def events():
+        parts = []
+        try:
+            async for chunk in stream_text_completion(prompt, markdown=True, bypass_cache=bypass_cache):
+                parts.append(chunk)
+                yield sse_event("delta", {"text": chunk})
+        except AIServiceError as ex:
+            # Same checks as /generate: the error string stands in for the text
+            parts = [str(ex)]
+        try:
+            contract_text = _validate_contract_text("".join(parts))
+        except HTTPException as ex:
+            event = "rate_limited" if ex.status_code == status.HTTP_503_SERVICE_UNAVAILABLE else "error"
+            yield sse_event(event, {"detail": ex.detail})
+            return
+        with stage("risk"):
+            risk = await _analyze_risk(request, contract_text, bypass_cache=bypass_cache)
+        try:
+            result = ContractResponse(contract_text=contract_text, **risk)
+        except Exception as e:
+            yield sse_event("error", {"detail": str(e)})
+            return
+        yield sse_event("done", result.model_dump())
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=STREAMING_HEADERS)
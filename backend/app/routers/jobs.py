@@ -0,0 +1,33 @@
+from fastapi import APIRouter, HTTPException, Query, Response, status
+
+from app.models.jobs import JobStatus
+from app.services import jobs
+
+router = APIRouter()
+
+# Suggested client poll interval while a job is unfinished
+POLL_INTERVAL_SECONDS = 2
+
+
+@router.get("/{job_id}", response_model=JobStatus)
+async def get_job(
+    job_id: str,
+    response: Response,
+    wait: float = Query(
+        default=0,
+        ge=0,
+        description="Long-poll: hold the request up to this many seconds until the job finishes",
+    ),
+):
+    """
+    Status of an async job; the result (or error) once it has finished.
+    Unknown and expired jobs return 404.
+    """
+    job = await jobs.wait(job_id, wait)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Job not found or expired."
+        )
+    if not job.finished:
+        response.headers["Retry-After"] = str(POLL_INTERVAL_SECONDS)
+    return job.to_dict()
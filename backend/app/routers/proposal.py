@@ -1,11 +1,31 @@
 import os
-from fastapi import APIRouter, HTTPException, status
-from app.models.proposal import ProposalRequest, ProposalResponse
-from app.services.perplexity import get_proposal_completion_json
+import asyncio
+import contextlib
+from datetime import datetime, timezone
+from typing import Any, Dict
+from fastapi import APIRouter, Header, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from app.core.metrics import set_label, stage
+from app.core.utils import wants_fresh, STREAMING_HEADERS
+from app.models.jobs import JobAccepted
+from app.models.proposal import (
+    ProposalBatchItem,
+    ProposalBatchRequest,
+    ProposalJobRequest,
+    ProposalRequest,
+    ProposalResponse,
+)
+from app.services import jobs
+from app.services.condense import condense_job_text, estimate_tokens
+from app.services.perplexity import AI_RATE_LIMITED, get_proposal_completion_json
 from app.services.scraper import scrape_job_posting
 
 router = APIRouter()
 
+# Batch defaults (per batch request; items beyond the limits wait for a free slot)
+BATCH_SCRAPE_CONCURRENCY = int(os.getenv("PROPOSAL_BATCH_SCRAPE_CONCURRENCY", "4"))
+BATCH_LLM_CONCURRENCY = int(os.getenv("PROPOSAL_BATCH_LLM_CONCURRENCY", "8"))
+
 
 @router.post(
     "/generate",
@@ -66,13 +86,72 @@ router = APIRouter()
         }
     },
 )
-async def generate_proposal(request: ProposalRequest):
+async def generate_proposal(
+    request: ProposalRequest,
+    cache_control: str | None = Header(default=None),
+):
     """
     Generate a proposal from job URL or description, with skills and rate.
+    Send `Cache-Control: no-cache` to bypass the completion cache.
+    """
+    return await _build_proposal(request, bypass_cache=wants_fresh(cache_control))
+
+
+@router.post(
+    "/jobs",
+    response_model=JobAccepted,
+    status_code=status.HTTP_202_ACCEPTED,
+    responses={503: {"description": "Job queue full; retry later"}},
+)
+async def submit_proposal_job(
+    request: ProposalJobRequest,
+    http_request: Request,
+    response: Response,
+    cache_control: str | None = Header(default=None),
+):
+    """
+    Queue proposal generation (same input as /generate) and return 202 at once.
+    Poll `status_url` (optionally with `?wait=<seconds>`) for the ProposalResponse,
+    or pass `callback_url` to receive the final job status as a POST.
+    """
+    bypass_cache = wants_fresh(cache_control)
+    payload = ProposalRequest(**request.model_dump(exclude={"callback_url"}))
+
+    async def work() -> dict:
+        return (await _build_proposal(payload, bypass_cache=bypass_cache)).model_dump()
+
+    try:
+        job = await jobs.submit("proposal", work, callback_url=request.callback_url)
+    except jobs.JobsUnavailable:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Job queue full, please retry shortly.",
+            headers={"Retry-After": "5"},
+        )
+    path = http_request.app.url_path_for("get_job", job_id=job.id)
+    status_url = f"{os.getenv('PUBLIC_BASE_URL', '').rstrip('/')}{path}"
+    response.headers["Location"] = status_url
+    return JobAccepted(
+        job_id=job.id,
+        status=job.status,
+        status_url=status_url,
+        created_at=datetime.fromtimestamp(job.created_at, tz=timezone.utc),
+    )
+
+
+async def _build_proposal(
+    request: ProposalRequest,
+    bypass_cache: bool = False,
+    scrape_limit: asyncio.Semaphore | None = None,
+    llm_limit: asyncio.Semaphore | None = None,
+) -> ProposalResponse:
+    """
+    Scrape (optional), prompt and parse one proposal. Raises HTTPException on failure.
+    Optional semaphores bound scrape and LLM concurrency for batch callers.
     """
     try:
         # Initialize scraped info container
-        scraped_info = {
+        scraped_info: Dict[str, Any] = {
             "platform": None,
             "title": None,
             "description": None,
@@ -81,12 +160,16 @@ async def generate_proposal(request: ProposalRequest):
             "skills": [],
             "currency": None,
             "location": None,
+            "scrape_tier": None,
         }
 
         job_text = request.job_description
         if request.job_url:
             try:
-                scraped = await scrape_job_posting(request.job_url)
+                async with scrape_limit or contextlib.nullcontext():
+                    with stage("scrape"):
+                        scraped = await scrape_job_posting(request.job_url, force_refresh=request.force_refresh)
+                set_label("platform", scraped.get("platform"))
                 scraped_info.update(
                     {
                         "platform": scraped.get("platform"),
@@ -97,6 +180,7 @@ async def generate_proposal(request: ProposalRequest):
                         "skills": scraped.get("skills") or [],
                         "currency": scraped.get("currency"),
                         "location": scraped.get("location"),
+                        "scrape_tier": scraped.get("scrape_tier"),
                     }
                 )
                 job_text = scraped_info["description"] or job_text
@@ -117,72 +201,89 @@ async def generate_proposal(request: ProposalRequest):
         if not job_text:
             raise HTTPException(status_code=400, detail="No job description found (scrape failed and no description provided).")
 
-        skills_str = ", ".join(request.user_skills) if request.user_skills else ""
-        rate_str = (
-            f"Target hourly rate: {request.target_rate}" if request.target_rate else ""
-        )
-        prompt = (
-            f"Job Description:\n{job_text}\n\n"
-            "Context (from job post):\n"
-            f"- Title: {scraped_info.get('title') or 'N/A'}\n"
-            f"- Platform: {scraped_info.get('platform') or 'N/A'}\n"
-            f"- Budget: {budget_text or 'N/A'} (type: {extracted_budget_type}, currency: {extracted_currency or 'unknown'})\n"
-            f"- Timeline: {scraped_info.get('timeline') or 'N/A'}\n"
-            f"- Skills from post: {', '.join(scraped_info.get('skills') or []) or 'N/A'}\n\n"
-            f"Freelancer Skills: {skills_str or 'N/A'}\n{rate_str}\n"
-            "Generate a winning freelance proposal for this job. Include:\n"
-            "- Proposal text\n- Pricing strategy\n- Timeline estimate\n- 3 tips to improve chances of success."
-        )
-        ai_response = await get_proposal_completion_json(prompt)
+        with stage("prompt_build"):
+            # Generic-fallback pages carry site chrome and duplicates; fit them into the
+            # prompt budget. Descriptions from the user or a platform parser are used as is.
+            if job_text == scraped_info["description"] and scraped_info["platform"] == "generic":
+                condensed_text = condense_job_text(job_text) or job_text
+                if os.getenv("DEBUG", "").lower() == "dev":
+                    print(f"[DEBUG] job text tokens: {estimate_tokens(job_text)} -> {estimate_tokens(condensed_text)}")
+                job_text = condensed_text
+
+            skills_str = ", ".join(request.user_skills) if request.user_skills else ""
+            rate_str = (
+                f"Target hourly rate: {request.target_rate}" if request.target_rate else ""
+            )
+            prompt = (
+                f"Job Description:\n{job_text}\n\n"
+                "Context (from job post):\n"
+                f"- Title: {scraped_info.get('title') or 'N/A'}\n"
+                f"- Platform: {scraped_info.get('platform') or 'N/A'}\n"
+                f"- Budget: {budget_text or 'N/A'} (type: {extracted_budget_type}, currency: {extracted_currency or 'unknown'})\n"
+                f"- Timeline: {scraped_info.get('timeline') or 'N/A'}\n"
+                f"- Skills from post: {', '.join(scraped_info.get('skills') or []) or 'N/A'}\n\n"
+                f"Freelancer Skills: {skills_str or 'N/A'}\n{rate_str}\n"
+                "Generate a winning freelance proposal for this job. Include:\n"
+                "- Proposal text\n- Pricing strategy\n- Timeline estimate\n- 3 tips to improve chances of success."
+            )
+        async with llm_limit or contextlib.nullcontext():
+            with stage("llm"):
+                ai_response = await get_proposal_completion_json(prompt, bypass_cache=bypass_cache)
+        if ai_response == AI_RATE_LIMITED:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="AI service busy: rate limit reached, please retry shortly.",
+            )
         if not ai_response or (isinstance(ai_response, str) and "error" in ai_response.lower()):
             raise HTTPException(
                 status_code=status.HTTP_502_BAD_GATEWAY,
                 detail="AI service error: Unable to generate proposal.",
             )
-        # Prefer JSON parsing
-        proposal_text = ""
-        pricing_strategy = ""
-        estimated_timeline = ""
-        success_tips = []
-        try:
-            import json
-
-            parsed = json.loads(ai_response) if isinstance(ai_response, str) else ai_response
-            if isinstance(parsed, dict):
-                proposal_text = str(parsed.get("proposal_text", "")).strip()
-                pricing_strategy = str(parsed.get("pricing_strategy", "")).strip()
-                estimated_timeline = str(parsed.get("estimated_timeline", "")).strip()
-                tips = parsed.get("success_tips", [])
-                if isinstance(tips, list):
-                    success_tips = [str(t).strip() for t in tips if str(t).strip()]
-        except Exception:
-            pass
-
-        # Heuristic fallback if JSON not provided
-        if not proposal_text and isinstance(ai_response, str):
-            lines = ai_response.splitlines()
-            for line in lines:
-                l = line.lower()
-                if "proposal" in l and not proposal_text:
-                    proposal_text = line.split(":", 1)[-1].strip()
-                elif "pricing" in l:
-                    pricing_strategy = line.split(":", 1)[-1].strip()
-                elif "timeline" in l:
-                    estimated_timeline = line.split(":", 1)[-1].strip()
-                elif "tip" in l:
-                    tip = line.split(":", 1)[-1].strip()
-                    if tip:
-                        success_tips.append(tip)
-        # Fallbacks
-        proposal_text = proposal_text or (ai_response if isinstance(ai_response, str) else "")
-        pricing_strategy = pricing_strategy or "See proposal."
-        estimated_timeline = estimated_timeline or "See proposal."
-        if not success_tips:
-            success_tips = [
-                "Follow up promptly",
-                "Customize your proposal",
-                "Show relevant experience",
-            ]
+        with stage("parse"):
+            # Prefer JSON parsing
+            proposal_text = ""
+            pricing_strategy = ""
+            estimated_timeline = ""
+            success_tips = []
+            try:
+                import json
+
+                parsed = json.loads(ai_response) if isinstance(ai_response, str) else ai_response
+                if isinstance(parsed, dict):
+                    proposal_text = str(parsed.get("proposal_text", "")).strip()
+                    pricing_strategy = str(parsed.get("pricing_strategy", "")).strip()
+                    estimated_timeline = str(parsed.get("estimated_timeline", "")).strip()
+                    tips = parsed.get("success_tips", [])
+                    if isinstance(tips, list):
+                        success_tips = [str(t).strip() for t in tips if str(t).strip()]
+            except Exception:
+                pass
+
+            # Heuristic fallback if JSON not provided
+            if not proposal_text and isinstance(ai_response, str):
+                lines = ai_response.splitlines()
+                for line in lines:
+                    l = line.lower()
+                    if "proposal" in l and not proposal_text:
+                        proposal_text = line.split(":", 1)[-1].strip()
+                    elif "pricing" in l:
+                        pricing_strategy = line.split(":", 1)[-1].strip()
+                    elif "timeline" in l:
+                        estimated_timeline = line.split(":", 1)[-1].strip()
+                    elif "tip" in l:
+                        tip = line.split(":", 1)[-1].strip()
+                        if tip:
+                            success_tips.append(tip)
+            # Fallbacks
+            proposal_text = proposal_text or (ai_response if isinstance(ai_response, str) else "")
+            pricing_strategy = pricing_strategy or "See proposal."
+            estimated_timeline = estimated_timeline or "See proposal."
+            if not success_tips:
+                success_tips = [
+                    "Follow up promptly",
+                    "Customize your proposal",
+                    "Show relevant experience",
+                ]
         return ProposalResponse(
             proposal_text=proposal_text,
             pricing_strategy=pricing_strategy,
@@ -199,6 +300,7 @@ async def generate_proposal(request: ProposalRequest):
             extracted_timeline=scraped_info.get("timeline"),
             extracted_skills=[str(s).strip() for s in (scraped_info.get("skills") or []) if str(s).strip()],
             client_location=scraped_info.get("location"),
+            scrape_tier=scraped_info.get("scrape_tier"),
         )
     except HTTPException:
         # raise explicit HTTP errors (e.g., 400)
@@ -207,3 +309,65 @@ async def generate_proposal(request: ProposalRequest):
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
         )
+
+
+@router.post(
+    "/generate-batch",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": (
+                "NDJSON stream: one ProposalBatchItem per line, in completion order "
+                "(use `index` to match items to the request)."
+            ),
+            "content": {
+                "application/x-ndjson": {
+                    "example": (
+                        '{"index": 1, "ok": true, "result": {"proposal_text": "...", "pricing_strategy": "...", '
+                        '"estimated_timeline": "2 weeks", "success_tips": []}, "status_code": null, "error": null}\n'
+                        '{"index": 0, "ok": false, "result": null, "status_code": 502, '
+                        '"error": "AI service error: Unable to generate proposal."}\n'
+                    )
+                }
+            },
+        }
+    },
+)
+async def generate_proposal_batch(
+    batch: ProposalBatchRequest,
+    cache_control: str | None = Header(default=None),
+):
+    """
+    Generate proposals for many jobs concurrently and stream each result as NDJSON
+    as soon as it finishes. Scrapes and LLM calls are bounded separately.
+    """
+    bypass_cache = wants_fresh(cache_control)
+    scrape_limit = asyncio.Semaphore(batch.scrape_concurrency or BATCH_SCRAPE_CONCURRENCY)
+    llm_limit = asyncio.Semaphore(batch.llm_concurrency or BATCH_LLM_CONCURRENCY)
+
+    async def run_item(index: int, item: ProposalRequest) -> ProposalBatchItem:
+        try:
+            result = await _build_proposal(item, bypass_cache, scrape_limit, llm_limit)
+            return ProposalBatchItem(index=index, ok=True, result=result)
+        except HTTPException as e:
+            return ProposalBatchItem(index=index, ok=False, status_code=e.status_code, error=str(e.detail))
+        except Exception as e:
+            return ProposalBatchItem(index=index, ok=False, status_code=500, error=str(e))
+
+    async def lines():
+        tasks = [asyncio.create_task(run_item(i, item)) for i, item in enumerate(batch.items)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                item = await next_done
+                yield item.model_dump_json() + "\n"
+        finally:
+            # Client went away (or we finished): stop any remaining work
+            for t in tasks:
+                if not t.done():
+                    t.cancel()
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers=STREAMING_HEADERS,
+    )
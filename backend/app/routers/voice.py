@@ -1,6 +1,16 @@
-from fastapi import APIRouter, HTTPException, status
-from app.models.voice import VoiceRequest, VoiceResponse
-from app.services.elevenlabs import text_to_speech
+from typing import Any, Dict, Optional, Union
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import StreamingResponse
+from app.core.utils import wants_fresh, STREAMING_HEADERS
+from app.models.voice import LongVoiceRequest, LongVoiceResponse, VoiceRequest, VoiceResponse
+from app.services.elevenlabs import (
+    SpeechStream,
+    TTSServiceError,
+    open_registered_stream,
+    open_speech_stream,
+    synthesize_long_form,
+    text_to_speech,
+)
 
 router = APIRouter()
 
@@ -14,7 +24,7 @@ router = APIRouter()
             "content": {
                 "application/json": {
                     "example": {
-                        "audio_url": "/audio/output_abc123.mp3"
+                        "audio_url": "/audio/tts_9f86d081884c7d65.mp3"
                     }
                 }
             }
@@ -43,19 +53,101 @@ router = APIRouter()
         }
     },
 )
-def generate_voice(request: VoiceRequest):
+async def generate_voice(request: VoiceRequest, cache_control: Optional[str] = Header(default=None)):
     """
     Generate a voice response from a text.
+
+    Audio for text that was already synthesized with the same voice is reused;
+    send `Cache-Control: no-cache` to synthesize it again.
     """
     try:
-        audio_url = text_to_speech(request.text_to_speak)
+        audio_url = await text_to_speech(request.text_to_speak, bypass_cache=wants_fresh(cache_control))
         if not audio_url or "error" in audio_url.lower():
             raise HTTPException(
                 status_code=status.HTTP_502_BAD_GATEWAY,
                 detail="TTS service error: Unable to generate audio.",
             )
         return VoiceResponse(audio_url=audio_url)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
         )
+
+
+@router.post("/generate-long", response_model=LongVoiceResponse)
+async def generate_voice_long(request: LongVoiceRequest, cache_control: Optional[str] = Header(default=None)):
+    """
+    Generate speech for long text (up to 50,000 characters).
+
+    The text is split on sentence boundaries and the chunks are synthesized in
+    parallel, then stitched into one file; `parts` lists the chunk files in order.
+    Chunks that were already synthesized are reused, so an edit only pays for the
+    chunks it touched.
+    """
+    try:
+        speech = await synthesize_long_form(request.text_to_speak, bypass_cache=wants_fresh(cache_control))
+    except TTSServiceError:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="TTS service error: Unable to generate audio.",
+        )
+    return LongVoiceResponse(
+        audio_url=speech.url, parts=speech.parts, chunks=len(speech.parts), cached_chunks=speech.cached_chunks
+    )
+
+
+_AUDIO_STREAM_RESPONSES: Dict[Union[int, str], Dict[str, Any]] = {
+    200: {
+        "description": (
+            "MP3 audio, relayed chunk by chunk while it is synthesized. X-Audio-Url is the "
+            "cached file (complete once the stream ends); X-Audio-Cache is hit or miss."
+        ),
+        "content": {"audio/mpeg": {}},
+    }
+}
+
+
+def _audio_stream_response(speech: SpeechStream) -> StreamingResponse:
+    headers = {
+        **STREAMING_HEADERS,
+        "X-Audio-Url": speech.url,
+        "X-Audio-Cache": "hit" if speech.cached else "miss",
+    }
+    return StreamingResponse(speech.chunks, media_type="audio/mpeg", headers=headers)
+
+
+@router.post("/generate-stream", response_class=StreamingResponse, responses=_AUDIO_STREAM_RESPONSES)
+async def generate_voice_stream(request: VoiceRequest, cache_control: Optional[str] = Header(default=None)):
+    """
+    Streaming variant of /generate: audio is sent as it is synthesized, so playback
+    can start after the first chunk instead of after the whole file.
+    """
+    try:
+        speech = await open_speech_stream(request.text_to_speak, bypass_cache=wants_fresh(cache_control))
+    except TTSServiceError:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="TTS service error: Unable to generate audio.",
+        )
+    return _audio_stream_response(speech)
+
+
+@router.get("/stream/{key}", response_class=StreamingResponse, responses=_AUDIO_STREAM_RESPONSES)
+async def stream_voice(key: str):
+    """
+    Stream the audio behind an audio_url handed out by the mood-aware endpoints
+    with `audio_stream: true`. Synthesis starts on the first request; later
+    requests are served from the cached file.
+    """
+    try:
+        speech = await open_registered_stream(key)
+    except TTSServiceError:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="TTS service error: Unable to generate audio.",
+        )
+    if speech is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown or expired audio stream")
+    return _audio_stream_response(speech)
@@ -1,13 +1,17 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Header, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field, field_validator
 from typing import Literal, Optional, List
+import os
 import re
 
+from app.core.metrics import stage
+from app.core.utils import wants_fresh, sse_event, STREAMING_HEADERS
 from app.services.nlp import analyze_sentiment
-from app.services.perplexity import get_text_completion
-from app.services.elevenlabs import text_to_speech
+from app.services.perplexity import AI_RATE_LIMITED, AIServiceError, get_text_completion, stream_text_completion
+from app.services.elevenlabs import register_stream, text_to_speech
 
 router = APIRouter()
 
@@ -42,6 +46,13 @@ class VoiceMoodRequest(BaseModel):
         le=400,
         description="Maximum word count for generated response.",
     )
+    audio_stream: bool = Field(
+        default=False,
+        description=(
+            "Return an audio_url that streams speech as it is synthesized "
+            "(GET /api/v1/voice/stream/{key}) instead of waiting for the audio file."
+        ),
+    )
 
     @field_validator("message_text")
     @classmethod
@@ -149,6 +160,34 @@ def _negotiation_tips_for(mood: SupportedMood) -> list[str]:
     ]
 
 
+def _build_reply_prompt(req: VoiceMoodRequest, mood: SupportedMood) -> str:
+    lang_instr = _language_instruction(req.language)
+    tone_instr = _tone_instruction(mood)
+
+    return (
+        f"{lang_instr}\n"
+        f"{tone_instr}\n"
+        f"Length: up to {req.max_words} words.\n\n"
+        "Task: Craft a courteous, professional reply to the following client message. "
+        "Include empathy when appropriate, propose clear next steps, and avoid code fences or JSON. "
+        "Do not add headings; respond as a single, readable message.\n\n"
+        f"Client message:\n{req.message_text.strip()}\n"
+    )
+
+
+async def _reply_audio_url(
+    http_request: Request, response_text: str, audio_stream: bool, bypass_cache: bool
+) -> str:
+    """
+    Synthesize the reply now, or in streaming mode register it and return the
+    URL that streams it on first playback.
+    """
+    if audio_stream:
+        path = http_request.app.url_path_for("stream_voice", key=register_stream(response_text))
+        return f"{os.getenv('PUBLIC_BASE_URL', '').rstrip('/')}{path}"
+    return await text_to_speech(response_text, bypass_cache=bypass_cache)
+
+
 # ---- Endpoint ----------------------------------------------------------------
 
 @router.post(
@@ -163,7 +202,7 @@ def _negotiation_tips_for(mood: SupportedMood) -> list[str]:
                         "mood": "urgent",
                         "language": "en",
                         "response_text": "Thanks for the update—understood on the urgency. Here's a feasible plan with a clear timeline...",
-                        "audio_url": "/audio/output_abcdef123.mp3",
+                        "audio_url": "/audio/tts_9f86d081884c7d65.mp3",
                         "negotiation_advice": [
                             "Propose the fastest feasible plan and a clear timeline.",
                             "Offer a small scope cut or phased delivery if needed.",
@@ -212,32 +251,38 @@ def _negotiation_tips_for(mood: SupportedMood) -> list[str]:
         }
     },
 )
-async def generate_mood_aware_response(req: VoiceMoodRequest) -> VoiceMoodResponse:
+async def generate_mood_aware_response(
+    req: VoiceMoodRequest,
+    http_request: Request,
+    cache_control: Optional[str] = Header(default=None),
+) -> VoiceMoodResponse:
     """
     Generate a mood-aware response text and convert it to speech.
 
     Steps:
     1) Detect mood (or use override).
     2) Generate response in selected language and tone (Markdown-friendly text, no code fences).
-    3) Convert to speech using ElevenLabs.
+    3) Convert to speech using ElevenLabs (with `audio_stream`, only register the
+       reply and return a URL that streams the speech on first playback).
     4) Return audio URL, detected mood, and response text (+ negotiation tips).
+
+    Send `Cache-Control: no-cache` to bypass the completion and audio caches.
     """
     try:
-        mood: SupportedMood = req.tone_override or _detect_mood(req.message_text)
-        lang_instr = _language_instruction(req.language)
-        tone_instr = _tone_instruction(mood)
-
-        prompt = (
-            f"{lang_instr}\n"
-            f"{tone_instr}\n"
-            f"Length: up to {req.max_words} words.\n\n"
-            "Task: Craft a courteous, professional reply to the following client message. "
-            "Include empathy when appropriate, propose clear next steps, and avoid code fences or JSON. "
-            "Do not add headings; respond as a single, readable message.\n\n"
-            f"Client message:\n{req.message_text.strip()}\n"
-        )
-
-        response_text = await get_text_completion(prompt, markdown=True)
+        with stage("prompt_build"):
+            mood: SupportedMood = req.tone_override or _detect_mood(req.message_text)
+            prompt = _build_reply_prompt(req, mood)
+
+        # Voice replies are interactive: they are scheduled ahead of batch proposal work
+        with stage("llm"):
+            response_text = await get_text_completion(
+                prompt, markdown=True, bypass_cache=wants_fresh(cache_control), lane="interactive"
+            )
+        if response_text == AI_RATE_LIMITED:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="AI service busy: rate limit reached, please retry shortly.",
+            )
         if not response_text or isinstance(response_text, str) and "error" in response_text.lower():
             raise HTTPException(
                 status_code=status.HTTP_502_BAD_GATEWAY,
@@ -245,7 +290,7 @@ async def generate_mood_aware_response(req: VoiceMoodRequest) -> VoiceMoodRespon
             )
 
         # Convert to speech
-        audio_url = text_to_speech(response_text)
+        audio_url = await _reply_audio_url(http_request, response_text, req.audio_stream, wants_fresh(cache_control))
         if not audio_url or "error" in audio_url.lower():
             raise HTTPException(
                 status_code=status.HTTP_502_BAD_GATEWAY,
@@ -267,3 +312,74 @@ async def generate_mood_aware_response(req: VoiceMoodRequest) -> VoiceMoodRespon
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(ex)
         )
+
+
+@router.post(
+    "/generate-response-stream",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": (
+                "Server-Sent Events stream. A `mood` event is sent first, `delta` events carry "
+                "reply text as it is generated, and a final `done` event carries the full "
+                "VoiceMoodResponse (including audio_url). `error` events carry a `detail` message."
+            ),
+            "content": {
+                "text/event-stream": {
+                    "example": (
+                        'event: mood\ndata: {"mood": "urgent"}\n\n'
+                        'event: delta\ndata: {"text": "Thanks for the update"}\n\n'
+                        'event: done\ndata: {"mood": "urgent", "language": "en", "response_text": "...", '
+                        '"audio_url": "/audio/tts_9f86d081884c7d65.mp3", "negotiation_advice": []}\n\n'
+                    )
+                }
+            },
+        }
+    },
+)
+async def generate_mood_aware_response_stream(
+    req: VoiceMoodRequest,
+    http_request: Request,
+    cache_control: Optional[str] = Header(default=None),
+):
+    """
+    Streaming variant of /generate-response: reply text is relayed as it is produced,
+    then audio is synthesized from the full reply (with `audio_stream`, `done` follows
+    the text immediately and its audio_url streams the speech).
+    """
+    mood: SupportedMood = req.tone_override or _detect_mood(req.message_text)
+    prompt = _build_reply_prompt(req, mood)
+    bypass_cache = wants_fresh(cache_control)
+
+    async def events():
+        yield sse_event("mood", {"mood": mood})
+        parts = []
+        try:
+            async for chunk in stream_text_completion(
+                prompt, markdown=True, bypass_cache=bypass_cache, lane="interactive"
+            ):
+                parts.append(chunk)
+                yield sse_event("delta", {"text": chunk})
+        except AIServiceError:
+            yield sse_event("error", {"detail": "AI service error: Unable to generate response text."})
+            return
+        response_text = "".join(parts).strip()
+
+        audio_url = await _reply_audio_url(http_request, response_text, req.audio_stream, bypass_cache)
+        if not audio_url or "error" in audio_url.lower():
+            yield sse_event("error", {"detail": "TTS service error: Unable to generate audio."})
+            return
+        try:
+            result = VoiceMoodResponse(
+                mood=mood,
+                language=req.language,
+                response_text=response_text,
+                audio_url=audio_url,
+                negotiation_advice=_negotiation_tips_for(mood),
+            )
+        except Exception as ex:
+            yield sse_event("error", {"detail": str(ex)})
+            return
+        yield sse_event("done", result.model_dump())
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=STREAMING_HEADERS)
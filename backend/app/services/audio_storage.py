@@ -0,0 +1,397 @@
+"""
+Lifecycle of generated audio files (AUDIO_STORAGE_PATH, served under /audio).
+
+Files are kept until they have been idle for AUDIO_MAX_AGE or, while the
+directory is over AUDIO_MAX_BYTES, until they are the least recently used. Last
+use is the file's atime, set explicitly by touch() so it does not depend on the
+mount's atime options and survives restarts without an index.
+
+- touch(path): mark a file as used; returns its size, or None when it is gone.
+- pin(path) / unpin(path) / pinned(path): files being read or written are never
+  removed.
+- note_write(size): account for a new file; wakes the sweeper early when the
+  directory goes over quota.
+- AudioSweeper(directory, ...): sweep() removes expired files, then the least
+  recently used ones down to the quota, and .part files left by crashed writers.
+  Files used within AUDIO_EVICT_GRACE are kept, so a URL that was just handed
+  out stays valid.
+- AudioStaticFiles: StaticFiles for /audio that touches and pins what it serves.
+- startup(directory) / shutdown() / stats(): background sweeper on the app lifespan.
+
+touch, pin and removal share one lock: a file is either removed before a reader
+gets to it (the reader sees a miss) or not removed while it is in use.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from starlette.staticfiles import StaticFiles
+from starlette.types import Receive, Scope, Send
+
+from app.core import metrics
+
+__all__ = [
+    "AudioSweeper",
+    "AudioStaticFiles",
+    "touch",
+    "pin",
+    "unpin",
+    "pinned",
+    "note_write",
+]
+
+DEBUG = os.getenv("DEBUG", "").lower() == "dev"
+
+AUDIO_SWEEP_ENABLED = os.getenv("AUDIO_SWEEP_ENABLED", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+    "on",
+)
+# Byte quota for the audio directory (0 = unlimited)
+AUDIO_MAX_BYTES = int(os.getenv("AUDIO_MAX_BYTES", str(2 * 1024 * 1024 * 1024)))
+# Remove files not used for this many seconds (0 = keep until the quota needs room)
+AUDIO_MAX_AGE = float(os.getenv("AUDIO_MAX_AGE", str(30 * 24 * 3600)))
+AUDIO_SWEEP_INTERVAL = float(os.getenv("AUDIO_SWEEP_INTERVAL", "300"))
+# Files used this recently are never evicted, even over quota
+AUDIO_EVICT_GRACE = float(os.getenv("AUDIO_EVICT_GRACE", "600"))
+# Unfinished writes (.part) older than this are left over from a crash
+AUDIO_PART_MAX_AGE = float(os.getenv("AUDIO_PART_MAX_AGE", "3600"))
+
+_AUDIO_SUFFIXES = (".mp3",)
+_PART_SUFFIX = ".part"
+# touch() rewrites atime at most this often per file
+_TOUCH_RESOLUTION = 60.0
+
+_lock = threading.Lock()
+_pins: Dict[str, int] = {}
+
+_bytes_gauge = metrics.Gauge(
+    "freelancer_toolkit_audio_storage_bytes",
+    "Bytes of audio files in the audio directory (as of the last sweep plus new writes)",
+)
+_files_gauge = metrics.Gauge(
+    "freelancer_toolkit_audio_storage_files",
+    "Audio files in the audio directory (as of the last sweep plus new writes)",
+)
+_removed = metrics.Counter(
+    "freelancer_toolkit_audio_evictions_total",
+    "Audio files removed by the sweeper by reason (expired, quota, partial)",
+    ("reason",),
+)
+
+
+def _key(path: str) -> str:
+    return os.path.realpath(path)
+
+
+def touch(path: str) -> Optional[int]:
+    """
+    Mark a file as used now and return its size, or None when it does not exist.
+    Blocking; call it through asyncio.to_thread from async code.
+    """
+    now = time.time()
+    with _lock:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        if now - st.st_atime > _TOUCH_RESOLUTION:
+            try:
+                os.utime(path, (now, st.st_mtime))
+            except OSError:
+                pass
+        return st.st_size
+
+
+def pin(path: str) -> None:
+    """
+    Protect a file from eviction until the matching unpin().
+    """
+    key = _key(path)
+    with _lock:
+        _pins[key] = _pins.get(key, 0) + 1
+
+
+def unpin(path: str) -> None:
+    key = _key(path)
+    with _lock:
+        count = _pins.get(key, 0) - 1
+        if count > 0:
+            _pins[key] = count
+        else:
+            _pins.pop(key, None)
+
+
+@contextmanager
+def pinned(path: str) -> Iterator[None]:
+    pin(path)
+    try:
+        yield
+    finally:
+        unpin(path)
+
+
+def _remove_if_idle(path: str, now: float, min_idle: float) -> bool:
+    """
+    Remove path unless it is pinned or was used within min_idle seconds.
+    Returns True when the file is gone afterwards.
+    """
+    with _lock:
+        if _pins.get(path):
+            return False
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return True
+        except OSError:
+            return False
+        if now - max(st.st_atime, st.st_mtime) < min_idle:
+            return False
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            return False
+        return True
+
+
+class AudioSweeper:
+    """
+    Enforces the age limit and byte quota on one directory. sweep() is blocking.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int = AUDIO_MAX_BYTES,
+        max_age: float = AUDIO_MAX_AGE,
+        grace: float = AUDIO_EVICT_GRACE,
+        part_max_age: float = AUDIO_PART_MAX_AGE,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.directory = os.path.realpath(directory)
+        self.max_bytes = max(0, max_bytes)
+        self.max_age = max(0.0, max_age)
+        self.grace = max(0.0, grace)
+        self.part_max_age = max(0.0, part_max_age)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.files = 0
+        self.sweeps = 0
+        self.expired = 0
+        self.evicted = 0
+        self.evicted_bytes = 0
+        self.partials_removed = 0
+        self.skipped_in_use = 0
+        self.last_sweep_at: Optional[float] = None
+        self.last_sweep_ms: Optional[float] = None
+
+    def over_quota(self) -> bool:
+        with self._lock:
+            return self.max_bytes > 0 and self.bytes > self.max_bytes
+
+    def note_write(self, size: int) -> bool:
+        """
+        Count a new file until the next sweep rescans. Returns True when over quota.
+        """
+        with self._lock:
+            self.bytes += size
+            self.files += 1
+            _bytes_gauge.set(self.bytes)
+            _files_gauge.set(self.files)
+        return self.over_quota()
+
+    def _scan(self, now: float) -> List[Tuple[float, int, str]]:
+        entries: List[Tuple[float, int, str]] = []
+        try:
+            it = os.scandir(self.directory)
+        except FileNotFoundError:
+            return entries
+        with it:
+            for entry in it:
+                try:
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+                    st = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                if entry.name.endswith(_PART_SUFFIX):
+                    if now - st.st_mtime > self.part_max_age and _remove_if_idle(
+                        entry.path, now, self.part_max_age
+                    ):
+                        self.partials_removed += 1
+                        _removed.inc(reason="partial")
+                    continue
+                if entry.name.endswith(_AUDIO_SUFFIXES):
+                    entries.append(
+                        (max(st.st_atime, st.st_mtime), st.st_size, entry.path)
+                    )
+        return entries
+
+    def sweep(self) -> Dict[str, int]:
+        """
+        Remove expired files, then least recently used files until the directory
+        fits the quota. Pinned and recently used files are skipped.
+        """
+        started = time.perf_counter()
+        now = self._clock()
+        entries = self._scan(now)
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        files = len(entries)
+        expired = evicted = freed = skipped = 0
+        for last_used, size, path in entries:
+            is_expired = self.max_age > 0 and now - last_used > self.max_age
+            over = self.max_bytes > 0 and total > self.max_bytes
+            if not is_expired and not over:
+                # Oldest first: nothing after this is expired either
+                break
+            min_idle = max(self.max_age, self.grace) if is_expired else self.grace
+            if not _remove_if_idle(path, now, min_idle):
+                skipped += 1
+                continue
+            total -= size
+            files -= 1
+            freed += size
+            if is_expired:
+                expired += 1
+                _removed.inc(reason="expired")
+            else:
+                evicted += 1
+                _removed.inc(reason="quota")
+        with self._lock:
+            self.bytes = total
+            self.files = files
+            self.sweeps += 1
+            self.expired += expired
+            self.evicted += evicted
+            self.evicted_bytes += freed
+            self.skipped_in_use += skipped
+            self.last_sweep_at = now
+            self.last_sweep_ms = round((time.perf_counter() - started) * 1000, 2)
+        _bytes_gauge.set(total)
+        _files_gauge.set(files)
+        if DEBUG and (expired or evicted):
+            print(
+                f"[DEBUG] audio sweep: {expired} expired, {evicted} evicted, {freed} bytes freed",
+                file=sys.stderr,
+            )
+        return {
+            "expired": expired,
+            "evicted": evicted,
+            "freed_bytes": freed,
+            "skipped": skipped,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "directory": self.directory,
+                "bytes": self.bytes,
+                "files": self.files,
+                "max_bytes": self.max_bytes,
+                "max_age_s": self.max_age,
+                "sweeps": self.sweeps,
+                "expired": self.expired,
+                "evicted": self.evicted,
+                "evicted_bytes": self.evicted_bytes,
+                "partials_removed": self.partials_removed,
+                "skipped_in_use": self.skipped_in_use,
+                "last_sweep_at": self.last_sweep_at,
+                "last_sweep_ms": self.last_sweep_ms,
+            }
+
+
+class AudioStaticFiles(StaticFiles):
+    """
+    StaticFiles that marks served audio as used and pins it while it is sent.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self.directory is None:
+            await super().__call__(scope, receive, send)
+            return
+        root = os.path.realpath(str(self.directory))
+        path = os.path.realpath(os.path.join(root, self.get_path(scope)))
+        if not path.startswith(root + os.sep):
+            await super().__call__(scope, receive, send)
+            return
+        pin(path)
+        try:
+            await asyncio.to_thread(touch, path)
+            await super().__call__(scope, receive, send)
+        finally:
+            unpin(path)
+
+
+# -- process-wide sweeper (started from the app lifespan) --
+
+_sweeper: Optional[AudioSweeper] = None
+_task: Optional["asyncio.Task[None]"] = None
+_wake: Optional[asyncio.Event] = None
+
+
+async def _run(sweeper: AudioSweeper, wake: asyncio.Event, interval: float) -> None:
+    while True:
+        try:
+            await asyncio.to_thread(sweeper.sweep)
+        except Exception as ex:
+            if DEBUG:
+                print(f"[WARN] audio sweep failed: {ex}", file=sys.stderr)
+        try:
+            await asyncio.wait_for(wake.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+        wake.clear()
+
+
+async def startup(directory: str) -> None:
+    """
+    Start the background sweeper for the audio directory.
+    """
+    global _sweeper, _task, _wake
+    if not AUDIO_SWEEP_ENABLED or _task is not None:
+        return
+    _sweeper = AudioSweeper(directory)
+    _wake = asyncio.Event()
+    _task = asyncio.create_task(_run(_sweeper, _wake, max(1.0, AUDIO_SWEEP_INTERVAL)))
+
+
+async def shutdown() -> None:
+    global _task, _wake
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
+        _wake = None
+
+
+def note_write(size: int) -> None:
+    """
+    Account for a newly written audio file; sweeps early when over quota.
+    """
+    if _sweeper is not None and _sweeper.note_write(size) and _wake is not None:
+        _wake.set()
+
+
+def stats() -> Dict[str, Any]:
+    if _sweeper is None:
+        return {"enabled": AUDIO_SWEEP_ENABLED, "running": False}
+    return {
+        "enabled": AUDIO_SWEEP_ENABLED,
+        "running": _task is not None and not _task.done(),
+        **_sweeper.stats(),
+    }
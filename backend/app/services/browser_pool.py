@@ -0,0 +1,282 @@
+"""
+Long-lived Playwright browser pool for the scraper.
+
+One Playwright driver and one Chromium process are started per app process
+(in the lifespan) instead of per scrape:
+
+- lease(): async context manager yielding a fresh page in its own browser
+  context (cookies/storage are isolated per scrape); the context is closed on exit.
+- Concurrency cap: at most max_pages leased pages at a time; extra callers wait.
+- Recycling: a browser is retired after max_uses pages, or when it disconnects
+  (crash). Retired browsers close once their last lease is returned; new leases
+  go to a freshly launched browser.
+- shutdown(): stops new leases, waits for in-flight pages to finish (bounded by
+  drain_timeout), then closes browsers (including retirements still closing)
+  and the driver. open()/start() accept leases again, so a pool can be reused
+  across app lifespans.
+
+Launch, recycle and crash counters are exposed through stats().
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+from playwright.async_api import Playwright, async_playwright
+
+__all__ = ["BrowserPool", "BrowserPoolClosed"]
+
+DEBUG = os.getenv("DEBUG", "").lower() == "dev"
+
+
+class BrowserPoolClosed(RuntimeError):
+    pass
+
+
+class _BrowserHandle:
+    __slots__ = ("browser", "uses", "active", "retired")
+
+    def __init__(self, browser: Any):
+        self.browser = browser
+        self.uses = 0
+        self.active = 0
+        self.retired = False
+
+
+class BrowserPool:
+    def __init__(
+        self,
+        max_pages: int = 4,
+        max_uses: int = 100,
+        launch_options: Optional[Dict[str, Any]] = None,
+        context_options: Optional[Dict[str, Any]] = None,
+        drain_timeout: float = 30.0,
+    ):
+        self.max_pages = max(1, max_pages)
+        self.max_uses = max(1, max_uses)
+        self.launch_options = dict(launch_options or {})
+        self.context_options = dict(context_options or {})
+        self.drain_timeout = drain_timeout
+
+        self._playwright: Optional[Playwright] = None
+        self._current: Optional[_BrowserHandle] = None
+        self._retired: List[_BrowserHandle] = []
+        # Background closes of retired browsers, awaited by shutdown()
+        self._closes: Set["asyncio.Future[None]"] = set()
+        self._lock = asyncio.Lock()
+        self._pages: Optional[asyncio.Semaphore] = None
+        self._idle: Optional[asyncio.Event] = None
+        self._active = 0
+        self._waiting = 0
+        self._closing = False
+
+        self.launches = 0
+        self.recycles = 0
+        self.crashes = 0
+        self.pages_served = 0
+        self.failures = 0
+
+    async def _launch(self) -> Any:
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        return await self._playwright.chromium.launch(**self.launch_options)
+
+    def _ensure_primitives(self) -> None:
+        # Created lazily so the pool binds to the running event loop
+        if self._pages is None:
+            self._pages = asyncio.Semaphore(self.max_pages)
+            self._idle = asyncio.Event()
+            self._idle.set()
+
+    def open(self) -> None:
+        """
+        Accept leases again after shutdown(). Loop-bound primitives are rebuilt
+        when idle, since a new app lifespan may run on a new event loop.
+        """
+        self._closing = False
+        if self._active == 0:
+            self._lock = asyncio.Lock()
+            self._pages = None
+            self._idle = None
+
+    async def start(self) -> None:
+        """
+        Start the driver and launch the first browser (pays the cold start up front).
+        """
+        self.open()
+        self._ensure_primitives()
+        await self._acquire_browser()
+
+    async def _acquire_browser(self) -> _BrowserHandle:
+        async with self._lock:
+            handle = self._current
+            if (
+                handle is not None
+                and not handle.retired
+                and handle.browser.is_connected()
+            ):
+                return handle
+            if handle is not None:
+                self._retire(handle, crashed=not handle.browser.is_connected())
+            browser = await self._launch()
+            handle = _BrowserHandle(browser)
+            try:
+                browser.on(
+                    "disconnected", lambda _b, h=handle: self._on_disconnected(h)
+                )
+            except Exception:
+                pass
+            self._current = handle
+            self.launches += 1
+            if DEBUG:
+                print(
+                    f"[DEBUG] browser pool: launched browser #{self.launches}",
+                    file=sys.stderr,
+                )
+            return handle
+
+    def _on_disconnected(self, handle: _BrowserHandle) -> None:
+        if not handle.retired and not self._closing:
+            self._retire(handle, crashed=True)
+
+    def _retire(self, handle: _BrowserHandle, crashed: bool = False) -> None:
+        if handle.retired:
+            return
+        handle.retired = True
+        if crashed:
+            self.crashes += 1
+        else:
+            self.recycles += 1
+        if self._current is handle:
+            self._current = None
+        self._retired.append(handle)
+        self._close_if_idle(handle)
+
+    def _close_if_idle(self, handle: _BrowserHandle) -> None:
+        if handle.retired and handle.active == 0 and handle in self._retired:
+            self._retired.remove(handle)
+            task = asyncio.ensure_future(self._close_browser(handle))
+            self._closes.add(task)
+            task.add_done_callback(self._closes.discard)
+
+    @staticmethod
+    async def _close_browser(handle: _BrowserHandle) -> None:
+        try:
+            await handle.browser.close()
+        except Exception:
+            pass
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[Any]:
+        """
+        Lease a page in a fresh, isolated browser context.
+        """
+        if self._closing:
+            raise BrowserPoolClosed("browser pool is shutting down")
+        self._ensure_primitives()
+        assert self._pages is not None and self._idle is not None
+        self._waiting += 1
+        try:
+            await self._pages.acquire()
+        finally:
+            self._waiting -= 1
+        self._active += 1
+        self._idle.clear()
+        handle: Optional[_BrowserHandle] = None
+        context = None
+        try:
+            if self._closing:
+                raise BrowserPoolClosed("browser pool is shutting down")
+            # One retry covers a browser that died between leases
+            for attempt in range(2):
+                handle = await self._acquire_browser()
+                handle.active += 1
+                handle.uses += 1
+                try:
+                    context = await handle.browser.new_context(**self.context_options)
+                    page = await context.new_page()
+                    break
+                except Exception:
+                    handle.active -= 1
+                    if context is not None:
+                        await self._close_context(context)
+                        context = None
+                    if attempt or handle.browser.is_connected():
+                        self.failures += 1
+                        raise
+                    self._retire(handle, crashed=True)
+                    handle = None
+            # The loop either broke out with a page or raised
+            assert handle is not None
+            if handle.uses >= self.max_uses:
+                # Later leases get a new browser; this one closes when its pages are done
+                self._retire(handle)
+            self.pages_served += 1
+            yield page
+        finally:
+            if context is not None:
+                await self._close_context(context)
+            if handle is not None:
+                handle.active -= 1
+                if not handle.browser.is_connected():
+                    self._retire(handle, crashed=True)
+                self._close_if_idle(handle)
+            self._active -= 1
+            if self._active == 0:
+                self._idle.set()
+            self._pages.release()
+
+    @staticmethod
+    async def _close_context(context: Any) -> None:
+        try:
+            await context.close()
+        except Exception:
+            pass
+
+    async def shutdown(self) -> None:
+        """
+        Drain in-flight pages, then close every browser and stop the driver.
+        """
+        self._closing = True
+        if self._idle is not None and not self._idle.is_set():
+            try:
+                await asyncio.wait_for(self._idle.wait(), timeout=self.drain_timeout)
+            except asyncio.TimeoutError:
+                if DEBUG:
+                    print(
+                        f"[WARN] browser pool: closing with {self._active} active page(s)",
+                        file=sys.stderr,
+                    )
+        handles = self._retired + ([self._current] if self._current is not None else [])
+        self._retired = []
+        self._current = None
+        for handle in handles:
+            await self._close_browser(handle)
+        if self._closes:
+            await asyncio.gather(*self._closes, return_exceptions=True)
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception:
+                pass
+            self._playwright = None
+
+    def stats(self) -> dict:
+        current = self._current
+        return {
+            "max_pages": self.max_pages,
+            "max_uses": self.max_uses,
+            "active_pages": self._active,
+            "waiting": self._waiting,
+            "browser_uses": current.uses if current is not None else 0,
+            "retired_open": len(self._retired),
+            "launches": self.launches,
+            "recycles": self.recycles,
+            "crashes": self.crashes,
+            "pages_served": self.pages_served,
+            "failures": self.failures,
+        }
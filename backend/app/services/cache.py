@@ -0,0 +1,285 @@
+"""
+Small, dependency-free caching helpers.
+
+- LRUCache: in-memory tier with per-entry TTL, entry/byte bounds and LRU eviction.
+- SQLiteCache: optional on-disk tier (stdlib sqlite3) shared across restarts.
+- TieredCache: memory first, then disk; promotes disk hits and keeps counters.
+
+Values must be JSON-serializable (the disk tier stores them as JSON text).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+__all__ = ["make_key", "LRUCache", "SQLiteCache", "TieredCache"]
+
+
+def make_key(*parts: Any) -> str:
+    """
+    Content-addressed key: sha256 over a canonical JSON encoding of the parts.
+    """
+    raw = json.dumps(
+        parts, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _size_of(value: Any) -> int:
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    return len(json.dumps(value, separators=(",", ":"), default=str))
+
+
+class LRUCache:
+    """
+    In-memory LRU with TTL. Not thread-safe; intended for use on the event loop.
+    """
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 32 * 1024 * 1024):
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max(1, max_bytes)
+        # key -> (expires_at, size, value)
+        self._data: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: str) -> Optional[Any]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, size, value = item
+        if expires_at <= time.time():
+            self._remove(key)
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        if ttl <= 0:
+            return
+        size = _size_of(value)
+        if size > self.max_bytes:
+            return
+        if key in self._data:
+            self._remove(key)
+        self._data[key] = (time.time() + ttl, size, value)
+        self._bytes += size
+        while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._data))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        if key in self._data:
+            self._remove(key)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._bytes = 0
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._data.pop(key)
+        self._bytes -= size
+
+
+class SQLiteCache:
+    """
+    Persistent key/value tier with TTL. Rows are namespaced so several caches
+    can share one database file. Methods are blocking; TieredCache runs them
+    in a worker thread.
+    """
+
+    _PRUNE_EVERY = 64
+
+    def __init__(self, path: str, namespace: str, max_entries: int = 10000):
+        self.path = path
+        self.namespace = namespace
+        self.max_entries = max(1, max_entries)
+        self._lock = threading.Lock()
+        self._writes = 0
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                " namespace TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+
+    def get(self, key: str) -> Tuple[Optional[Any], float]:
+        """
+        Return (value, remaining_ttl) or (None, 0) when missing or expired.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+            if row is None:
+                return None, 0.0
+            if row[1] <= now:
+                self._conn.execute(
+                    "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+                    (self.namespace, key),
+                )
+                return None, 0.0
+            self._conn.execute(
+                "UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                (now, self.namespace, key),
+            )
+        try:
+            return json.loads(row[0]), row[1] - now
+        except Exception:
+            return None, 0.0
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        if ttl <= 0:
+            return
+        now = time.time()
+        encoded = json.dumps(value, ensure_ascii=False, default=str)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (self.namespace, key, encoded, now + ttl, now),
+            )
+            self._writes += 1
+            if self._writes % self._PRUNE_EVERY == 0:
+                self._prune(now)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            )
+
+    def count(self) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM cache_entries WHERE namespace = ?",
+                (self.namespace,),
+            ).fetchone()
+        return int(row[0]) if row else 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _prune(self, now: float) -> None:
+        # Caller holds the lock
+        self._conn.execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND expires_at <= ?",
+            (self.namespace, now),
+        )
+        self._conn.execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND key IN ("
+            " SELECT key FROM cache_entries WHERE namespace = ?"
+            " ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.namespace, self.namespace, self.max_entries),
+        )
+
+
+class TieredCache:
+    """
+    Memory tier in front of an optional SQLite tier, with hit/miss counters.
+    """
+
+    def __init__(self, name: str, memory: LRUCache, disk: Optional[SQLiteCache] = None):
+        self.name = name
+        self.memory = memory
+        self.disk = disk
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self.writes = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is not None:
+            self.memory_hits += 1
+            return value
+        if self.disk is not None:
+            try:
+                value, remaining = await asyncio.to_thread(self.disk.get, key)
+            except Exception:
+                value, remaining = None, 0.0
+            if value is not None:
+                self.disk_hits += 1
+                self.memory.set(key, value, remaining)
+                return value
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        if ttl <= 0:
+            return
+        self.writes += 1
+        self.memory.set(key, value, ttl)
+        if self.disk is not None:
+            try:
+                await asyncio.to_thread(self.disk.set, key, value, ttl)
+            except Exception:
+                pass
+
+    async def delete(self, key: str) -> None:
+        self.memory.delete(key)
+        if self.disk is not None:
+            try:
+                await asyncio.to_thread(self.disk.delete, key)
+            except Exception:
+                pass
+
+    def record_bypass(self) -> None:
+        self.bypasses += 1
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "name": self.name,
+            "memory_entries": len(self.memory),
+            "memory_bytes": self.memory.bytes,
+            "memory_evictions": self.memory.evictions,
+            "disk_enabled": self.disk is not None,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "bypasses": self.bypasses,
+            "writes": self.writes,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        if self.disk is not None:
+            try:
+                self.disk.close()
+            except Exception:
+                pass
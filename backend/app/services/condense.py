@@ -0,0 +1,170 @@
+"""
+Job text condensation for LLM prompts.
+
+Scraped pages (especially the generic fallback) contain navigation, footers,
+cookie banners and "related jobs" lists next to the actual job post. This
+module shrinks that text before it is pasted into a prompt. It is
+dependency-free, like nlp.py.
+
+Pipeline:
+1. Split into blocks (lines when present, otherwise sentences).
+2. Drop repeated blocks (normalized text hashing). If the result fits the
+   budget it is returned as is.
+3. Over budget: drop boilerplate blocks (cookie/legal/auth/navigation phrases,
+   link-like crumbs).
+4. If still over budget, rank blocks by job relevance and keep the best ones
+   that fit, preserving their original order.
+
+Functions:
+- estimate_tokens(text: str) -> int
+- condense_job_text(text: str, max_tokens: int | None = None) -> str
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from typing import List, Tuple
+
+__all__ = ["estimate_tokens", "condense_job_text", "PROMPT_JOB_TOKEN_BUDGET"]
+
+
+# Approximate token budget for the job text section of the proposal prompt
+PROMPT_JOB_TOKEN_BUDGET = int(os.getenv("PROMPT_JOB_TOKEN_BUDGET", "1500"))
+
+# Roughly 4 characters per token for English; close enough for budgeting
+_CHARS_PER_TOKEN = 4
+
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?؟。])\s+|\s+[|•·»]\s+")
+_LINE_SPLIT_RE = re.compile(r"\s*\n+\s*")
+_NORMALIZE_RE = re.compile(r"[\W\d_]+", re.U)
+_WORD_RE = re.compile(r"\w+", re.U)
+
+_BOILERPLATE_RE = re.compile(
+    r"\b("
+    r"cookies?|privacy policy|terms of (?:service|use)|all rights reserved|copyright|"
+    r"sign (?:in|up)|log ?in|log ?out|create (?:an )?account|forgot password|"
+    r"subscribe|newsletter|follow us|share (?:this|on)|skip to (?:main )?content|"
+    r"related jobs|similar jobs|other jobs|recommended jobs|more jobs|"
+    r"back to (?:top|search)|help center|contact us|about us|download (?:the )?app|"
+    r"accept all|manage preferences|we use cookies"
+    r")\b|©",
+    re.I,
+)
+
+# Phrases that usually appear in the job post itself
+_JOB_SIGNAL_RE = re.compile(
+    r"\b("
+    r"looking for|we need|need(?:ed|s)?|seeking|hiring|requirements?|responsibilit\w*|"
+    r"must|should|experience|skills?|deliverables?|scope|project|budget|deadline|"
+    r"timeline|milestones?|deliver\w*|develop\w*|build|design|implement\w*|integrat\w*|"
+    r"you will|the ideal|candidate|freelancer|proposal|hour(?:ly)?|fixed|price|"
+    r"مشروع|مطلوب|الميزانية|خبرة|مهارات|تصميم|تطوير"
+    r")\b",
+    re.I | re.U,
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate (characters / 4), good enough for prompt budgeting.
+    """
+    if not text:
+        return 0
+    return (len(text) + _CHARS_PER_TOKEN - 1) // _CHARS_PER_TOKEN
+
+
+def _split_blocks(text: str) -> List[str]:
+    parts = _LINE_SPLIT_RE.split(text) if "\n" in text else [text]
+    blocks: List[str] = []
+    for part in parts:
+        for piece in _SENTENCE_SPLIT_RE.split(part):
+            piece = " ".join(piece.split())
+            if piece:
+                blocks.append(piece)
+    return blocks
+
+
+def _is_boilerplate(block: str) -> bool:
+    words = _WORD_RE.findall(block)
+    if not words:
+        return True
+    # Short blocks that mention legal/auth/nav phrases are chrome, not content
+    if len(block) < 200 and _BOILERPLATE_RE.search(block):
+        return True
+    # Breadcrumb / menu crumbs: a few Title-Cased words without sentence punctuation
+    if (
+        len(words) <= 4
+        and not re.search(r"[.!?:؟]", block)
+        and not _JOB_SIGNAL_RE.search(block)
+    ):
+        return True
+    return False
+
+
+def _score(block: str) -> float:
+    words = len(_WORD_RE.findall(block))
+    signals = len(_JOB_SIGNAL_RE.findall(block))
+    score = signals * 3.0
+    # Prefer sentence-sized blocks over fragments and walls of text
+    if 8 <= words <= 80:
+        score += 2.0
+    elif words < 8:
+        score -= 1.0
+    if re.search(r"[$€£]|\d+\s*(?:usd|eur|hours?|days?|weeks?|months?)\b", block, re.I):
+        score += 2.0
+    return score
+
+
+def condense_job_text(text: str, max_tokens: int | None = None) -> str:
+    """
+    Remove duplicates; when that is not enough, drop boilerplate and trim to the
+    token budget by relevance. Text that fits is never pruned by the heuristics.
+
+    Args:
+        text: Raw job text (scraped or pasted).
+        max_tokens: Budget for the returned text; defaults to PROMPT_JOB_TOKEN_BUDGET.
+
+    Returns:
+        Condensed text (blocks joined by newlines), or the input when nothing to do.
+    """
+    if not text or not text.strip():
+        return ""
+    budget = PROMPT_JOB_TOKEN_BUDGET if max_tokens is None else max_tokens
+    budget_chars = max(1, budget) * _CHARS_PER_TOKEN
+
+    blocks = _split_blocks(text)
+    unique: List[str] = []
+    seen = set()
+    for block in blocks:
+        fingerprint = _NORMALIZE_RE.sub(" ", block.lower()).strip() or block
+        if fingerprint in seen:
+            continue
+        seen.add(fingerprint)
+        unique.append(block)
+    if sum(len(b) + 1 for b in unique) <= budget_chars:
+        return text.strip() if len(unique) == len(blocks) else "\n".join(unique)
+
+    kept = [b for b in unique if not _is_boilerplate(b)]
+    if not kept:
+        # Everything looked like boilerplate; fall back to a plain trim
+        return " ".join(text.split())[:budget_chars]
+
+    if sum(len(b) + 1 for b in kept) <= budget_chars:
+        return "\n".join(kept)
+
+    ranked: List[Tuple[float, int]] = sorted(
+        ((_score(b), i) for i, b in enumerate(kept)), key=lambda x: (-x[0], x[1])
+    )
+    chosen: List[int] = []
+    used = 0
+    for _, i in ranked:
+        size = len(kept[i]) + 1
+        if used + size > budget_chars:
+            continue
+        chosen.append(i)
+        used += size
+    if not chosen:
+        # Single huge block: keep its head
+        return kept[ranked[0][1]][:budget_chars]
+    return "\n".join(kept[i] for i in sorted(chosen))
@@ -1,15 +1,28 @@
+import asyncio
+import contextlib
 import os
+import re
+import sys
+import unicodedata
 import uuid
-from elevenlabs.client import ElevenLabs
-import requests
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, BinaryIO, Dict, List, Optional, Tuple
+import anyio
+import httpx
 from dotenv import load_dotenv
 from pathlib import Path
+from app.core.metrics import record_upstream, stage
+from app.services import audio_storage, singleflight
+from app.services.cache import LRUCache, SQLiteCache, TieredCache, make_key
 
 load_dotenv()
 
 ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY")
 ELEVENLABS_VOICE_ID = os.getenv("ELEVENLABS_VOICE_ID", "21m00Tcm4TlvDq8ikWAM")
 ELEVENLABS_MODEL_ID = os.getenv("ELEVENLABS_MODEL_ID", "eleven_multilingual_v2")
+ELEVENLABS_VOICE_SETTINGS = {"stability": 0.5, "similarity_boost": 0.5}
+# Override the base to point at a local stand-in (see bench/fakes.py)
+ELEVENLABS_API_BASE = os.getenv("ELEVENLABS_API_BASE", "https://api.elevenlabs.io").rstrip("/")
 # Resolve default audio directory to monorepo frontend/public/audio (absolute)
 _repo_root = Path(__file__).resolve().parents[4]
 _default_audio_dir = _repo_root / "frontend" / "public" / "audio"
@@ -18,30 +31,449 @@ if _audio_dir_env:
     AUDIO_DIR = str(Path(_audio_dir_env).resolve())
 else:
     AUDIO_DIR = str(_default_audio_dir)
+DEBUG = os.getenv("DEBUG", "").lower() == "dev"
 
-client = ElevenLabs(api_key=ELEVENLABS_API_KEY)  # This line remains unchanged
+# Shared connection pool (one client per process, see main.py lifespan)
+ELEVENLABS_MAX_CONNECTIONS = int(os.getenv("ELEVENLABS_MAX_CONNECTIONS", "10"))
+ELEVENLABS_MAX_KEEPALIVE = int(os.getenv("ELEVENLABS_MAX_KEEPALIVE", "5"))
+ELEVENLABS_KEEPALIVE_EXPIRY = float(os.getenv("ELEVENLABS_KEEPALIVE_EXPIRY", "60"))
+ELEVENLABS_TIMEOUT = float(os.getenv("ELEVENLABS_TIMEOUT", "30"))
 
+# Audio cache: files are named after a hash of (text, voice, model, settings), so
+# a repeat request reuses the file instead of paying for another synthesis. The
+# index (memory, optionally SQLite) maps keys to files; without an entry the
+# file itself is checked, so hits survive restarts either way.
+TTS_CACHE_ENABLED = os.getenv("TTS_CACHE_ENABLED", "true").lower() in ("1", "true", "yes", "on")
+TTS_CACHE_MAX_ENTRIES = int(os.getenv("TTS_CACHE_MAX_ENTRIES", "2048"))
+TTS_CACHE_SQLITE_PATH = os.getenv("TTS_CACHE_SQLITE_PATH", "").strip()
+TTS_CACHE_SQLITE_MAX_ENTRIES = int(os.getenv("TTS_CACHE_SQLITE_MAX_ENTRIES", "20000"))
+# Audio for a given key never goes stale; index entries only age out of the LRU
+_INDEX_TTL = 365 * 24 * 3600.0
 
-def text_to_speech(text: str) -> str:
+# Streaming synthesis: chunks are relayed to the client while being written to
+# the cache file, so playback starts with the first chunk. Cached files are
+# streamed in reads of this size.
+TTS_STREAM_CHUNK_BYTES = int(os.getenv("TTS_STREAM_CHUNK_BYTES", "16384"))
+# How long a text registered for GET /voice/stream/{key} stays playable
+TTS_PENDING_TTL = float(os.getenv("TTS_PENDING_TTL", "600"))
+
+# Long-form synthesis: text longer than TTS_CHUNK_CHARS is split on paragraph and
+# sentence boundaries, the chunks are synthesized concurrently (each one cached
+# like any other text) and stitched into one MP3
+TTS_CHUNK_CHARS = int(os.getenv("TTS_CHUNK_CHARS", "1200"))
+TTS_CHUNK_CONCURRENCY = int(os.getenv("TTS_CHUNK_CONCURRENCY", "4"))
+TTS_LONG_FORM_MAX_CHARS = int(os.getenv("TTS_LONG_FORM_MAX_CHARS", "50000"))
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+_SENTENCE_RE = re.compile(r"(?<=[.!?;…؟。])\s+")
+_KEY_RE = re.compile(r"[0-9a-f]{64}")
+
+_client: Optional[httpx.AsyncClient] = None
+_cache: Optional[TieredCache] = None
+_in_flight = 0
+_max_in_flight = 0
+_synthesized = 0
+_audio_hits = 0
+_characters_saved = 0
+_streams = 0
+_long_form_requests = 0
+_long_form_chunks = 0
+_long_form_chunk_hits = 0
+_pending = LRUCache(512, 4 * 1024 * 1024)
+
+
+class TTSServiceError(Exception):
+    """
+    Raised by streaming helpers, which cannot return an error string mid-stream.
+    """
+
+
+@dataclass
+class SpeechStream:
+    """
+    Audio chunks for one synthesis. url is the cache file, complete once the
+    stream has been read to the end; cached is True when served from that file.
     """
-    Convert text to speech using ElevenLabs, save as unique file, return public URL.
+
+    key: str
+    url: str
+    cached: bool
+    chunks: AsyncIterator[bytes]
+
+
+@dataclass
+class LongFormSpeech:
+    """
+    Stitched audio for a chunked text, plus the chunk files in order (a playlist).
+    """
+
+    url: str
+    parts: List[str]
+    cached_chunks: int
+
+
+def _build_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(ELEVENLABS_TIMEOUT, connect=10.0),
+        limits=httpx.Limits(
+            max_connections=ELEVENLABS_MAX_CONNECTIONS,
+            max_keepalive_connections=ELEVENLABS_MAX_KEEPALIVE,
+            keepalive_expiry=ELEVENLABS_KEEPALIVE_EXPIRY,
+        ),
+    )
+
+
+async def startup() -> None:
+    """
+    Create the shared ElevenLabs client. Called from the app lifespan.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+
+
+async def shutdown() -> None:
+    """
+    Close the shared ElevenLabs client and release pooled connections.
+    """
+    global _client, _cache
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+    if _cache is not None:
+        _cache.close()
+        _cache = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    # Lazily create the client when the lifespan hook did not run (scripts, bare TestClient)
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+
+def _get_cache() -> TieredCache:
+    global _cache
+    if _cache is None:
+        disk = None
+        if TTS_CACHE_SQLITE_PATH:
+            try:
+                disk = SQLiteCache(TTS_CACHE_SQLITE_PATH, "tts", TTS_CACHE_SQLITE_MAX_ENTRIES)
+            except Exception as ex:
+                if DEBUG:
+                    print(f"[WARN] TTS cache SQLite tier disabled: {ex}", file=sys.stderr)
+        _cache = TieredCache("tts", LRUCache(TTS_CACHE_MAX_ENTRIES, 8 * 1024 * 1024), disk)
+    return _cache
+
+
+def stats() -> Dict[str, Any]:
+    """
+    Synthesis and audio cache counters and pool settings for the ElevenLabs client.
+    """
+    return {
+        "synthesized": _synthesized,
+        "streams": _streams,
+        "in_flight": _in_flight,
+        "max_in_flight": _max_in_flight,
+        "max_connections": ELEVENLABS_MAX_CONNECTIONS,
+        "long_form": {
+            "requests": _long_form_requests,
+            "chunks": _long_form_chunks,
+            "chunk_hits": _long_form_chunk_hits,
+            "chunk_chars": TTS_CHUNK_CHARS,
+            "chunk_concurrency": TTS_CHUNK_CONCURRENCY,
+        },
+        "cache": {
+            "enabled": TTS_CACHE_ENABLED,
+            "audio_hits": _audio_hits,
+            "characters_saved": _characters_saved,
+            "index": _get_cache().stats(),
+        },
+    }
+
+
+def _normalize_tts_text(text: str) -> str:
+    # Whitespace and Unicode form do not change the audio, so they must not change the key
+    safe_text = " ".join(unicodedata.normalize("NFC", text).split())
+    return safe_text[:5000]  # taking only first 5000 characters to avoid long texts and api ratelimits
+
+
+def audio_key(text: str) -> str:
+    """
+    Cache key of the audio for this text with the configured voice, model and settings.
+    """
+    return make_key("tts", ELEVENLABS_VOICE_ID, ELEVENLABS_MODEL_ID, ELEVENLABS_VOICE_SETTINGS, _normalize_tts_text(text))
+
+
+def _audio_filename(key: str) -> str:
+    return f"tts_{key}.mp3"
+
+
+def _public_url(filename: str) -> str:
+    public_base = os.getenv("PUBLIC_BASE_URL", "").rstrip("/")
+    if public_base:
+        return f"{public_base}/audio/{filename}"
+    return f"/audio/{filename}"
+
+
+async def _cached_audio(key: str) -> Optional[str]:
+    """
+    File name of already synthesized audio for this key, or None.
+    """
+    cache = _get_cache()
+    entry = await cache.get(key)
+    filename = entry["filename"] if entry else _audio_filename(key)
+    # Touching marks the file as used, so the storage sweeper keeps it for now
+    size = await asyncio.to_thread(audio_storage.touch, os.path.join(AUDIO_DIR, filename))
+    if not size:
+        if entry:
+            await cache.delete(key)
+        return None
+    if not entry:
+        # Audio written before a restart (or by another worker): index it again
+        await cache.set(key, {"filename": filename, "bytes": size}, _INDEX_TTL)
+    return filename
+
+
+def _record_hit(safe_text: str) -> None:
+    global _audio_hits, _characters_saved
+    _audio_hits += 1
+    _characters_saved += len(safe_text)
+
+
+async def text_to_speech(text: str, bypass_cache: bool = False) -> str:
+    """
+    Convert text to speech using ElevenLabs and return the public URL of the audio
+    file. Audio already synthesized for the same text, voice, model and settings
+    is reused without calling the API unless bypass_cache is set. Text longer than
+    TTS_CHUNK_CHARS goes through synthesize_long_form.
     """
     if not ELEVENLABS_API_KEY or ELEVENLABS_API_KEY.strip() in ("", "test_dummy"):
         return "ElevenLabs API key missing or invalid. Set ELEVENLABS_API_KEY."
     if not text or not text.strip():
         return "Text to speak must not be empty"
-    safe_text = text.strip()
-    if len(safe_text) > 5000:
-        safe_text = safe_text[:5000] #taking only first 5000 characters to avoid long texts and api ratelimits
+    chunks = split_for_speech(text[:TTS_LONG_FORM_MAX_CHARS])
+    if len(chunks) > 1:
+        try:
+            return (await _long_form(chunks, bypass_cache)).url
+        except TTSServiceError as ex:
+            return str(ex)
+    safe_text = chunks[0]
+    error = await _ensure_audio(safe_text, audio_key(safe_text), bypass_cache)
+    if isinstance(error, str):
+        return error
+    return _public_url(_audio_filename(audio_key(safe_text)))
+
+
+async def _ensure_audio(safe_text: str, key: str, bypass_cache: bool) -> Any:
+    """
+    Make sure the audio file for key exists. Returns True for a cache hit, False
+    after a fresh synthesis, or the error string.
+    """
+    if TTS_CACHE_ENABLED:
+        if bypass_cache:
+            _get_cache().record_bypass()
+        else:
+            filename = await _cached_audio(key)
+            if filename:
+                _record_hit(safe_text)
+                return True
+    # Identical concurrent requests share one synthesis (and one output file)
+    error = await singleflight.group("tts").do(key, lambda: _synthesize(safe_text, key))
+    return error if error else False
+
+
+def _split_words(sentence: str, max_chars: int) -> List[str]:
+    pieces = []
+    while len(sentence) > max_chars:
+        cut = sentence.rfind(" ", 0, max_chars + 1)
+        if cut <= 0:
+            cut = max_chars
+        pieces.append(sentence[:cut].strip())
+        sentence = sentence[cut:].strip()
+    if sentence:
+        pieces.append(sentence)
+    return pieces
+
+
+def split_for_speech(text: str, max_chars: Optional[int] = None) -> List[str]:
+    """
+    Split text into normalized chunks of at most max_chars (default TTS_CHUNK_CHARS)
+    on paragraph, then sentence, then word boundaries. Text that fits stays one
+    chunk. A chunk is closed at the first paragraph end once it holds a third of
+    max_chars, so boundaries depend on nearby text only and an edit changes the
+    chunks around it, not every chunk after it.
+    """
+    max_chars = max(1, max_chars or TTS_CHUNK_CHARS)
+    text = unicodedata.normalize("NFC", text or "")
+    whole = " ".join(text.split())
+    if len(whole) <= max_chars:
+        return [whole] if whole else []
+    # (unit, ends a paragraph)
+    units: List[Tuple[str, bool]] = []
+    for paragraph in _PARAGRAPH_RE.split(text):
+        paragraph = " ".join(paragraph.split())
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            units.append((paragraph, True))
+            continue
+        pieces = [p for sentence in _SENTENCE_RE.split(paragraph) for p in _split_words(sentence, max_chars)]
+        units.extend((piece, i == len(pieces) - 1) for i, piece in enumerate(pieces))
+    chunks: List[str] = []
+    current = ""
+    for unit, ends_paragraph in units:
+        if current and len(current) + 1 + len(unit) > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current} {unit}" if current else unit
+        if ends_paragraph and len(current) >= max_chars // 3:
+            chunks.append(current)
+            current = ""
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+async def synthesize_long_form(text: str, bypass_cache: bool = False) -> LongFormSpeech:
+    """
+    Synthesize text of any length (up to TTS_LONG_FORM_MAX_CHARS): chunks are
+    synthesized concurrently, at most TTS_CHUNK_CONCURRENCY at a time, and only
+    chunks without cached audio call the API. Raises TTSServiceError.
+    """
+    if not ELEVENLABS_API_KEY or ELEVENLABS_API_KEY.strip() in ("", "test_dummy"):
+        raise TTSServiceError("ElevenLabs API key missing or invalid. Set ELEVENLABS_API_KEY.")
+    chunks = split_for_speech(text[:TTS_LONG_FORM_MAX_CHARS])
+    if not chunks:
+        raise TTSServiceError("Text to speak must not be empty")
+    return await _long_form(chunks, bypass_cache)
+
+
+async def _long_form(chunks: List[str], bypass_cache: bool) -> LongFormSpeech:
+    global _long_form_requests, _long_form_chunks, _long_form_chunk_hits
+    _long_form_requests += 1
+    keys = [audio_key(chunk) for chunk in chunks]
+    limit = asyncio.Semaphore(max(1, TTS_CHUNK_CONCURRENCY))
+
+    async def one(chunk: str, key: str) -> Any:
+        async with limit:
+            return await _ensure_audio(chunk, key, bypass_cache)
+
+    with stage("tts"):
+        results = await asyncio.gather(*(one(c, k) for c, k in zip(chunks, keys)))
+    errors = [r for r in results if isinstance(r, str)]
+    if errors:
+        raise TTSServiceError(errors[0])
+    cached = sum(1 for r in results if r is True)
+    _long_form_chunks += len(chunks)
+    _long_form_chunk_hits += cached
+    parts = [_audio_filename(k) for k in keys]
+    if len(chunks) == 1:
+        return LongFormSpeech(_public_url(parts[0]), [_public_url(parts[0])], cached)
+
+    # The stitched file is content-addressed by its chunks, so it is reused too
+    key = make_key("tts-long", keys)
+    filename = await _cached_audio(key) if TTS_CACHE_ENABLED and not bypass_cache and cached == len(chunks) else None
+    if filename is None:
+        filename = _audio_filename(key)
+        try:
+            with stage("file_write"):
+                size = await asyncio.to_thread(
+                    _stitch, [os.path.join(AUDIO_DIR, p) for p in parts], os.path.join(AUDIO_DIR, filename)
+                )
+        except OSError as ex:
+            raise TTSServiceError(f"Audio file write error: {str(ex)}") from ex
+        audio_storage.note_write(size)
+        if TTS_CACHE_ENABLED:
+            await _get_cache().set(key, {"filename": filename, "bytes": size}, _INDEX_TTL)
+    return LongFormSpeech(_public_url(filename), [_public_url(p) for p in parts], cached)
+
+
+def _strip_id3(data: bytes) -> bytes:
+    # An ID3v2 tag in the middle of a stream would be played as noise by some decoders
+    if len(data) < 10 or data[:3] != b"ID3":
+        return data
+    size = (data[6] & 0x7F) << 21 | (data[7] & 0x7F) << 14 | (data[8] & 0x7F) << 7 | (data[9] & 0x7F)
+    end = 10 + size + (10 if data[5] & 0x10 else 0)
+    return data[end:]
+
+
+def _stitch(paths: List[str], path: str) -> int:
+    """
+    Concatenate MP3 chunk files into path (atomically); returns the bytes written.
+    The chunk files stay pinned until they have been read.
+    """
+    tmp_path = f"{path}.{uuid.uuid4().hex}.part"
+    for p in paths:
+        audio_storage.pin(p)
+    size = 0
+    try:
+        with audio_storage.pinned(tmp_path), open(tmp_path, "wb") as out:
+            for i, p in enumerate(paths):
+                with open(p, "rb") as f:
+                    data = f.read()
+                if i:
+                    data = _strip_id3(data)
+                out.write(data)
+                size += len(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+    finally:
+        for p in paths:
+            audio_storage.unpin(p)
+    return size
+
+
+def _request_headers() -> Dict[str, str]:
+    return {"xi-api-key": ELEVENLABS_API_KEY or "", "Content-Type": "application/json"}
+
+
+def _request_payload(safe_text: str) -> Dict[str, Any]:
+    return {
+        "text": safe_text,
+        "model_id": ELEVENLABS_MODEL_ID,
+        "voice_settings": ELEVENLABS_VOICE_SETTINGS,
+    }
+
+
+def _write_audio(path: str, data: bytes) -> None:
+    # Write under a unique temp name and rename, so /audio never serves a partial
+    # file and concurrent writers of the same key cannot interleave
+    os.makedirs(AUDIO_DIR, exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.part"
     try:
-        url = f"https://api.elevenlabs.io/v1/text-to-speech/{ELEVENLABS_VOICE_ID}"
-        headers = {"xi-api-key": ELEVENLABS_API_KEY, "Content-Type": "application/json"}
-        payload = {
-            "text": safe_text,
-            "model_id": ELEVENLABS_MODEL_ID,
-            "voice_settings": {"stability": 0.5, "similarity_boost": 0.5},
-        }
-        response = requests.post(url, headers=headers, json=payload, timeout=30)
+        with audio_storage.pinned(tmp_path), open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+
+
+async def _synthesize(safe_text: str, key: str) -> Optional[str]:
+    global _in_flight, _max_in_flight
+    _in_flight += 1
+    _max_in_flight = max(_max_in_flight, _in_flight)
+    try:
+        return await _synthesize_once(safe_text, key)
+    finally:
+        _in_flight -= 1
+
+
+async def _synthesize_once(safe_text: str, key: str) -> Optional[str]:
+    """
+    Synthesize and store the audio file for key. Returns None or the error string.
+    """
+    global _synthesized
+    try:
+        url = f"{ELEVENLABS_API_BASE}/v1/text-to-speech/{ELEVENLABS_VOICE_ID}"
+        with stage("tts"):
+            response = await _get_client().post(url, headers=_request_headers(), json=_request_payload(safe_text))
+        record_upstream("elevenlabs", response.status_code)
         if response.status_code != 200:
             try:
                 err = response.json()
@@ -56,22 +488,203 @@ def text_to_speech(text: str) -> str:
                 err = {"detail": response.text}
             return f"ElevenLabs API error: Unexpected response type: {ctype} {err.get('detail') or ''}".strip()
         audio_data = response.content
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
+        record_upstream("elevenlabs", "error")
         return f"ElevenLabs network error: {str(e)}"
     except Exception as e:
         return f"ElevenLabs API error: {str(e)}"
 
-    # Generate unique filename
-    filename = f"output_{uuid.uuid4().hex}.mp3"
+    filename = _audio_filename(key)
     audio_path = os.path.join(AUDIO_DIR, filename)
-    os.makedirs(AUDIO_DIR, exist_ok=True)
     try:
-        with open(audio_path, "wb") as f:
-            f.write(audio_data)
+        with stage("file_write"):
+            await asyncio.to_thread(_write_audio, audio_path, audio_data)
     except Exception as e:
         return f"Audio file write error: {str(e)}"
+    _synthesized += 1
+    audio_storage.note_write(len(audio_data))
+    if TTS_CACHE_ENABLED:
+        await _get_cache().set(key, {"filename": filename, "bytes": len(audio_data)}, _INDEX_TTL)
+    return None
 
-    public_base = os.getenv("PUBLIC_BASE_URL", "").rstrip("/")
-    if public_base:
-        return f"{public_base}/audio/{filename}"
-    return f"/audio/{filename}"
+
+def register_stream(text: str) -> str:
+    """
+    Remember text for open_registered_stream and return its audio key, so a reply
+    can hand out a playable URL before any audio has been synthesized.
+    """
+    safe_text = _normalize_tts_text(text)
+    key = audio_key(safe_text)
+    _pending.set(key, safe_text, TTS_PENDING_TTL)
+    return key
+
+
+async def open_speech_stream(text: str, bypass_cache: bool = False) -> SpeechStream:
+    """
+    Start streaming synthesis for text (or stream the cached file). Upstream
+    errors are raised as TTSServiceError before any audio is returned.
+    """
+    if not text or not text.strip():
+        raise TTSServiceError("Text to speak must not be empty")
+    safe_text = _normalize_tts_text(text)
+    key = audio_key(safe_text)
+    if TTS_CACHE_ENABLED:
+        if bypass_cache:
+            _get_cache().record_bypass()
+        else:
+            cached = await _cached_stream(key)
+            if cached is not None:
+                _record_hit(safe_text)
+                return cached
+    return await _upstream_stream(key, safe_text)
+
+
+async def open_registered_stream(key: str) -> Optional[SpeechStream]:
+    """
+    Stream the audio for a key from register_stream, from the cache file when it
+    already exists. None when the key is unknown or its text has expired.
+    """
+    if not _KEY_RE.fullmatch(key):
+        return None
+    safe_text = _pending.get(key)
+    cached = await _cached_stream(key)
+    if cached is not None:
+        if safe_text is not None:
+            _record_hit(safe_text)
+        return cached
+    if safe_text is None:
+        return None
+    return await _upstream_stream(key, safe_text)
+
+
+async def _cached_stream(key: str) -> Optional[SpeechStream]:
+    filename = await _cached_audio(key)
+    if filename is None:
+        return None
+    path = os.path.join(AUDIO_DIR, filename)
+    # Pinned until the stream is done, so the storage sweeper cannot remove it mid-read
+    audio_storage.pin(path)
+    try:
+        # Opened here so a file removed in the meantime is a miss, not a broken stream
+        f = await asyncio.to_thread(open, path, "rb")
+    except OSError:
+        audio_storage.unpin(path)
+        return None
+    return SpeechStream(key, _public_url(filename), True, _file_chunks(f, path))
+
+
+async def _file_chunks(f: BinaryIO, path: str) -> AsyncIterator[bytes]:
+    try:
+        while True:
+            chunk = await asyncio.to_thread(f.read, TTS_STREAM_CHUNK_BYTES)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        f.close()
+        audio_storage.unpin(path)
+
+
+async def _upstream_stream(key: str, safe_text: str) -> SpeechStream:
+    if not ELEVENLABS_API_KEY or ELEVENLABS_API_KEY.strip() in ("", "test_dummy"):
+        raise TTSServiceError("ElevenLabs API key missing or invalid. Set ELEVENLABS_API_KEY.")
+    client = _get_client()
+    request = client.build_request(
+        "POST",
+        f"{ELEVENLABS_API_BASE}/v1/text-to-speech/{ELEVENLABS_VOICE_ID}/stream",
+        headers=_request_headers(),
+        json=_request_payload(safe_text),
+    )
+    try:
+        # Headers arrive with the first audio, so this is the time to first byte
+        with stage("tts"):
+            response = await client.send(request, stream=True)
+    except httpx.HTTPError as e:
+        record_upstream("elevenlabs", "error")
+        raise TTSServiceError(f"ElevenLabs network error: {str(e)}") from e
+    record_upstream("elevenlabs", response.status_code)
+    ctype = response.headers.get("Content-Type", "")
+    if response.status_code != 200 or "audio" not in ctype.lower():
+        detail = ""
+        try:
+            await response.aread()
+            detail = response.text[:200]
+        except httpx.HTTPError:
+            pass
+        finally:
+            await response.aclose()
+        raise TTSServiceError(f"ElevenLabs API error ({response.status_code}): {detail}")
+    filename = _audio_filename(key)
+    return SpeechStream(key, _public_url(filename), False, _tee_to_cache(response, key, filename))
+
+
+def _open_part(path: str) -> BinaryIO:
+    os.makedirs(AUDIO_DIR, exist_ok=True)
+    return open(path, "wb")
+
+
+def _finish_part(f: BinaryIO, tmp_path: str, path: Optional[str]) -> None:
+    # Publish the file only when the whole stream arrived; otherwise drop it
+    f.close()
+    if path:
+        os.replace(tmp_path, path)
+    else:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+
+
+async def _tee_to_cache(response: httpx.Response, key: str, filename: str) -> AsyncIterator[bytes]:
+    """
+    Relay upstream chunks while writing them to a .part file that is renamed into
+    the cache once complete. A client disconnect or upstream error leaves no file.
+    """
+    global _in_flight, _max_in_flight, _streams, _synthesized
+    path = os.path.join(AUDIO_DIR, filename)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.part"
+    f: Optional[BinaryIO] = None
+    size = 0
+    complete = False
+    _in_flight += 1
+    _max_in_flight = max(_max_in_flight, _in_flight)
+    _streams += 1
+    audio_storage.pin(tmp_path)
+    try:
+        try:
+            f = await asyncio.to_thread(_open_part, tmp_path)
+        except OSError as ex:
+            # Still stream to the client, just without caching
+            if DEBUG:
+                print(f"[WARN] TTS stream not cached: {ex}", file=sys.stderr)
+        # Relayed as they arrive: re-buffering would delay the first audio
+        async for chunk in response.aiter_bytes():
+            if f is not None:
+                await asyncio.to_thread(f.write, chunk)
+            size += len(chunk)
+            yield chunk
+        complete = size > 0
+    except httpx.HTTPError as ex:
+        # Audio is already flowing: the client gets a truncated file, nothing is cached
+        record_upstream("elevenlabs", "error")
+        if DEBUG:
+            print(f"[WARN] TTS stream interrupted: {ex}", file=sys.stderr)
+    finally:
+        _in_flight -= 1
+        # Starlette cancels the response task on disconnect; finish cleanup regardless
+        with anyio.CancelScope(shield=True):
+            try:
+                await response.aclose()
+                if f is not None:
+                    # The final name is pinned before the .part is released so the
+                    # sweeper never sees the file unprotected mid-rename
+                    with audio_storage.pinned(path):
+                        try:
+                            await asyncio.to_thread(_finish_part, f, tmp_path, path if complete else None)
+                        except OSError:
+                            complete = False
+                        if complete:
+                            _synthesized += 1
+                            audio_storage.note_write(size)
+                            if TTS_CACHE_ENABLED:
+                                await _get_cache().set(key, {"filename": filename, "bytes": size}, _INDEX_TTL)
+            finally:
+                audio_storage.unpin(tmp_path)
@@ -0,0 +1,728 @@
+"""
+Background job-posting ingestion.
+
+Continuously scrapes job URLs from a persistent frontier and stores the parsed
+postings, reusing scrape_job_posting (cache, static tier, browser pool).
+
+- Frontier: SQLite table keyed by canonical URL (the dedup key) holding the
+  URL as submitted (what is fetched), status (pending, in_progress, done,
+  failed), attempt count and next attempt time. URLs left in_progress by
+  a crash are re-queued on start. Done URLs are revisited after
+  INGEST_REVISIT_AFTER seconds when set.
+- Workers: an async pool fed from an in-memory buffer of claimed rows, grouped
+  by host and served round-robin.
+- Politeness per host: at most N concurrent pages, a minimum (jittered)
+  interval between requests (a page the scraper fetched twice, static then
+  browser, is charged two intervals), and a growing cooldown when the host answers
+  429/403/503.
+- Retries: exponential backoff with jitter up to INGEST_MAX_ATTEMPTS; 404/410
+  fail permanently.
+- Results: ingest_jobs table (one row per URL, overwritten on revisit).
+
+Classes:
+- IngestStore(path): frontier + results (blocking; the crawler runs it in a thread)
+- Crawler(store, fetch, ...): start()/stop()/enqueue()/stats()
+"""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import json
+import os
+import random
+import sys
+import threading
+import time
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
+from urllib.parse import urlparse
+
+from sqlalchemy import event, func, inspect
+from sqlalchemy.dialects.sqlite import insert
+from sqlmodel import Field, Session, SQLModel, col, create_engine, select
+
+from app.core import metrics
+
+__all__ = ["IngestStore", "Crawler", "FrontierURL", "IngestedJob"]
+
+DEBUG = os.getenv("DEBUG", "").lower() == "dev"
+
+INGEST_ENABLED = os.getenv("INGEST_ENABLED", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+    "on",
+)
+INGEST_DB_PATH = os.getenv("INGEST_DB_PATH", "./data/ingest.sqlite3")
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "16"))
+INGEST_HOST_CONCURRENCY = int(os.getenv("INGEST_HOST_CONCURRENCY", "2"))
+# Minimum seconds between two requests to the same host (jittered +-20%)
+INGEST_HOST_INTERVAL = float(os.getenv("INGEST_HOST_INTERVAL", "1.0"))
+# First cooldown after a 429/403/503 from a host; doubles up to INGEST_HOST_COOLDOWN_MAX
+INGEST_HOST_COOLDOWN = float(os.getenv("INGEST_HOST_COOLDOWN", "60"))
+INGEST_HOST_COOLDOWN_MAX = float(os.getenv("INGEST_HOST_COOLDOWN_MAX", "900"))
+INGEST_MAX_ATTEMPTS = int(os.getenv("INGEST_MAX_ATTEMPTS", "4"))
+INGEST_BACKOFF_BASE = float(os.getenv("INGEST_BACKOFF_BASE", "30"))
+INGEST_BACKOFF_MAX = float(os.getenv("INGEST_BACKOFF_MAX", "3600"))
+# Re-scrape done URLs after this many seconds (0 = never)
+INGEST_REVISIT_AFTER = float(os.getenv("INGEST_REVISIT_AFTER", "0"))
+
+_THROTTLE_STATUS = {403, 429, 503}
+_PERMANENT_STATUS = {404, 410}
+
+_pages = metrics.Counter(
+    "freelancer_toolkit_ingest_pages_total",
+    "Pages processed by the ingestion crawler by host and outcome",
+    ("host", "outcome"),
+)
+
+
+class FrontierURL(SQLModel, table=True):
+    __tablename__ = "ingest_frontier"
+
+    # Canonical URL (dedup key); fetch_url is the URL as submitted, which is fetched
+    url: str = Field(primary_key=True)
+    fetch_url: str = ""
+    host: str = Field(index=True)
+    status: str = Field(default="pending", index=True)
+    priority: int = 0
+    attempts: int = 0
+    next_attempt_at: float = Field(default=0.0, index=True)
+    last_error: Optional[str] = None
+    added_at: float = 0.0
+    updated_at: float = 0.0
+
+
+class IngestedJob(SQLModel, table=True):
+    __tablename__ = "ingest_jobs"
+
+    url: str = Field(primary_key=True)
+    platform: Optional[str] = Field(default=None, index=True)
+    title: Optional[str] = None
+    description: Optional[str] = None
+    budget: Optional[str] = None
+    timeline: Optional[str] = None
+    skills: str = "[]"
+    location: Optional[str] = None
+    scrape_tier: Optional[str] = None
+    fetched_at: float = Field(default=0.0, index=True)
+
+
+class IngestStore:
+    """
+    Frontier and results in one SQLite file (WAL). Methods are blocking.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.engine = create_engine(
+            f"sqlite:///{path}", connect_args={"check_same_thread": False}
+        )
+
+        @event.listens_for(self.engine, "connect")
+        def _pragmas(conn, _record):
+            cur = conn.cursor()
+            cur.execute("PRAGMA journal_mode=WAL")
+            cur.execute("PRAGMA synchronous=NORMAL")
+            cur.close()
+
+        tables = [
+            SQLModel.metadata.tables[model.__tablename__]
+            for model in (FrontierURL, IngestedJob)
+        ]
+        SQLModel.metadata.create_all(self.engine, tables=tables)
+        # Frontiers created before fetch_url existed
+        columns = {
+            c["name"] for c in inspect(self.engine).get_columns("ingest_frontier")
+        }
+        if "fetch_url" not in columns:
+            with self.engine.begin() as conn:
+                conn.exec_driver_sql(
+                    "ALTER TABLE ingest_frontier ADD COLUMN fetch_url VARCHAR NOT NULL DEFAULT ''"
+                )
+        self._lock = threading.Lock()
+
+    def add_urls(
+        self,
+        urls: Iterable[str],
+        priority: int = 0,
+        key: Optional[Callable[[str], str]] = None,
+    ) -> int:
+        """
+        Insert URLs whose key (default: the URL itself) is not in the frontier yet.
+        The URL is kept as given for fetching. Returns how many were new.
+        """
+        now = time.time()
+        rows = []
+        seen = set()
+        for url in urls:
+            url = (url or "").strip()
+            canonical = key(url) if key is not None and url else url
+            if not canonical or canonical in seen:
+                continue
+            seen.add(canonical)
+            rows.append(
+                {
+                    "url": canonical,
+                    "fetch_url": url,
+                    "host": (urlparse(url).hostname or "").lower(),
+                    "status": "pending",
+                    "priority": priority,
+                    "attempts": 0,
+                    "next_attempt_at": now,
+                    "added_at": now,
+                    "updated_at": now,
+                }
+            )
+        if not rows:
+            return 0
+        with self._lock, Session(self.engine) as session:
+            result = session.connection().execute(
+                insert(FrontierURL).values(rows).on_conflict_do_nothing()
+            )
+            session.commit()
+            return max(0, result.rowcount or 0)
+
+    def requeue_in_progress(self) -> int:
+        """
+        Return URLs left in_progress (e.g. by a crash) to pending.
+        """
+        with self._lock, Session(self.engine) as session:
+            rows = session.exec(
+                select(FrontierURL).where(FrontierURL.status == "in_progress")
+            ).all()
+            for row in rows:
+                row.status = "pending"
+                session.add(row)
+            session.commit()
+            return len(rows)
+
+    def claim(
+        self, limit: int, per_host: int, exclude_hosts: Iterable[str] = ()
+    ) -> List[FrontierURL]:
+        """
+        Mark up to `limit` due pending URLs in_progress and return them, highest
+        priority first, taking at most `per_host` per host so one large site
+        cannot fill the buffer.
+        """
+        now = time.time()
+        exclude_hosts = list(exclude_hosts)
+        rank = (
+            func.row_number()
+            .over(
+                partition_by=FrontierURL.host,
+                order_by=(
+                    col(FrontierURL.priority).desc(),
+                    col(FrontierURL.next_attempt_at),
+                ),
+            )
+            .label("rank")
+        )
+        due = select(
+            FrontierURL.url, FrontierURL.priority, FrontierURL.next_attempt_at, rank
+        ).where(FrontierURL.status == "pending", FrontierURL.next_attempt_at <= now)
+        if exclude_hosts:
+            due = due.where(col(FrontierURL.host).not_in(exclude_hosts))
+        ranked = due.subquery()
+        with self._lock, Session(self.engine) as session:
+            urls = session.exec(
+                select(ranked.c.url)
+                .where(ranked.c.rank <= per_host)
+                .order_by(ranked.c.priority.desc(), ranked.c.next_attempt_at)
+                .limit(limit)
+            ).all()
+            if not urls:
+                return []
+            rows = list(
+                session.exec(
+                    select(FrontierURL).where(col(FrontierURL.url).in_(urls))
+                ).all()
+            )
+            for row in rows:
+                row.status = "in_progress"
+                row.updated_at = now
+                session.add(row)
+            session.commit()
+            for row in rows:
+                session.refresh(row)
+                session.expunge(row)
+            return rows
+
+    def complete(
+        self, url: str, result: Dict[str, Any], revisit_after: float = 0.0
+    ) -> None:
+        now = time.time()
+        with self._lock, Session(self.engine) as session:
+            job = IngestedJob(
+                url=url,
+                platform=result.get("platform"),
+                title=result.get("title"),
+                description=result.get("description"),
+                budget=result.get("budget"),
+                timeline=result.get("timeline"),
+                skills=json.dumps(result.get("skills") or [], ensure_ascii=False),
+                location=result.get("location"),
+                scrape_tier=result.get("scrape_tier"),
+                fetched_at=now,
+            )
+            session.merge(job)
+            row = session.get(FrontierURL, url)
+            if row is not None:
+                row.attempts = 0
+                row.last_error = None
+                row.updated_at = now
+                if revisit_after > 0:
+                    row.status = "pending"
+                    row.next_attempt_at = now + revisit_after
+                else:
+                    row.status = "done"
+                session.add(row)
+            session.commit()
+
+    def fail(
+        self,
+        url: str,
+        error: str,
+        retry_at: Optional[float],
+        count_attempt: bool = True,
+    ) -> None:
+        """
+        Record a failed attempt; retry_at=None marks the URL permanently failed.
+        """
+        now = time.time()
+        with self._lock, Session(self.engine) as session:
+            row = session.get(FrontierURL, url)
+            if row is None:
+                return
+            if count_attempt:
+                row.attempts += 1
+            row.last_error = error[:500]
+            row.updated_at = now
+            if retry_at is None:
+                row.status = "failed"
+            else:
+                row.status = "pending"
+                row.next_attempt_at = retry_at
+            session.add(row)
+            session.commit()
+
+    def defer(self, urls: Iterable[str], until: float) -> None:
+        """
+        Return claimed URLs to pending, not before `until` (host cooldowns).
+        """
+        urls = list(urls)
+        if not urls:
+            return
+        with self._lock, Session(self.engine) as session:
+            for row in session.exec(
+                select(FrontierURL).where(col(FrontierURL.url).in_(urls))
+            ).all():
+                row.status = "pending"
+                row.next_attempt_at = max(row.next_attempt_at, until)
+                session.add(row)
+            session.commit()
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock, Session(self.engine) as session:
+            rows = session.exec(
+                select(FrontierURL.status, func.count()).group_by(FrontierURL.status)
+            ).all()
+            jobs = session.exec(select(func.count()).select_from(IngestedJob)).one()
+        out = {status: int(count) for status, count in rows}
+        out["jobs"] = int(jobs)
+        return out
+
+    def recent_jobs(
+        self, limit: int = 50, platform: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        with self._lock, Session(self.engine) as session:
+            query = (
+                select(IngestedJob)
+                .order_by(col(IngestedJob.fetched_at).desc())
+                .limit(limit)
+            )
+            if platform:
+                query = query.where(IngestedJob.platform == platform)
+            rows = session.exec(query).all()
+            out = []
+            for row in rows:
+                item = row.model_dump()
+                item["skills"] = json.loads(row.skills or "[]")
+                out.append(item)
+            return out
+
+    def close(self) -> None:
+        self.engine.dispose()
+
+
+class _HostState:
+    __slots__ = ("queue", "active", "next_at", "cooldown_until", "cooldown")
+
+    def __init__(self) -> None:
+        self.queue: Deque[FrontierURL] = collections.deque()
+        self.active = 0
+        self.next_at = 0.0
+        self.cooldown_until = 0.0
+        self.cooldown = 0.0
+
+
+class Crawler:
+    def __init__(
+        self,
+        store: IngestStore,
+        fetch: Callable[[str], Awaitable[Dict[str, Any]]],
+        workers: int = INGEST_WORKERS,
+        host_concurrency: int = INGEST_HOST_CONCURRENCY,
+        host_interval: float = INGEST_HOST_INTERVAL,
+        host_cooldown: float = INGEST_HOST_COOLDOWN,
+        host_cooldown_max: float = INGEST_HOST_COOLDOWN_MAX,
+        max_attempts: int = INGEST_MAX_ATTEMPTS,
+        backoff_base: float = INGEST_BACKOFF_BASE,
+        backoff_max: float = INGEST_BACKOFF_MAX,
+        revisit_after: float = INGEST_REVISIT_AFTER,
+        buffer_size: Optional[int] = None,
+    ):
+        self.store = store
+        self.fetch = fetch
+        self.workers = max(1, workers)
+        self.host_concurrency = max(1, host_concurrency)
+        self.host_interval = max(0.0, host_interval)
+        self.host_cooldown = host_cooldown
+        self.host_cooldown_max = host_cooldown_max
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.revisit_after = revisit_after
+        self.buffer_size = buffer_size or self.workers * 8
+
+        self._hosts: Dict[str, _HostState] = {}
+        self._rotation: Deque[str] = collections.deque()
+        self._buffered = 0
+        self._tasks: List[asyncio.Task] = []
+        self._wake: Optional[asyncio.Event] = None
+        self._refill_lock: Optional[asyncio.Lock] = None
+        self._running = False
+        self._completed: Deque[float] = collections.deque()
+
+        self.succeeded = 0
+        self.failed = 0
+        self.retried = 0
+        self.throttled = 0
+        # Requests beyond one per page (static tier fell through to the browser)
+        self.extra_requests = 0
+
+    async def start(self) -> None:
+        if self._running:
+            return
+        self._running = True
+        self._wake = asyncio.Event()
+        self._refill_lock = asyncio.Lock()
+        requeued = await asyncio.to_thread(self.store.requeue_in_progress)
+        if DEBUG and requeued:
+            print(
+                f"[DEBUG] ingest: re-queued {requeued} interrupted URL(s)",
+                file=sys.stderr,
+            )
+        self._tasks = [
+            asyncio.ensure_future(self._worker()) for _ in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """
+        Stop workers (in-flight pages are cancelled) and hand buffered URLs back to the frontier.
+        """
+        self._running = False
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._hosts.clear()
+        self._rotation.clear()
+        self._buffered = 0
+        # Buffered and interrupted URLs are still in_progress in the store
+        await asyncio.to_thread(self.store.requeue_in_progress)
+
+    async def enqueue(
+        self,
+        urls: Iterable[str],
+        priority: int = 0,
+        key: Optional[Callable[[str], str]] = None,
+    ) -> int:
+        added = await asyncio.to_thread(self.store.add_urls, list(urls), priority, key)
+        if added and self._wake is not None:
+            self._wake.set()
+        return added
+
+    # -- scheduling -------------------------------------------------------
+
+    async def _refill(self) -> None:
+        assert self._refill_lock is not None, "start() first"
+        async with self._refill_lock:
+            room = self.buffer_size - self._buffered
+            if room < self.buffer_size // 2:
+                return
+            now = time.monotonic()
+            per_host = self.host_concurrency * 4
+            # Hosts cooling down or already holding a full share are skipped
+            skip = [
+                h
+                for h, st in self._hosts.items()
+                if st.cooldown_until > now or len(st.queue) >= per_host
+            ]
+            rows = await asyncio.to_thread(self.store.claim, room, per_host, skip)
+            for row in rows:
+                state = self._hosts.get(row.host)
+                if state is None:
+                    state = self._hosts[row.host] = _HostState()
+                    self._rotation.append(row.host)
+                state.queue.append(row)
+            self._buffered += len(rows)
+
+    def _pick(self) -> Tuple[Optional[FrontierURL], float]:
+        """
+        Next URL whose host allows a request now, round-robin across hosts.
+        Returns (row, 0) or (None, seconds until some host frees up).
+        """
+        now = time.monotonic()
+        wait = 1.0
+        for _ in range(len(self._rotation)):
+            host = self._rotation[0]
+            self._rotation.rotate(-1)
+            state = self._hosts[host]
+            if not state.queue:
+                if state.active == 0 and now >= state.cooldown_until:
+                    self._rotation.remove(host)
+                    del self._hosts[host]
+                continue
+            if state.active >= self.host_concurrency:
+                continue
+            ready_at = max(state.next_at, state.cooldown_until)
+            if now < ready_at:
+                wait = min(wait, ready_at - now)
+                continue
+            row = state.queue.popleft()
+            self._buffered -= 1
+            state.active += 1
+            state.next_at = now + self.host_interval * random.uniform(0.8, 1.2)
+            return row, 0.0
+        return None, wait
+
+    async def _worker(self) -> None:
+        wake = self._wake
+        assert wake is not None, "start() first"
+        while self._running:
+            row, wait = self._pick()
+            if row is None:
+                await self._refill()
+                row, wait = self._pick()
+            if row is None:
+                wake.clear()
+                try:
+                    await asyncio.wait_for(wake.wait(), timeout=max(0.01, wait))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            try:
+                await self._process(row)
+            finally:
+                state = self._hosts.get(row.host)
+                if state is not None:
+                    state.active -= 1
+                wake.set()
+
+    # -- processing -------------------------------------------------------
+
+    def _retry_at(self, attempts: int) -> Optional[float]:
+        if attempts + 1 >= self.max_attempts:
+            return None
+        delay = min(self.backoff_max, self.backoff_base * (2**attempts))
+        return time.time() + random.uniform(delay / 2, delay)
+
+    def _charge_host(self, host: str, requests: int) -> None:
+        """
+        _pick() reserved one interval for the page; push the host's next slot out
+        by one more per extra request the fetch made, and at least one interval
+        past the last of them.
+        """
+        state = self._hosts.get(host)
+        if state is None or requests <= 1 or self.host_interval <= 0:
+            return
+        extra = self.host_interval * (requests - 1) * random.uniform(0.8, 1.2)
+        state.next_at = max(
+            state.next_at + extra, time.monotonic() + self.host_interval
+        )
+        self.extra_requests += requests - 1
+
+    async def _throttle_host(self, host: str) -> float:
+        """
+        Start (or double) the host's cooldown and hand its buffered URLs back to
+        the frontier so they do not hold buffer slots. Returns the cooldown end (wall clock).
+        """
+        state = self._hosts.get(host)
+        if state is None:
+            return time.time() + self.host_cooldown
+        state.cooldown = min(
+            self.host_cooldown_max,
+            state.cooldown * 2 if state.cooldown else self.host_cooldown,
+        )
+        state.cooldown_until = time.monotonic() + state.cooldown
+        self.throttled += 1
+        until = time.time() + state.cooldown
+        deferred = [row.url for row in state.queue]
+        state.queue.clear()
+        self._buffered -= len(deferred)
+        await asyncio.to_thread(self.store.defer, deferred, until)
+        return until
+
+    async def _process(self, row: FrontierURL) -> None:
+        try:
+            result = await self.fetch(row.fetch_url or row.url)
+        except asyncio.CancelledError:
+            raise
+        except Exception as ex:
+            await self._record_failure(
+                row, f"{type(ex).__name__}: {ex}", permanent=False
+            )
+            return
+        self._charge_host(row.host, int(result.get("page_requests") or 1))
+        status = int(result.get("http_status") or 200)
+        if status in _THROTTLE_STATUS:
+            until = await self._throttle_host(row.host)
+            # A throttled attempt does not count against the URL
+            await asyncio.to_thread(
+                self.store.fail, row.url, f"HTTP {status}", until, False
+            )
+            self.retried += 1
+            _pages.inc(host=row.host, outcome="throttled")
+            return
+        if status >= 400 or not result.get("description"):
+            error = f"HTTP {status}" if status >= 400 else "empty description"
+            await self._record_failure(
+                row, error, permanent=status in _PERMANENT_STATUS
+            )
+            return
+        state = self._hosts.get(row.host)
+        if state is not None:
+            state.cooldown = 0.0
+        await asyncio.to_thread(
+            self.store.complete, row.url, result, self.revisit_after
+        )
+        self.succeeded += 1
+        self._completed.append(time.monotonic())
+        _pages.inc(host=row.host, outcome="ok")
+
+    async def _record_failure(
+        self, row: FrontierURL, error: str, permanent: bool
+    ) -> None:
+        retry_at = None if permanent else self._retry_at(row.attempts)
+        if retry_at is None:
+            self.failed += 1
+            _pages.inc(host=row.host, outcome="failed")
+        else:
+            self.retried += 1
+            _pages.inc(host=row.host, outcome="retry")
+        if DEBUG:
+            print(f"[DEBUG] ingest: {row.url} failed ({error})", file=sys.stderr)
+        await asyncio.to_thread(self.store.fail, row.url, error, retry_at)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        while self._completed and now - self._completed[0] > 60:
+            self._completed.popleft()
+        return {
+            "running": self._running,
+            "workers": self.workers,
+            "buffered": self._buffered,
+            "active": sum(s.active for s in self._hosts.values()),
+            "hosts": {
+                host: {
+                    "queued": len(s.queue),
+                    "active": s.active,
+                    "cooldown_s": round(max(0.0, s.cooldown_until - now), 1),
+                }
+                for host, s in self._hosts.items()
+            },
+            "pages_last_minute": len(self._completed),
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "retried": self.retried,
+            "throttled": self.throttled,
+            "extra_requests": self.extra_requests,
+        }
+
+
+# -- process-wide crawler (started from the app lifespan when INGEST_ENABLED) --
+
+_store: Optional[IngestStore] = None
+_crawler: Optional[Crawler] = None
+
+
+def _get_store() -> IngestStore:
+    global _store
+    if _store is None:
+        _store = IngestStore(INGEST_DB_PATH)
+    return _store
+
+
+async def _fetch(url: str) -> Dict[str, Any]:
+    from app.services.scraper import scrape_job_posting
+
+    # Ingestion wants the page as it is now, not a cached copy
+    return await scrape_job_posting(url, force_refresh=True)
+
+
+async def startup() -> None:
+    global _crawler
+    if not INGEST_ENABLED or _crawler is not None:
+        return
+    _crawler = Crawler(_get_store(), _fetch)
+    await _crawler.start()
+
+
+async def shutdown() -> None:
+    global _crawler, _store
+    if _crawler is not None:
+        await _crawler.stop()
+        _crawler = None
+    if _store is not None:
+        _store.close()
+        _store = None
+
+
+async def enqueue_urls(urls: Iterable[str], priority: int = 0) -> int:
+    """
+    Add job URLs to the frontier, deduplicated by canonical URL and fetched as
+    given. Returns how many were new.
+    """
+    from app.services.scraper import canonicalize_job_url
+
+    urls = [u for u in urls if u and u.strip()]
+    if _crawler is not None:
+        return await _crawler.enqueue(urls, priority, canonicalize_job_url)
+    return await asyncio.to_thread(
+        _get_store().add_urls, urls, priority, canonicalize_job_url
+    )
+
+
+async def stats() -> Dict[str, Any]:
+    counts = await asyncio.to_thread(_get_store().counts)
+    crawler = _crawler.stats() if _crawler is not None else {"running": False}
+    return {"enabled": INGEST_ENABLED, "frontier": counts, "crawler": crawler}
+
+
+async def recent_jobs(
+    limit: int = 50, platform: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    return await asyncio.to_thread(_get_store().recent_jobs, limit, platform)
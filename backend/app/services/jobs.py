@@ -0,0 +1,463 @@
+"""
+Asynchronous jobs for slow pipelines (job URL scrape + LLM).
+
+The API accepts the request, answers 202 with a job id and runs the work on a
+bounded worker pool, so request handlers, proxies and client timeouts are no
+longer tied to scrape and upstream latency. Clients poll (or long-poll) the
+job's status, or pass a callback URL.
+
+- JobStore(max_jobs, ttl): bounded in-memory job table. Finished jobs expire
+  ttl seconds after finishing; when the table is full the oldest finished jobs
+  are evicted first, and new jobs are refused only when every slot holds
+  unfinished work.
+- JobRunner(store, workers, queue_size, ...): worker tasks fed from a bounded
+  queue; start()/stop()/submit()/wait()/stats(). A job's work is a coroutine
+  factory; its exceptions become {status_code, detail} errors (HTTPException
+  attributes are kept, anything else is a 500).
+- Callbacks: a job's final status is POSTed as JSON to its callback_url,
+  retried with backoff and signed (X-Toolkit-Signature: sha256=<hmac>) when
+  JOBS_CALLBACK_SECRET is set. The host is resolved before every attempt and
+  the delivery fails when it points at a private address.
+
+Jobs live in process memory: a restart loses them, and with several uvicorn
+workers a job is only visible on the worker that accepted it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import contextvars
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+
+from app.core import metrics
+from app.core.metrics import record_upstream
+from app.core.utils import check_callback_host
+
+__all__ = ["Job", "JobStore", "JobRunner", "JobsUnavailable"]
+
+DEBUG = os.getenv("DEBUG", "").lower() == "dev"
+
+JOBS_WORKERS = int(os.getenv("JOBS_WORKERS", "8"))
+JOBS_QUEUE_SIZE = int(os.getenv("JOBS_QUEUE_SIZE", "500"))
+JOBS_MAX_ENTRIES = int(os.getenv("JOBS_MAX_ENTRIES", "5000"))
+# Seconds a finished job (and its result) stays retrievable
+JOBS_RESULT_TTL = float(os.getenv("JOBS_RESULT_TTL", "3600"))
+# Upper bound for ?wait= long-polls
+JOBS_MAX_WAIT = float(os.getenv("JOBS_MAX_WAIT", "30"))
+JOBS_CALLBACK_TIMEOUT = float(os.getenv("JOBS_CALLBACK_TIMEOUT", "10"))
+JOBS_CALLBACK_ATTEMPTS = int(os.getenv("JOBS_CALLBACK_ATTEMPTS", "3"))
+JOBS_CALLBACK_SECRET = os.getenv("JOBS_CALLBACK_SECRET", "")
+
+_jobs_finished = metrics.Counter(
+    "freelancer_toolkit_jobs_total",
+    "Async jobs by kind and final status",
+    ("kind", "status"),
+)
+
+
+class JobsUnavailable(RuntimeError):
+    """
+    The queue or the job table is full (or the runner is stopping).
+    """
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    created_at: float
+    status: str = "queued"  # queued | running | succeeded | failed
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Any = None
+    error: Optional[Dict[str, Any]] = None
+    callback_url: Optional[str] = None
+    # {"status": pending | delivered | failed, "attempts": n, "last_status": http status or None}
+    callback: Optional[Dict[str, Any]] = None
+    work: Optional[Callable[[], Awaitable[Any]]] = field(default=None, repr=False)
+    done: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+            "callback": self.callback,
+        }
+
+
+class JobStore:
+    def __init__(
+        self,
+        max_jobs: int = 5000,
+        ttl: float = 3600.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.max_jobs = max(1, max_jobs)
+        self.ttl = ttl
+        self._clock = clock
+        self._jobs: Dict[str, Job] = {}
+        # Finished job ids, oldest finish first
+        self._finished: "collections.OrderedDict[str, float]" = (
+            collections.OrderedDict()
+        )
+        self.expired = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def add(self, job: Job) -> None:
+        self.sweep()
+        if len(self._jobs) >= self.max_jobs and self._finished:
+            job_id, _ = self._finished.popitem(last=False)
+            self._jobs.pop(job_id, None)
+            self.evicted += 1
+        if len(self._jobs) >= self.max_jobs:
+            raise JobsUnavailable("job table full")
+        self._jobs[job.id] = job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self.sweep()
+        return self._jobs.get(job_id)
+
+    def discard(self, job_id: str) -> None:
+        self._jobs.pop(job_id, None)
+        self._finished.pop(job_id, None)
+
+    def mark_finished(self, job: Job) -> None:
+        self._finished[job.id] = job.finished_at or self._clock()
+
+    def sweep(self) -> None:
+        cutoff = self._clock() - self.ttl
+        while self._finished:
+            job_id, finished_at = next(iter(self._finished.items()))
+            if finished_at > cutoff:
+                break
+            self._finished.popitem(last=False)
+            self._jobs.pop(job_id, None)
+            self.expired += 1
+
+    def stats(self) -> Dict[str, Any]:
+        self.sweep()
+        by_status = collections.Counter(job.status for job in self._jobs.values())
+        return {
+            "jobs": len(self._jobs),
+            "max_jobs": self.max_jobs,
+            "by_status": dict(by_status),
+            "expired": self.expired,
+            "evicted": self.evicted,
+        }
+
+
+class JobRunner:
+    def __init__(
+        self,
+        store: JobStore,
+        workers: int = 8,
+        queue_size: int = 500,
+        callback_timeout: float = 10.0,
+        callback_attempts: int = 3,
+        callback_secret: str = "",
+        callback_backoff: float = 1.0,
+    ):
+        self.store = store
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.callback_timeout = callback_timeout
+        self.callback_attempts = max(1, callback_attempts)
+        self.callback_secret = callback_secret
+        self.callback_backoff = callback_backoff
+
+        self._queue: Optional["asyncio.Queue[Job]"] = None
+        self._tasks: list = []
+        self._callbacks: set = set()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._running = False
+        self._active = 0
+
+        self.submitted = 0
+        self.rejected = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.callbacks_delivered = 0
+        self.callbacks_failed = 0
+
+    async def start(self) -> None:
+        if self._running:
+            return
+        self._running = True
+        self._queue = asyncio.Queue(self.queue_size)
+        # Workers run in an empty context so a lazy start from inside a request
+        # does not attribute job stages to that request's metrics
+        self._tasks = [
+            contextvars.Context().run(asyncio.ensure_future, self._worker())
+            for _ in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """
+        Cancel workers and pending callbacks; queued and running jobs fail with 503.
+        """
+        self._running = False
+        for task in [*self._tasks, *self._callbacks]:
+            task.cancel()
+        await asyncio.gather(*self._tasks, *self._callbacks, return_exceptions=True)
+        self._tasks = []
+        self._callbacks.clear()
+        if self._queue is not None:
+            while not self._queue.empty():
+                self._finish(
+                    self._queue.get_nowait(),
+                    error={"status_code": 503, "detail": "Server shutting down"},
+                )
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def submit(
+        self,
+        kind: str,
+        work: Callable[[], Awaitable[Any]],
+        callback_url: Optional[str] = None,
+    ) -> Job:
+        """
+        Queue work and return its job immediately. Raises JobsUnavailable when full.
+        """
+        if not self._running or self._queue is None:
+            raise JobsUnavailable("job runner not running")
+        job = Job(
+            id=secrets.token_urlsafe(16),
+            kind=kind,
+            created_at=time.time(),
+            callback_url=callback_url,
+            callback=(
+                {"status": "pending", "attempts": 0, "last_status": None}
+                if callback_url
+                else None
+            ),
+            work=work,
+        )
+        try:
+            self.store.add(job)
+        except JobsUnavailable:
+            self.rejected += 1
+            raise
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.store.discard(job.id)
+            self.rejected += 1
+            raise JobsUnavailable("job queue full") from None
+        self.submitted += 1
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.store.get(job_id)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Job]:
+        """
+        The job once finished, or as it stands after timeout seconds (long-poll).
+        """
+        job = self.store.get(job_id)
+        if job is not None and not job.finished and timeout > 0:
+            try:
+                await asyncio.wait_for(job.done.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return job
+
+    async def _worker(self) -> None:
+        assert self._queue is not None
+        while True:
+            job = await self._queue.get()
+            self._active += 1
+            try:
+                await self._run(job)
+            finally:
+                self._active -= 1
+
+    async def _run(self, job: Job) -> None:
+        job.status = "running"
+        job.started_at = time.time()
+        work, job.work = job.work, None
+        assert work is not None, "job already ran"
+        try:
+            result = await work()
+        except asyncio.CancelledError:
+            self._finish(
+                job, error={"status_code": 503, "detail": "Server shutting down"}
+            )
+            raise
+        except Exception as ex:
+            detail = getattr(ex, "detail", None) or str(ex) or type(ex).__name__
+            status_code = getattr(ex, "status_code", None)
+            self._finish(
+                job,
+                error={
+                    "status_code": status_code if isinstance(status_code, int) else 500,
+                    "detail": str(detail),
+                },
+            )
+            if DEBUG and not isinstance(status_code, int):
+                print(
+                    f"[WARN] job {job.id} ({job.kind}) failed: {ex!r}", file=sys.stderr
+                )
+        else:
+            self._finish(job, result=result)
+
+    def _finish(
+        self, job: Job, result: Any = None, error: Optional[Dict[str, Any]] = None
+    ) -> None:
+        job.finished_at = time.time()
+        if error is None:
+            job.status, job.result = "succeeded", result
+            self.succeeded += 1
+        else:
+            job.status, job.error = "failed", error
+            self.failed += 1
+        job.work = None
+        self.store.mark_finished(job)
+        _jobs_finished.inc(kind=job.kind, status=job.status)
+        job.done.set()
+        if job.callback_url and self._running:
+            task = asyncio.ensure_future(self._deliver(job, job.callback_url))
+            self._callbacks.add(task)
+            task.add_done_callback(self._callbacks.discard)
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(
+                    self.callback_timeout, connect=min(5.0, self.callback_timeout)
+                ),
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=5),
+                follow_redirects=False,
+            )
+        return self._client
+
+    async def _deliver(self, job: Job, url: str) -> None:
+        body = json.dumps(job.to_dict(), ensure_ascii=False, default=str).encode(
+            "utf-8"
+        )
+        headers = {"Content-Type": "application/json", "X-Toolkit-Job-Id": job.id}
+        if self.callback_secret:
+            digest = hmac.new(
+                self.callback_secret.encode("utf-8"), body, hashlib.sha256
+            ).hexdigest()
+            headers["X-Toolkit-Signature"] = f"sha256={digest}"
+        callback = job.callback if job.callback is not None else {}
+        for attempt in range(1, self.callback_attempts + 1):
+            callback["attempts"] = attempt
+            try:
+                await check_callback_host(url)
+                resp = await self._get_client().post(url, content=body, headers=headers)
+                callback["last_status"] = resp.status_code
+                record_upstream("job_callback", resp.status_code)
+                if resp.status_code < 300:
+                    callback["status"] = "delivered"
+                    self.callbacks_delivered += 1
+                    return
+                # Client errors other than throttling will not change on retry
+                if 400 <= resp.status_code < 500 and resp.status_code not in (408, 429):
+                    break
+            except ValueError as ex:
+                record_upstream("job_callback", "refused")
+                if DEBUG:
+                    print(f"[WARN] job {job.id} callback refused: {ex}", file=sys.stderr)
+                break
+            except (httpx.HTTPError, OSError) as ex:
+                # OSError: the host lookup failed, retried like a network error
+                record_upstream("job_callback", "error")
+                if DEBUG:
+                    print(
+                        f"[WARN] job {job.id} callback attempt {attempt} failed: {ex}",
+                        file=sys.stderr,
+                    )
+            if attempt < self.callback_attempts:
+                await asyncio.sleep(self.callback_backoff * 2 ** (attempt - 1))
+        callback["status"] = "failed"
+        self.callbacks_failed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._running,
+            "workers": self.workers,
+            "active": self._active,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "queue_size": self.queue_size,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "callbacks_delivered": self.callbacks_delivered,
+            "callbacks_failed": self.callbacks_failed,
+            "store": self.store.stats(),
+        }
+
+
+# -- process-wide runner (started from the app lifespan) ----------------------
+
+_runner: Optional[JobRunner] = None
+
+
+def _get_runner() -> JobRunner:
+    global _runner
+    if _runner is None:
+        _runner = JobRunner(
+            JobStore(JOBS_MAX_ENTRIES, JOBS_RESULT_TTL),
+            workers=JOBS_WORKERS,
+            queue_size=JOBS_QUEUE_SIZE,
+            callback_timeout=JOBS_CALLBACK_TIMEOUT,
+            callback_attempts=JOBS_CALLBACK_ATTEMPTS,
+            callback_secret=JOBS_CALLBACK_SECRET,
+        )
+    return _runner
+
+
+async def startup() -> None:
+    await _get_runner().start()
+
+
+async def shutdown() -> None:
+    global _runner
+    if _runner is not None:
+        await _runner.stop()
+        _runner = None
+
+
+async def submit(
+    kind: str, work: Callable[[], Awaitable[Any]], callback_url: Optional[str] = None
+) -> Job:
+    runner = _get_runner()
+    # Started lazily when the app runs without its lifespan (e.g. some test clients)
+    await runner.start()
+    return runner.submit(kind, work, callback_url)
+
+
+async def wait(job_id: str, timeout: float = 0.0) -> Optional[Job]:
+    return await _get_runner().wait(job_id, min(max(0.0, timeout), JOBS_MAX_WAIT))
+
+
+def stats() -> Dict[str, Any]:
+    return _get_runner().stats()
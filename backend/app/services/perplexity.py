@@ -1,47 +1,228 @@
 import os
 import sys
+import json
+import importlib.util
+from typing import AsyncIterator, Optional
 import httpx
 from dotenv import load_dotenv
+from app.core.metrics import record_upstream
+from app.services.cache import LRUCache, SQLiteCache, TieredCache, make_key
+from app.services import singleflight
+from app.services.scheduler import UpstreamScheduler
 
 load_dotenv()
 # using Gemini 2.5 Flash model from Google AI in development
 # preplexity.ai is not reliable and often returns errors but we will use in production
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent"
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+# Override the base to point at a local stand-in (see bench/fakes.py)
+GEMINI_API_BASE = os.getenv("GEMINI_API_BASE", "https://generativelanguage.googleapis.com").rstrip("/")
+GEMINI_API_URL = f"{GEMINI_API_BASE}/v1beta/models/{GEMINI_MODEL}:generateContent"
+GEMINI_STREAM_URL = f"{GEMINI_API_BASE}/v1beta/models/{GEMINI_MODEL}:streamGenerateContent"
 DEBUG = os.getenv("DEBUG", "").lower() ==  "dev"
 
+# Shared connection pool settings (one client per process, see main.py lifespan)
+GEMINI_MAX_CONNECTIONS = int(os.getenv("GEMINI_MAX_CONNECTIONS", "20"))
+GEMINI_MAX_KEEPALIVE = int(os.getenv("GEMINI_MAX_KEEPALIVE", "10"))
+GEMINI_KEEPALIVE_EXPIRY = float(os.getenv("GEMINI_KEEPALIVE_EXPIRY", "60"))
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "45"))
+# HTTP/2 needs the optional `h2` package (httpx[http2]); fall back to HTTP/1.1 without it
+GEMINI_HTTP2 = (
+    os.getenv("GEMINI_HTTP2", "true").lower() in ("1", "true", "yes", "on")
+    and importlib.util.find_spec("h2") is not None
+)
 
-async def _post_to_gemini(payload: dict) -> str:
+# Scheduler in front of the client: rate limit, concurrency cap, priority lanes, retries
+GEMINI_RATE_PER_SEC = float(os.getenv("GEMINI_RATE_PER_SEC", "5"))
+GEMINI_BURST = int(os.getenv("GEMINI_BURST", "10"))
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
+GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "3"))
+GEMINI_BACKOFF_BASE = float(os.getenv("GEMINI_BACKOFF_BASE", "0.5"))
+GEMINI_BACKOFF_MAX = float(os.getenv("GEMINI_BACKOFF_MAX", "20"))
+
+# Completion cache: identical (model, payload) pairs are answered locally
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes", "on")
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "512"))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+LLM_CACHE_SQLITE_PATH = os.getenv("LLM_CACHE_SQLITE_PATH", "").strip()
+LLM_CACHE_SQLITE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_SQLITE_MAX_ENTRIES", "10000"))
+# Per-endpoint TTLs in seconds (0 disables caching for that endpoint)
+LLM_CACHE_TTLS = {
+    "proposal": float(os.getenv("LLM_CACHE_TTL_PROPOSAL", "3600")),
+    "text": float(os.getenv("LLM_CACHE_TTL_TEXT", "3600")),
+}
+# Error strings returned by _post_to_gemini; never cached
+AI_RATE_LIMITED = "AI rate limit error"
+_ERROR_RESULTS = {"AI configuration error", "AI service error", "AI response format error.", AI_RATE_LIMITED}
+
+
+class AIServiceError(Exception):
+    """
+    Raised by streaming helpers, which cannot return an error string mid-stream.
+    """
+
+
+_client: Optional[httpx.AsyncClient] = None
+_cache: Optional[TieredCache] = None
+_scheduler = UpstreamScheduler(
+    "gemini",
+    rate_per_sec=GEMINI_RATE_PER_SEC,
+    burst=GEMINI_BURST,
+    max_concurrency=GEMINI_MAX_CONCURRENCY,
+    max_retries=GEMINI_MAX_RETRIES,
+    backoff_base=GEMINI_BACKOFF_BASE,
+    backoff_max=GEMINI_BACKOFF_MAX,
+)
+
+
+def _build_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        http2=GEMINI_HTTP2,
+        timeout=httpx.Timeout(GEMINI_TIMEOUT, connect=10.0),
+        limits=httpx.Limits(
+            max_connections=GEMINI_MAX_CONNECTIONS,
+            max_keepalive_connections=GEMINI_MAX_KEEPALIVE,
+            keepalive_expiry=GEMINI_KEEPALIVE_EXPIRY,
+        ),
+    )
+
+
+async def startup() -> None:
+    """
+    Create the shared Gemini client. Called from the app lifespan.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+
+
+async def shutdown() -> None:
+    """
+    Close the shared Gemini client and release pooled connections.
+    """
+    global _client, _cache
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+    if _cache is not None:
+        _cache.close()
+        _cache = None
+
+
+def _get_cache() -> TieredCache:
+    global _cache
+    if _cache is None:
+        disk = None
+        if LLM_CACHE_SQLITE_PATH:
+            try:
+                disk = SQLiteCache(LLM_CACHE_SQLITE_PATH, "llm", LLM_CACHE_SQLITE_MAX_ENTRIES)
+            except Exception as ex:
+                if DEBUG:
+                    print(f"[WARN] LLM cache SQLite tier disabled: {ex}", file=sys.stderr)
+        _cache = TieredCache("llm", LRUCache(LLM_CACHE_MAX_ENTRIES, LLM_CACHE_MAX_BYTES), disk)
+    return _cache
+
+
+def cache_stats() -> dict:
+    """
+    Hit/miss counters and sizes for the completion cache.
+    """
+    return {"enabled": LLM_CACHE_ENABLED, **_get_cache().stats()}
+
+
+def scheduler_stats() -> dict:
+    """
+    Queue depth per lane, wait times and retry/throttle counters for Gemini calls.
+    """
+    return _scheduler.stats()
+
+
+def _get_client() -> httpx.AsyncClient:
+    # Lazily create the client when the lifespan hook did not run (scripts, bare TestClient)
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+
+async def _post_to_gemini(payload: dict, lane: str = "default") -> str:
     """
     Low-level POST helper. Returns the text output or an error string.
+    Identical concurrent payloads in the same lane share one upstream call; calls
+    are paced by the scheduler in the given priority lane (interactive | default |
+    batch). The lane is part of the key so an interactive caller never waits
+    behind a batch call queued for the same payload.
     """
+    return await singleflight.group("gemini").do(
+        make_key(GEMINI_MODEL, lane, payload), lambda: _post_to_gemini_once(payload, lane)
+    )
+
+
+async def _post_to_gemini_once(payload: dict, lane: str) -> str:
     if not GEMINI_API_KEY:
         if DEBUG:
             print("[ERROR] Gemini API key not found.", file=sys.stderr)
         return "AI configuration error"
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(
-            f"{GEMINI_API_URL}?key={GEMINI_API_KEY}", json=payload, timeout=45.0
+    try:
+        resp = await _scheduler.request(
+            lambda: _get_client().post(f"{GEMINI_API_URL}?key={GEMINI_API_KEY}", json=payload),
+            lane,
         )
+    except httpx.HTTPError as ex:
+        record_upstream("gemini", "error")
         if DEBUG:
-            print(f"[DEBUG] Gemini API response status: {resp.status_code}", file=sys.stderr)
-        if resp.status_code != 200:
-            if DEBUG:
-                print(f"[ERROR] Gemini API error: {resp.text}", file=sys.stderr)
-            return "AI service error"
-        data = resp.json()
-        try:
-            text = data["candidates"][0]["content"]["parts"][0]["text"]
-        except Exception as ex:
-            if DEBUG:
-                print(f"[ERROR] Gemini API response format error: {ex}", file=sys.stderr)
-            return "AI response format error."
+            print(f"[ERROR] Gemini API network error: {ex}", file=sys.stderr)
+        return "AI service error"
+    record_upstream("gemini", resp.status_code)
+    if DEBUG:
+        print(f"[DEBUG] Gemini API response status: {resp.status_code} ({resp.http_version})", file=sys.stderr)
+    if resp.status_code != 200:
+        if DEBUG:
+            print(f"[ERROR] Gemini API error: {resp.text}", file=sys.stderr)
+        if resp.status_code == 429:
+            return AI_RATE_LIMITED
+        return "AI service error"
+    data = resp.json()
+    try:
+        text = data["candidates"][0]["content"]["parts"][0]["text"]
+    except Exception as ex:
         if DEBUG:
-            print(f"[DEBUG] Gemini API response text length: {len(text)}", file=sys.stderr)
-        return text
+            print(f"[ERROR] Gemini API response format error: {ex}", file=sys.stderr)
+        return "AI response format error."
+    if DEBUG:
+        print(f"[DEBUG] Gemini API response text length: {len(text)}", file=sys.stderr)
+    return text
 
 
-async def get_proposal_completion_json(prompt: str) -> str:
+async def _cached_completion(
+    payload: dict, endpoint: str, bypass_cache: bool = False, lane: str = "default"
+) -> str:
+    """
+    Serve a completion from the cache when possible, otherwise call Gemini and
+    store successful results under the endpoint's TTL.
+    """
+    ttl = LLM_CACHE_TTLS.get(endpoint, 0.0)
+    if not LLM_CACHE_ENABLED or ttl <= 0:
+        return await _post_to_gemini(payload, lane)
+    cache = _get_cache()
+    key = make_key(GEMINI_MODEL, payload)
+    if bypass_cache:
+        cache.record_bypass()
+    else:
+        cached = await cache.get(key)
+        if cached is not None:
+            if DEBUG:
+                print(f"[DEBUG] LLM cache hit ({endpoint})", file=sys.stderr)
+            return cached
+    text = await _post_to_gemini(payload, lane)
+    if text and text not in _ERROR_RESULTS:
+        await cache.set(key, text, ttl)
+    return text
+
+
+async def get_proposal_completion_json(
+    prompt: str, bypass_cache: bool = False, lane: str = "batch"
+) -> str:
     """
     Get a STRICT JSON response for proposals with the required keys:
     - proposal_text (string)
@@ -62,15 +243,10 @@ async def get_proposal_completion_json(prompt: str) -> str:
         "contents": [{"parts": [{"text": full_prompt}]}],
         "generationConfig": {"response_mime_type": "application/json"},
     }
-    return await _post_to_gemini(payload)
+    return await _cached_completion(payload, "proposal", bypass_cache, lane)
 
 
-async def get_text_completion(prompt: str, markdown: bool = True) -> str:
-    """
-    Get a plain text (or Markdown) response suitable for contracts or free-form content.
-    When markdown=True, instructs the model to produce clean, well-structured Markdown
-    without code fences, suitable for direct rendering and download as .md.
-    """
+def _text_payload(prompt: str, markdown: bool) -> dict:
     style_instruction = (
         "Return a well-structured, professional Markdown document suitable for download as a .md file. "
         "Do NOT use code fences. Use headings, bullet lists, numbered lists, and clear sections."
@@ -82,7 +258,89 @@ async def get_text_completion(prompt: str, markdown: bool = True) -> str:
         "contents": [{"parts": [{"text": full_prompt}]}],
         # Let the model output text by default; no enforced JSON mime type.
     }
-    return await _post_to_gemini(payload)
+    return payload
+
+
+async def get_text_completion(
+    prompt: str, markdown: bool = True, bypass_cache: bool = False, lane: str = "default"
+) -> str:
+    """
+    Get a plain text (or Markdown) response suitable for contracts or free-form content.
+    When markdown=True, instructs the model to produce clean, well-structured Markdown
+    without code fences, suitable for direct rendering and download as .md.
+    """
+    return await _cached_completion(_text_payload(prompt, markdown), "text", bypass_cache, lane)
+
+
+async def stream_text_completion(
+    prompt: str, markdown: bool = True, bypass_cache: bool = False, lane: str = "default"
+) -> AsyncIterator[str]:
+    """
+    Stream a text completion chunk by chunk via Gemini's streamGenerateContent (SSE).
+    Shares cache entries with get_text_completion: a hit is yielded as one chunk and
+    a completed stream is stored. Raises AIServiceError on upstream failures.
+    """
+    if not GEMINI_API_KEY:
+        if DEBUG:
+            print("[ERROR] Gemini API key not found.", file=sys.stderr)
+        raise AIServiceError("AI configuration error")
+    payload = _text_payload(prompt, markdown)
+    ttl = LLM_CACHE_TTLS.get("text", 0.0)
+    use_cache = LLM_CACHE_ENABLED and ttl > 0
+    key = make_key(GEMINI_MODEL, payload)
+    if use_cache:
+        if bypass_cache:
+            _get_cache().record_bypass()
+        else:
+            cached = await _get_cache().get(key)
+            if cached is not None:
+                yield cached
+                return
+
+    client = _get_client()
+
+    async def _open_stream() -> httpx.Response:
+        request = client.build_request(
+            "POST", f"{GEMINI_STREAM_URL}?alt=sse&key={GEMINI_API_KEY}", json=payload
+        )
+        return await client.send(request, stream=True)
+
+    parts = []
+    try:
+        # The scheduler slot is held for the whole stream; only opening the
+        # stream is retried, never a stream that already produced text.
+        async with _scheduler.hold(_open_stream, lane) as resp:
+            record_upstream("gemini", resp.status_code)
+            if resp.status_code != 200:
+                body = await resp.aread()
+                if DEBUG:
+                    print(f"[ERROR] Gemini stream error {resp.status_code}: {body[:500]!r}", file=sys.stderr)
+                raise AIServiceError(AI_RATE_LIMITED if resp.status_code == 429 else "AI service error")
+            async for line in resp.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                try:
+                    data = json.loads(line[5:].strip())
+                    chunk_parts = data["candidates"][0]["content"]["parts"]
+                except Exception:
+                    # Keep-alives and metadata-only events carry no text
+                    continue
+                text = "".join(p.get("text", "") for p in chunk_parts if isinstance(p, dict))
+                if text:
+                    parts.append(text)
+                    yield text
+    except httpx.HTTPError as ex:
+        record_upstream("gemini", "error")
+        if DEBUG:
+            print(f"[ERROR] Gemini stream network error: {ex}", file=sys.stderr)
+        raise AIServiceError("AI service error") from ex
+
+    full_text = "".join(parts)
+    if not full_text:
+        raise AIServiceError("AI response format error.")
+    if use_cache:
+        await _get_cache().set(key, full_text, ttl)
+
 
 async def get_completion(prompt: str) -> str:
     return await get_proposal_completion_json(prompt)
@@ -0,0 +1,303 @@
+"""
+Local, deterministic contract risk analysis.
+
+Scores a generated Markdown contract without an LLM round trip. The document is
+split into sections by heading, and a fixed set of clause rules (precompiled
+regexes) checks each relevant section. Every triggered rule adds its weight to
+the score and contributes a flag and a recommendation.
+
+Functions:
+- analyze_contract_risk(markdown: str) -> dict
+  Returns risk_score (0-100), risk_level (low|medium|high), risk_flags and
+  recommendations, i.e. the ContractResponse risk fields.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+__all__ = ["analyze_contract_risk", "risk_level_for"]
+
+
+_HEADING_RE = re.compile(
+    r"^\s{0,3}(?:#{1,6}\s+(.+?)\s*#*\s*$|\*\*(.+?)\*\*\s*:?\s*$)", re.M
+)
+_NUMBERED_HEADING_RE = re.compile(r"^\s*(?:\d+\.|[IVX]+\.)\s*(.+)$")
+
+# Section name aliases (matched against lower-cased heading text)
+_SECTION_ALIASES: Dict[str, re.Pattern] = {
+    "scope": re.compile(r"\b(scope|services|statement of work|project description)\b"),
+    "deliverables": re.compile(r"\bdeliverables?\b"),
+    "timeline": re.compile(
+        r"\b(timeline|schedule|milestones?|term of agreement|duration)\b"
+    ),
+    "payment": re.compile(r"\b(payment|fees?|compensation|pricing|invoic\w*)\b"),
+    "revisions": re.compile(
+        r"\b(revisions?|changes?|change requests?|amendments? to scope)\b"
+    ),
+    "ip": re.compile(r"\b(intellectual property|ip\b|ownership|copyright|rights)\b"),
+    "confidentiality": re.compile(r"\b(confidential\w*|non-disclosure|nda)\b"),
+    "termination": re.compile(r"\b(terminat\w*|cancell?ation)\b"),
+    "liability": re.compile(r"\b(liabilit\w*|indemnif\w*|warrant\w*)\b"),
+    "signatures": re.compile(r"\b(signatures?|signed|acceptance|execution)\b"),
+}
+
+_MILESTONE_RE = re.compile(
+    r"\b(milestones?|deposit|upfront|up-front|advance|installments?|%|percent|phase)\b",
+    re.I,
+)
+_DUE_RE = re.compile(
+    r"\b(within\s+\d+\s+(?:business\s+)?days|net\s*-?\s*\d+|due\s+(?:on|upon|within|by)|upon\s+(?:completion|delivery|signing|receipt))\b",
+    re.I,
+)
+_AMOUNT_RE = re.compile(
+    r"(?:[$€£]\s?\d|\d[\d,.]*\s?(?:usd|eur|gbp|sar|egp|aed)\b|\[\s*(?:amount|total|fee|price|rate)[^\]]*\])",
+    re.I,
+)
+_LATE_FEE_RE = re.compile(
+    r"\b(late\s+(?:fee|payment|charge)s?|interest|overdue|suspend\w*\s+work)\b", re.I
+)
+_UNLIMITED_RE = re.compile(
+    r"\b(unlimited|as many (?:revisions|changes)|until (?:the )?client is (?:fully )?satisfied)\b",
+    re.I,
+)
+_REVISION_CAP_RE = re.compile(
+    r"\b(?:\d+|one|two|three|four|five)\s+(?:\(\d+\)\s+)?(?:rounds?|revisions?)\b", re.I
+)
+_CHANGE_REQUEST_RE = re.compile(
+    r"\b(change\s+(?:request|order)s?|additional\s+(?:work|fees?|charges?)|billed\s+(?:separately|at)|out[- ]of[- ]scope)\b",
+    re.I,
+)
+_IP_TRANSFER_RE = re.compile(
+    r"\b(transfer\w*|assign\w*|vest\w*|belong\w*\s+to|(?:shall|will)\s+own|ownership\s+(?:of|shall|will))\b",
+    re.I,
+)
+_IP_ON_PAYMENT_RE = re.compile(
+    r"\b(upon|after|on|following)\s+(?:receipt\s+of\s+)?(?:full|final|complete)\s+payment\b",
+    re.I,
+)
+_NOTICE_RE = re.compile(
+    r"\b(\d+|thirty|fourteen|seven|ten)\s*(?:\(\d+\)\s*)?(?:business\s+|calendar\s+)?days?['’]?\s+(?:prior\s+)?(?:written\s+)?notice\b|\bwritten notice\b",
+    re.I,
+)
+_KILL_FEE_RE = re.compile(
+    r"\b(work\s+(?:completed|performed)|pro[- ]rat\w*|kill\s+fee|paid\s+for\s+(?:all\s+)?(?:work|services))\b",
+    re.I,
+)
+_LIABILITY_CAP_RE = re.compile(
+    r"\b(limit\w*\s+(?:of\s+)?liabilit\w*|liabilit\w*\s+(?:shall|will)\s+(?:not|be\s+limited)|shall\s+not\s+exceed|capped|in\s+no\s+event)\b",
+    re.I,
+)
+_DATE_RE = re.compile(
+    r"\b(\d+\s*(?:-\s*\d+\s*)?(?:business\s+)?(?:days?|weeks?|months?)|\d{4}-\d{2}-\d{2}|deadline|due date|\[\s*(?:date|deadline)[^\]]*\])\b",
+    re.I,
+)
+_PLACEHOLDER_RE = re.compile(
+    r"\[\s*(?:client|freelancer|your|company)?\s*(?:name|address|date|amount|company)[^\]]*\]",
+    re.I,
+)
+
+
+@dataclass(frozen=True)
+class _Rule:
+    flag: str
+    recommendation: str
+    weight: int
+    check: Callable[["_Doc"], bool]
+
+
+class _Doc:
+    """
+    Contract split into sections; section text is looked up by alias.
+    """
+
+    def __init__(self, markdown: str):
+        self.text = markdown or ""
+        self.sections: Dict[str, str] = {}
+        matches = list(_HEADING_RE.finditer(self.text))
+        for i, m in enumerate(matches):
+            heading = (m.group(1) or m.group(2) or "").strip().lower()
+            numbered = _NUMBERED_HEADING_RE.match(heading)
+            if numbered:
+                heading = numbered.group(1)
+            end = matches[i + 1].start() if i + 1 < len(matches) else len(self.text)
+            start = m.end()
+            body = self.text[start:end]
+            for name, pattern in _SECTION_ALIASES.items():
+                if pattern.search(heading):
+                    self.sections[name] = self.sections.get(name, "") + "\n" + body
+
+    def section(self, name: str) -> Optional[str]:
+        return self.sections.get(name)
+
+    def has(self, name: str) -> bool:
+        body = self.sections.get(name)
+        return bool(body and body.strip())
+
+    def search(self, name: str, pattern: re.Pattern) -> bool:
+        """
+        Search the named section, or the whole document when the section is missing.
+        """
+        body = self.sections.get(name)
+        return bool(pattern.search(body if body and body.strip() else self.text))
+
+
+_RULES: List[_Rule] = [
+    _Rule(
+        "Payment terms missing",
+        "Add a payment section with the total fee, schedule and accepted methods",
+        25,
+        lambda d: not d.has("payment"),
+    ),
+    _Rule(
+        "No payment milestones or deposit",
+        "Add milestone-based payments with an upfront deposit",
+        12,
+        lambda d: d.has("payment")
+        and not _MILESTONE_RE.search(d.section("payment") or ""),
+    ),
+    _Rule(
+        "Payment due dates unclear",
+        "State when invoices are due (e.g., within 14 days of receipt)",
+        8,
+        lambda d: d.has("payment") and not _DUE_RE.search(d.section("payment") or ""),
+    ),
+    _Rule(
+        "Fee amount not specified",
+        "State the fee or rate explicitly, including currency",
+        8,
+        lambda d: d.has("payment")
+        and not _AMOUNT_RE.search(d.section("payment") or ""),
+    ),
+    _Rule(
+        "No late payment remedy",
+        "Add late fees or the right to pause work on overdue invoices",
+        5,
+        lambda d: not _LATE_FEE_RE.search(d.text),
+    ),
+    _Rule(
+        "Revisions not capped",
+        "Cap included revision rounds and price additional rounds",
+        12,
+        lambda d: bool(_UNLIMITED_RE.search(d.text))
+        or not d.search("revisions", _REVISION_CAP_RE),
+    ),
+    _Rule(
+        "No change request process (scope creep risk)",
+        "Define a change request process with written approval and extra fees",
+        8,
+        lambda d: not _CHANGE_REQUEST_RE.search(d.text),
+    ),
+    _Rule(
+        "Scope of work not defined",
+        "Add a scope section listing what is and is not included",
+        12,
+        lambda d: not d.has("scope") and not d.has("deliverables"),
+    ),
+    _Rule(
+        "Timeline or deadlines missing",
+        "Add a timeline with milestone dates and dependencies on client input",
+        8,
+        lambda d: not d.search("timeline", _DATE_RE),
+    ),
+    _Rule(
+        "IP transfer not addressed",
+        "Add an IP clause stating when ownership transfers to the client",
+        12,
+        lambda d: not d.has("ip") or not _IP_TRANSFER_RE.search(d.section("ip") or ""),
+    ),
+    _Rule(
+        "IP transfers before full payment",
+        "Transfer IP only upon receipt of full payment",
+        6,
+        lambda d: d.has("ip")
+        and bool(_IP_TRANSFER_RE.search(d.section("ip") or ""))
+        and not _IP_ON_PAYMENT_RE.search(d.section("ip") or ""),
+    ),
+    _Rule(
+        "Termination terms missing",
+        "Add a termination clause with notice period and payment for work done",
+        12,
+        lambda d: not d.has("termination"),
+    ),
+    _Rule(
+        "No termination notice period",
+        "Require written notice (e.g., 14 days) before termination",
+        5,
+        lambda d: d.has("termination")
+        and not _NOTICE_RE.search(d.section("termination") or ""),
+    ),
+    _Rule(
+        "No payment for work done on termination",
+        "Ensure completed work is paid for if the contract is terminated",
+        6,
+        lambda d: d.has("termination")
+        and not _KILL_FEE_RE.search(d.section("termination") or ""),
+    ),
+    _Rule(
+        "Confidentiality clause missing",
+        "Add mutual confidentiality obligations",
+        5,
+        lambda d: not d.has("confidentiality"),
+    ),
+    _Rule(
+        "Liability not limited",
+        "Cap liability (e.g., to fees paid) and exclude indirect damages",
+        6,
+        lambda d: not _LIABILITY_CAP_RE.search(d.text),
+    ),
+    _Rule(
+        "Signature block missing",
+        "Add signature and date lines for both parties",
+        4,
+        lambda d: not d.has("signatures"),
+    ),
+    _Rule(
+        "Unfilled placeholders",
+        "Fill in all bracketed placeholders (names, dates, amounts) before sending",
+        3,
+        lambda d: bool(_PLACEHOLDER_RE.search(d.text)),
+    ),
+]
+
+
+def risk_level_for(score: int) -> str:
+    if score <= 30:
+        return "low"
+    if score <= 70:
+        return "medium"
+    return "high"
+
+
+def analyze_contract_risk(markdown: str) -> dict:
+    """
+    Deterministic clause-based risk analysis of a Markdown contract.
+
+    Args:
+        markdown: Contract text (Markdown headings are used to find sections).
+
+    Returns:
+        dict with risk_score, risk_level, risk_flags and recommendations.
+    """
+    doc = _Doc(markdown)
+    score = 0
+    flags: List[str] = []
+    recommendations: List[str] = []
+    for rule in _RULES:
+        try:
+            triggered = rule.check(doc)
+        except Exception:
+            triggered = False
+        if triggered:
+            score += rule.weight
+            flags.append(rule.flag)
+            recommendations.append(rule.recommendation)
+    score = max(0, min(100, score))
+    return {
+        "risk_score": score,
+        "risk_level": risk_level_for(score),
+        "risk_flags": flags,
+        "recommendations": recommendations,
+    }
@@ -0,0 +1,279 @@
+"""
+Upstream request scheduler.
+
+Sits in front of an upstream API client and decides when each call may go out:
+
+- Token bucket: sustained rate (requests/second) with a burst allowance.
+- Concurrency cap: at most N calls in flight.
+- Priority lanes: waiting callers are served interactive -> default -> batch,
+  FIFO within a lane.
+- Adaptive rate (AIMD): a 429 halves the effective rate and pauses dispatch for
+  Retry-After; every success recovers the rate a little.
+- Retries: jittered exponential backoff for 429/5xx/network errors that honors
+  Retry-After. request() returns the final response; hold() keeps the slot
+  for the caller's block (streamed responses).
+
+Queue depth, wait times and retry counters are exposed through stats().
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+__all__ = ["LANES", "RETRYABLE_STATUS", "UpstreamScheduler", "parse_retry_after"]
+
+# Lower value = served first
+LANES: Dict[str, int] = {"interactive": 0, "default": 1, "batch": 2}
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header (delta-seconds or HTTP date) into seconds.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except Exception:
+        return None
+
+
+class UpstreamScheduler:
+    def __init__(
+        self,
+        name: str,
+        rate_per_sec: float = 5.0,
+        burst: int = 10,
+        max_concurrency: int = 8,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 20.0,
+    ):
+        self.name = name
+        self.rate = max(0.01, rate_per_sec)
+        self.burst = max(1, burst)
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        self._rate_factor = 1.0
+        self._paused_until = 0.0
+        self._active = 0
+        self._heap: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.dispatched = 0
+        self.retries = 0
+        self.throttled = 0
+        self.failures = 0
+        self._wait_total: Dict[str, float] = {lane: 0.0 for lane in LANES}
+        self._wait_max: Dict[str, float] = {lane: 0.0 for lane in LANES}
+        self._wait_count: Dict[str, int] = {lane: 0 for lane in LANES}
+
+    # ---- Slot management -----------------------------------------------------
+
+    @asynccontextmanager
+    async def slot(self, lane: str = "default") -> AsyncIterator[None]:
+        """
+        Wait for a rate token and a concurrency slot, hold the slot for the block.
+        """
+        await self._acquire(lane)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self, lane: str) -> None:
+        lane = lane if lane in LANES else "default"
+        loop = asyncio.get_running_loop()
+        fut: asyncio.Future = loop.create_future()
+        entry = (LANES[lane], next(self._seq), fut)
+        heapq.heappush(self._heap, entry)
+        started = time.monotonic()
+        self._dispatch()
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # Slot was granted just as we were cancelled: hand it back
+                self._release()
+            else:
+                try:
+                    self._heap.remove(entry)
+                    heapq.heapify(self._heap)
+                except ValueError:
+                    pass
+            raise
+        waited = time.monotonic() - started
+        self._wait_total[lane] += waited
+        self._wait_count[lane] += 1
+        self._wait_max[lane] = max(self._wait_max[lane], waited)
+
+    def _release(self) -> None:
+        self._active -= 1
+        self._dispatch()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self._tokens = min(
+            float(self.burst), self._tokens + elapsed * self.rate * self._rate_factor
+        )
+
+    def _dispatch(self) -> None:
+        now = time.monotonic()
+        self._refill(now)
+        while self._heap and self._active < self.max_concurrency:
+            if now < self._paused_until:
+                self._schedule(self._paused_until - now)
+                return
+            if self._tokens < 1.0:
+                self._schedule((1.0 - self._tokens) / (self.rate * self._rate_factor))
+                return
+            _, _, fut = heapq.heappop(self._heap)
+            if fut.done():
+                continue
+            self._tokens -= 1.0
+            self._active += 1
+            self.dispatched += 1
+            fut.set_result(None)
+
+    def _schedule(self, delay: float) -> None:
+        loop = asyncio.get_running_loop()
+        if (
+            self._timer is not None
+            and not self._timer.cancelled()
+            and self._timer_loop is loop
+        ):
+            return
+
+        def _fire() -> None:
+            self._timer = None
+            self._dispatch()
+
+        self._timer = loop.call_later(max(0.001, delay), _fire)
+        self._timer_loop = loop
+
+    # ---- Feedback ------------------------------------------------------------
+
+    def on_success(self) -> None:
+        self._rate_factor = min(1.0, self._rate_factor + 0.05)
+
+    def on_throttled(self, retry_after: Optional[float]) -> None:
+        self.throttled += 1
+        self._rate_factor = max(0.1, self._rate_factor / 2)
+        if retry_after:
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Full-jitter exponential backoff, never shorter than Retry-After.
+        """
+        cap = min(self.backoff_max, self.backoff_base * (2**attempt))
+        delay = random.uniform(0, cap)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_max))
+        return delay
+
+    # ---- Calls ---------------------------------------------------------------
+
+    async def request(
+        self, send: Callable[[], Awaitable[httpx.Response]], lane: str = "default"
+    ) -> httpx.Response:
+        """
+        Run send() under the scheduler, retrying 429/5xx and network errors.
+        Returns the last response; re-raises the last network error.
+        """
+        async with self.hold(send, lane) as resp:
+            return resp
+
+    @asynccontextmanager
+    async def hold(
+        self, send: Callable[[], Awaitable[httpx.Response]], lane: str = "default"
+    ) -> AsyncIterator[httpx.Response]:
+        """
+        Like request(), but the slot stays held and the final response open for the
+        block, so a streamed body counts against the concurrency cap until read.
+        Only send() is retried; errors raised inside the block propagate.
+        """
+        attempt = 0
+        while True:
+            retry_after: Optional[float] = None
+            async with self.slot(lane):
+                try:
+                    resp = await send()
+                except httpx.TransportError:
+                    if attempt >= self.max_retries:
+                        self.failures += 1
+                        raise
+                else:
+                    retryable = resp.status_code in RETRYABLE_STATUS
+                    if retryable:
+                        retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                        if resp.status_code == 429:
+                            self.on_throttled(retry_after)
+                    else:
+                        self.on_success()
+                    if not retryable or attempt >= self.max_retries:
+                        if retryable:
+                            self.failures += 1
+                        try:
+                            yield resp
+                        finally:
+                            await resp.aclose()
+                        return
+                    await resp.aclose()
+            self.retries += 1
+            await asyncio.sleep(self.backoff_delay(attempt, retry_after))
+            attempt += 1
+
+    def stats(self) -> Dict[str, Any]:
+        depth = {lane: 0 for lane in LANES}
+        names = {v: k for k, v in LANES.items()}
+        for prio, _, fut in self._heap:
+            if not fut.done():
+                depth[names[prio]] += 1
+        return {
+            "rate_per_sec": self.rate,
+            "effective_rate_per_sec": round(self.rate * self._rate_factor, 3),
+            "burst": self.burst,
+            "max_concurrency": self.max_concurrency,
+            "active": self._active,
+            "queue_depth": depth,
+            "paused_for_sec": round(max(0.0, self._paused_until - time.monotonic()), 3),
+            "dispatched": self.dispatched,
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "failures": self.failures,
+            "wait_avg_ms": {
+                lane: (
+                    round(1000 * self._wait_total[lane] / self._wait_count[lane], 2)
+                    if self._wait_count[lane]
+                    else 0.0
+                )
+                for lane in LANES
+            },
+            "wait_max_ms": {
+                lane: round(1000 * v, 2) for lane, v in self._wait_max.items()
+            },
+        }
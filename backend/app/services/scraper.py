@@ -1,14 +1,170 @@
 import asyncio
+import contextlib
+import json
+import sys
 import re
 import os
-from urllib.parse import urlparse
-from typing import Dict, Any, List, Optional
-from playwright.async_api import async_playwright
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, cast
+import httpx
+from selectolax.parser import HTMLParser, Node
+from app.core import metrics
+from app.core.metrics import record_upstream, stage
+from app.services import singleflight
+from app.services.browser_pool import BrowserPool
+from app.services.cache import LRUCache, SQLiteCache, TieredCache
+from app.services.selector_registry import SelectorRegistry
 try:
     from playwright_stealth import stealth_async as _stealth_async
 except Exception:
     _stealth_async = None
 
+DEBUG = os.getenv("DEBUG", "").lower() == "dev"
+
+# Browser pool: one Chromium per process, isolated contexts per scrape
+SCRAPER_MAX_PAGES = int(os.getenv("SCRAPER_MAX_PAGES", "4"))
+SCRAPER_BROWSER_MAX_USES = int(os.getenv("SCRAPER_BROWSER_MAX_USES", "100"))
+SCRAPER_WARMUP = os.getenv("SCRAPER_WARMUP", "true").lower() in ("1", "true", "yes", "on")
+
+# Scrape result cache (memory + optional SQLite), keyed by canonical job URL
+SCRAPE_CACHE_ENABLED = os.getenv("SCRAPE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes", "on")
+SCRAPE_CACHE_MAX_ENTRIES = int(os.getenv("SCRAPE_CACHE_MAX_ENTRIES", "256"))
+SCRAPE_CACHE_SQLITE_PATH = os.getenv("SCRAPE_CACHE_SQLITE_PATH", "").strip()
+SCRAPE_CACHE_SQLITE_MAX_ENTRIES = int(os.getenv("SCRAPE_CACHE_SQLITE_MAX_ENTRIES", "5000"))
+# TTL in seconds per platform (0 disables caching for that platform)
+SCRAPE_CACHE_TTLS = {
+    "upwork": float(os.getenv("SCRAPE_CACHE_TTL_UPWORK", "21600")),
+    "freelancer": float(os.getenv("SCRAPE_CACHE_TTL_FREELANCER", "21600")),
+    "mostaql": float(os.getenv("SCRAPE_CACHE_TTL_MOSTAQL", "21600")),
+    "generic": float(os.getenv("SCRAPE_CACHE_TTL_GENERIC", "3600")),
+}
+
+_pool = BrowserPool(
+    max_pages=SCRAPER_MAX_PAGES,
+    max_uses=SCRAPER_BROWSER_MAX_USES,
+    launch_options={"headless": os.getenv("HEADLESS", "true").lower() in ("1", "true", "yes", "on")},
+    context_options={
+        "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36",
+        "viewport": {"width": 1366, "height": 900},
+        "java_script_enabled": True,
+        "locale": "en-US",
+        "timezone_id": "UTC",
+        "extra_http_headers": {
+            "Accept-Language": "en-US,en;q=0.9,de;q=0.8,ar;q=0.7",
+            "Upgrade-Insecure-Requests": "1",
+            "Sec-CH-UA": '"Chromium";v="115", "Not.A/Brand";v="24"',
+            "Sec-CH-UA-Platform": '"Windows"',
+        },
+    },
+)
+
+
+async def startup() -> None:
+    """
+    Start the browser pool. Called from the app lifespan; a failed warm-up is
+    retried lazily on the first scrape.
+    """
+    # Reopen even without a warm-up: the pool may have been shut down by an
+    # earlier lifespan in this process
+    _pool.open()
+    if not SCRAPER_WARMUP:
+        return
+    try:
+        await _pool.start()
+    except Exception as ex:
+        if DEBUG:
+            print(f"[WARN] browser pool warm-up failed: {ex}", file=sys.stderr)
+
+
+async def shutdown() -> None:
+    """
+    Drain in-flight scrapes, close the browser pool, the static HTTP client and
+    the scrape cache, and flush selector statistics.
+    """
+    global _cache, _http
+    await _pool.shutdown()
+    _selectors.flush()
+    if _http is not None:
+        await _http.aclose()
+        _http = None
+    if _cache is not None:
+        _cache.close()
+        _cache = None
+
+
+def pool_stats() -> dict:
+    """
+    Active/waiting pages and launch/recycle/crash counters for the browser pool.
+    """
+    return _pool.stats()
+
+
+_cache: Optional[TieredCache] = None
+
+
+def _get_cache() -> TieredCache:
+    global _cache
+    if _cache is None:
+        disk = None
+        if SCRAPE_CACHE_SQLITE_PATH:
+            try:
+                disk = SQLiteCache(SCRAPE_CACHE_SQLITE_PATH, "scrape", SCRAPE_CACHE_SQLITE_MAX_ENTRIES)
+            except Exception as ex:
+                if DEBUG:
+                    print(f"[WARN] Scrape cache SQLite tier disabled: {ex}", file=sys.stderr)
+        _cache = TieredCache("scrape", LRUCache(SCRAPE_CACHE_MAX_ENTRIES), disk)
+    return _cache
+
+
+def cache_stats() -> dict:
+    """
+    Hit/miss counters and sizes for the scrape cache.
+    """
+    return {"enabled": SCRAPE_CACHE_ENABLED, **_get_cache().stats()}
+
+
+# Host aliases that serve the same postings
+_HOST_ALIASES = {
+    "upwork.com": "www.upwork.com",
+    "freelancer.com": "www.freelancer.com",
+    "www.mostaql.com": "mostaql.com",
+    "mostaqel.com": "mostaql.com",
+    "www.mostaqel.com": "mostaql.com",
+    "mustaqel.com": "mostaql.com",
+    "www.mustaqel.com": "mostaql.com",
+}
+# utm_* is dropped everywhere; these only on the known platforms, where they
+# never select content (on other sites ?source= or ?ref= can pick the page)
+_TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid", "_gl",
+    "ref", "referrer", "source", "src", "trk", "tracking", "campaign", "share",
+}
+
+
+def canonicalize_job_url(url: str) -> str:
+    """
+    Canonical form of a job URL: lower-cased scheme/host, host aliases merged,
+    utm_* (plus known tracking parameters on supported platforms) and fragment
+    dropped, remaining query sorted, no trailing slash.
+    """
+    raw = (url or "").strip()
+    parts = urlparse(raw if "://" in raw else f"https://{raw}")
+    scheme = (parts.scheme or "https").lower()
+    if scheme == "http":
+        scheme = "https"
+    host = (parts.hostname or "").lower()
+    host = _HOST_ALIASES.get(host, host)
+    netloc = host if not parts.port or parts.port in (80, 443) else f"{host}:{parts.port}"
+    tracking = _TRACKING_PARAMS if platform_for(host) is not GENERIC_PLATFORM else set()
+    query = sorted(
+        (k, v)
+        for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in tracking
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunparse((scheme, netloc, path, "", urlencode(query), ""))
+
 
 def _normalize_text(text: str | None) -> str:
     if not text:
@@ -16,243 +172,879 @@ def _normalize_text(text: str | None) -> str:
     return " ".join(text.split())
 
 
-async def _extract_text(page, selectors: List[str]) -> str:
-    for sel in selectors:
-        try:
-            locator = page.locator(sel)
-            if await locator.count() > 0:
-                content = await locator.first().inner_text()
-                content = _normalize_text(content)
-                if content:
-                    return content
-        except Exception:
-            pass
-    return ""
+# Cap on any single extracted text (UTF-8 bytes, 0 = unlimited). Applies to fields
+# and to the main-content text that stands in for a missing description.
+SCRAPER_MAX_TEXT_BYTES = int(os.getenv("SCRAPER_MAX_TEXT_BYTES", "32768"))
 
+# Main-content extraction (readability-style), shared by the in-page script and
+# the static tier so both pick the same block:
+# - text inside nav/aside/footer or under a chrome-like class/id (comments,
+#   sidebar, related, share, ...) is dropped unless the name also looks like a
+#   content column (article, body, content, main);
+# - every other text node counts toward its nearest block ancestor ("paragraph")
+#   and, for link density, toward all its ancestors;
+# - paragraphs of 25+ characters score 1 + commas + length/100 (max 3) and pass
+#   that to their parent, half to the grandparent, a third to the next level;
+# - candidates start from a tag weight plus +/-25 for content-like or
+#   chrome-like class/id names; final score = score * (1 - link density);
+# - the best candidate is returned together with siblings scoring at least
+#   max(10, best * 0.2). Without any paragraph, the whole body is used.
+_MAIN_BLOCK_TAGS = frozenset(
+    "p div section article main li td th dd pre blockquote ul ol table form aside nav header footer "
+    "h1 h2 h3 h4 h5 h6".split()
+)
+_MAIN_SKIP_TAGS = frozenset("script style noscript template svg iframe button select option".split())
+_MAIN_TAG_WEIGHTS = {
+    "div": 5, "article": 10, "main": 10, "pre": 3, "td": 3, "blockquote": 3,
+    "ul": -3, "ol": -3, "form": -3, "dl": -3,
+    "h1": -5, "h2": -5, "h3": -5, "h4": -5, "h5": -5, "h6": -5, "th": -5,
+    "nav": -25, "aside": -25, "header": -25, "footer": -25,
+}
+_MAIN_NEGATIVE = (
+    r"comment|footer|header|masthead|nav|menu|sidebar|side-bar|related|similar|recommend|share|social|"
+    r"cookie|consent|banner|promo|sponsor|advert|breadcrumb|pagination|login|signup|modal|popup|newsletter"
+)
+_MAIN_POSITIVE = r"article|content|main|post|description|desc|detail|job|project|body|text|entry"
+_MAIN_MAYBE = r"article|body|column|content|main"
+_MAIN_UNLIKELY_TAGS = frozenset(("nav", "aside", "footer"))
+_MAIN_NEGATIVE_RE = re.compile(_MAIN_NEGATIVE, re.I)
+_MAIN_POSITIVE_RE = re.compile(_MAIN_POSITIVE, re.I)
+_MAIN_MAYBE_RE = re.compile(_MAIN_MAYBE, re.I)
+_MAIN_MIN_PARAGRAPH = 25
 
-async def _extract_all_texts(page, selector: str) -> List[str]:
-    try:
-        texts = await page.locator(selector).all_inner_texts()
-        return [_normalize_text(t) for t in texts if _normalize_text(t)]
-    except Exception:
-        return []
 
+# In-page extraction: one page.evaluate per scrape instead of a CDP round trip per
+# selector. Tries each field's selectors in order (first non-empty innerText wins,
+# its index is reported in picks for the selector registry), collects all skill
+# texts, reads meta tags and, when no description matched, returns only the
+# page's main content (see above) instead of the whole body. Texts are
+# whitespace-normalized with one regex pass and capped at maxBytes in the page,
+# so large pages never cross CDP in full. Playwright-only pseudos are emulated:
+# :has-text('x') marks elements whose text contains x, :text('x') marks elements
+# whose own text contains x (both case-insensitive); the marks are swapped in as
+# attribute selectors so the rest (:has(), combinators) runs natively.
+_EXTRACT_JS = """
+({table, maxBytes}) => {
+  const norm = (t) => (t || "").replace(/\\s+/g, " ").trim();
+  const cap = (text) => {
+    if (!maxBytes || text.length * 3 <= maxBytes) return text;
+    const head = text.slice(0, maxBytes);
+    const bytes = new TextEncoder().encode(head);
+    if (bytes.length <= maxBytes) return head;
+    return new TextDecoder().decode(bytes.subarray(0, maxBytes)).replace(/\\uFFFD+$/, "");
+  };
+  // Raw text is cut before normalizing so a huge page is never processed in full
+  const clean = (t) => cap(norm(maxBytes ? (t || "").slice(0, maxBytes * 4) : t));
+  const marks = new Map();
+  const marked = [];
+  const mark = (kind, needle) => {
+    const key = kind + "\\u0000" + needle;
+    if (marks.has(key)) return marks.get(key);
+    const attr = "data-ftk-mark-" + marks.size;
+    marks.set(key, attr);
+    for (const el of document.querySelectorAll("*")) {
+      const text = kind === "has"
+        ? el.textContent
+        : Array.from(el.childNodes).filter((c) => c.nodeType === 3).map((c) => c.textContent).join(" ");
+      if (norm(text).toLowerCase().includes(needle)) {
+        el.setAttribute(attr, "");
+        marked.push([el, attr]);
+      }
+    }
+    return attr;
+  };
+  const compile = (sel) => sel.replace(
+    /:(has-text|text)\\((['"])(.*?)\\2\\)/g,
+    (_, kind, __, needle) => "[" + mark(kind === "text" ? "own" : "has", norm(needle).toLowerCase()) + "]"
+  );
+  const picks = {};
+  const first = (name, selectors) => {
+    picks[name] = -1;
+    for (let i = 0; i < selectors.length; i++) {
+      try {
+        const el = document.querySelector(compile(selectors[i]));
+        const text = el ? clean(el.innerText) : "";
+        if (text) {
+          picks[name] = i;
+          return text;
+        }
+      } catch (e) {}
+    }
+    return "";
+  };
+  const allTexts = (sel) => {
+    try {
+      return Array.from(document.querySelectorAll(compile(sel))).map((el) => clean(el.innerText)).filter(Boolean);
+    } catch (e) {
+      return [];
+    }
+  };
+  const meta = (sel) => {
+    const el = document.querySelector(sel);
+    return el ? norm(el.getAttribute("content")) : "";
+  };
+  const BLOCK = new Set(%(block)s);
+  const SKIP = new Set(%(skip)s);
+  const WEIGHTS = %(weights)s;
+  const NEGATIVE = /%(negative)s/i;
+  const POSITIVE = /%(positive)s/i;
+  const MAYBE = /%(maybe)s/i;
+  const UNLIKELY = new Set(%(unlikely)s);
+  const names = (el) => (typeof el.className === "string" ? el.className : "") + " " + (el.id || "");
+  const mainText = () => {
+    const body = document.body;
+    if (!body) return "";
+    const totals = new Map();
+    const own = new Map();
+    const unlikelyCache = new Map();
+    const unlikely = (el) => {
+      if (!unlikelyCache.has(el)) {
+        const n = names(el);
+        unlikelyCache.set(el, UNLIKELY.has(el.tagName.toLowerCase()) || (NEGATIVE.test(n) && !MAYBE.test(n)));
+      }
+      return unlikelyCache.get(el);
+    };
+    const walker = document.createTreeWalker(body, NodeFilter.SHOW_TEXT);
+    for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+      const n = node.data.trim().length;
+      if (!n) continue;
+      const chain = [];
+      let block = null, inLink = false, skip = false;
+      for (let el = node.parentElement; el; el = el.parentElement) {
+        const tag = el.tagName.toLowerCase();
+        if (el === body) { chain.push(el); break; }
+        if (SKIP.has(tag) || unlikely(el)) { skip = true; break; }
+        if (tag === "a") inLink = true;
+        if (!block && BLOCK.has(tag)) block = el;
+        chain.push(el);
+      }
+      if (skip) continue;
+      for (const el of chain) {
+        const t = totals.get(el) || [0, 0];
+        t[0] += n;
+        if (inLink) t[1] += n;
+        totals.set(el, t);
+      }
+      if (block) {
+        const o = own.get(block) || [0, 0];
+        o[0] += n;
+        o[1] += (node.data.match(/[,\\u060C]/g) || []).length;
+        own.set(block, o);
+      }
+    }
+    const weight = (el) => {
+      const n = names(el);
+      return (WEIGHTS[el.tagName.toLowerCase()] || 0) + (NEGATIVE.test(n) ? -25 : 0) + (POSITIVE.test(n) ? 25 : 0);
+    };
+    const scores = new Map();
+    for (const [block, [chars, commas]] of own) {
+      if (chars < %(min_paragraph)d) continue;
+      const score = 1 + commas + Math.min(Math.floor(chars / 100), 3);
+      let el = block.parentElement;
+      for (let level = 0; level < 3 && el && el !== document.documentElement; level++, el = el.parentElement) {
+        if (!scores.has(el)) scores.set(el, weight(el));
+        scores.set(el, scores.get(el) + score / (level === 0 ? 1 : level === 1 ? 2 : level * 3));
+      }
+    }
+    const final = (el) => {
+      const [text, links] = totals.get(el) || [0, 0];
+      return scores.get(el) * (1 - (text ? links / text : 0));
+    };
+    let best = null, bestScore = -Infinity;
+    for (const el of scores.keys()) {
+      const s = final(el);
+      if (s > bestScore) { best = el; bestScore = s; }
+    }
+    let chosen = [body];
+    if (best && best !== body && best.parentElement) {
+      const threshold = Math.max(10, bestScore * 0.2);
+      chosen = Array.from(best.parentElement.children).filter(
+        (el) => el === best || (scores.has(el) && final(el) >= threshold)
+      );
+    }
+    let raw = "";
+    for (const el of chosen) {
+      raw += el.innerText + "\\n";
+      if (maxBytes && raw.length > maxBytes * 4) break;
+    }
+    return clean(raw);
+  };
+  const fields = {};
+  for (const [name, selectors] of Object.entries(table || {})) {
+    fields[name] = name === "skills" ? allTexts(selectors) : first(name, selectors);
+  }
+  for (const [el, attr] of marked) el.removeAttribute(attr);
+  return {
+    fields,
+    picks,
+    meta: {
+      meta_description: meta("meta[name='description']"),
+      meta_keywords: meta("meta[name='keywords']"),
+      og_description: meta("meta[property='og:description']"),
+      page_title: norm(document.title),
+    },
+    body: fields.description ? "" : mainText(),
+  };
+}
+""" % {
+    "block": json.dumps(sorted(_MAIN_BLOCK_TAGS)),
+    "skip": json.dumps(sorted(_MAIN_SKIP_TAGS)),
+    "weights": json.dumps(_MAIN_TAG_WEIGHTS),
+    "negative": _MAIN_NEGATIVE,
+    "positive": _MAIN_POSITIVE,
+    "maybe": _MAIN_MAYBE,
+    "unlikely": json.dumps(sorted(_MAIN_UNLIKELY_TAGS)),
+    "min_paragraph": _MAIN_MIN_PARAGRAPH,
+}
 
-# Meta extraction helper
-async def _extract_meta(page) -> Dict[str, str]:
-    data: Dict[str, str] = {}
-    try:
-        desc = await page.locator("meta[name='description']").get_attribute("content")
-        if desc:
-            data["meta_description"] = _normalize_text(desc)
-    except Exception:
-        pass
-    try:
-        kw = await page.locator("meta[name='keywords']").get_attribute("content")
-        if kw:
-            data["meta_keywords"] = _normalize_text(kw)
-    except Exception:
-        pass
-    try:
-        og = await page.locator("meta[property='og:description']").get_attribute("content")
-        if og:
-            data["og_description"] = _normalize_text(og)
-    except Exception:
-        pass
-    try:
-        title = await page.title()
-        if title:
-            data["page_title"] = _normalize_text(title)
-    except Exception:
-        pass
-    return data
 
-async def parse_upwork(page) -> Dict[str, Any]:
-    # Common selectors for Upwork job pages
-    title = await _extract_text(page, [
+# Job description selectors per platform; the plain CSS ones double as readiness checks
+UPWORK_DESCRIPTION_SELECTORS = [
+    "div[data-test='job-description']",
+    "section[data-test='job-description']",
+    "div[data-qa='job-description']",
+]
+FREELANCER_DESCRIPTION_SELECTORS = [
+    "div.Project-description",
+    "div[data-target='project-view.description']",
+    "section:has(h2:has-text('Project Description'))",
+]
+MOSTAQL_DESCRIPTION_SELECTORS = [
+    "div.project-content__text",
+    "div.project-show-content",
+    "section:has(h3:has-text('تفاصيل المشروع'))",
+]
+
+# Parser tables: field -> selectors tried in order (first non-empty text wins).
+# "skills" is a single selector whose matches are all collected.
+UPWORK_FIELDS: Dict[str, Any] = {
+    "title": [
         "h1[data-test='job-title']",
         "h1.up-card-header",
         "h1",
-    ])
-    description = await _extract_text(page, [
-        "div[data-test='job-description']",
-        "section[data-test='job-description']",
-        "div[data-qa='job-description']",
-    ])
-    budget = await _extract_text(page, [
+    ],
+    "description": UPWORK_DESCRIPTION_SELECTORS,
+    "budget": [
         "span[data-test='job-type'] + span",
         "span[data-test='budget']",
         "div[data-qa='job-details'] :text('Budget') + *",
-    ])
-    hourly = await _extract_text(page, [
+    ],
+    # Hourly/fixed job type; only used when there is no budget (see _result)
+    "hourly": [
         "span[data-test='job-type']",
         "div[data-test='about-client']:has-text('Hourly')",
-    ])
-    skills = await _extract_all_texts(page, "a[aria-label='Skill or expertise']")
-    timeline = await _extract_text(page, [
+    ],
+    "skills": "a[aria-label='Skill or expertise']",
+    "timeline": [
         "div[data-test='duration']",
         "div:has(> strong:has-text('Duration')) span",
-    ])
-    client_location = await _extract_text(page, [
+    ],
+    "location": [
         "span[data-test='client-location']",
         "div:has(> strong:has-text('Location')) span",
-    ])
-
-    return {
-        "platform": "upwork",
-        "title": title,
-        "description": description,
-        "requirements": "",
-        "budget": budget or hourly,
-        "timeline": timeline,
-        "skills": skills,
-        "currency": "",
-        "location": client_location,
-    }
-
-
-async def parse_freelancer(page) -> Dict[str, Any]:
-    title = await _extract_text(page, [
+    ],
+}
+FREELANCER_FIELDS: Dict[str, Any] = {
+    "title": [
         "h1.ProjectViewHeader-title",
         "h1",
-    ])
-    description = await _extract_text(page, [
-        "div.Project-description",
-        "div[data-target='project-view.description']",
-        "section:has(h2:has-text('Project Description'))",
-    ])
-    budget = await _extract_text(page, [
+    ],
+    "description": FREELANCER_DESCRIPTION_SELECTORS,
+    "budget": [
         "div.ProjectViewHeader-budget",
         "span:has-text('Budget') + span",
         "span:has-text('BUDGET') + span",
-    ])
-    skills = await _extract_all_texts(page, "a[href*='/jobs/']")
-    timeline = await _extract_text(page, [
+    ],
+    "skills": "a[href*='/jobs/']",
+    "timeline": [
         "span:has-text('Duration') + span",
-    ])
-    location = await _extract_text(page, [
+    ],
+    "location": [
         "span:has-text('Location') + span",
-    ])
-    return {
-        "platform": "freelancer",
-        "title": title,
-        "description": description,
-        "requirements": "",
-        "budget": budget,
-        "timeline": timeline,
-        "skills": skills,
-        "currency": "",
-        "location": location,
-    }
-
-
-async def parse_mostaql(page) -> Dict[str, Any]:
+    ],
+}
+MOSTAQL_FIELDS: Dict[str, Any] = {
     # Mostaql.com (Arabic language) selectors
-    title = await _extract_text(page, [
+    "title": [
         "h1.project-header__title",
         "h1",
-    ])
-    description = await _extract_text(page, [
-        "div.project-content__text",
-        "div.project-show-content",
-        "section:has(h3:has-text('تفاصيل المشروع'))",
-    ])
-    budget = await _extract_text(page, [
+    ],
+    "description": MOSTAQL_DESCRIPTION_SELECTORS,
+    "budget": [
         "div.project-about__info:has(span:has-text('الميزانية')) span:nth-of-type(2)",
         "span:has-text('الميزانية') + span",
-    ])
-    skills = await _extract_all_texts(page, "a.project-skills__item, a[href*='/tags/']")
-    timeline = await _extract_text(page, [
+    ],
+    "skills": "a.project-skills__item, a[href*='/tags/']",
+    "timeline": [
         "div.project-about__info:has(span:has-text('مدة التنفيذ')) span:nth-of-type(2)",
-    ])
-    location = await _extract_text(page, [
+    ],
+    "location": [
         "div.project-about__info:has(span:has-text('بلد')) span:nth-of-type(2)",
-    ])
+    ],
+}
+
+
+def _result(platform: str, fields: Dict[str, Any]) -> Dict[str, Any]:
     return {
-        "platform": "mostaql",
-        "title": title,
-        "description": description,
+        "platform": platform,
+        "title": fields.get("title", ""),
+        "description": fields.get("description", ""),
         "requirements": "",
-        "budget": budget,
-        "timeline": timeline,
-        "skills": skills,
+        "budget": fields.get("budget") or fields.get("hourly", ""),
+        "timeline": fields.get("timeline", ""),
+        "skills": fields.get("skills", []),
         "currency": "",
-        "location": location,
+        "location": fields.get("location", ""),
     }
 
 
-async def scrape_job_posting(url: str) -> dict:
-    async with async_playwright() as p:
-        headless_env = os.getenv("HEADLESS", "true").lower() in ("1", "true", "yes", "on")
-        browser = await p.chromium.launch(headless=headless_env)
-        context = await browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36",
-            viewport={"width": 1366, "height": 900},
-            java_script_enabled=True,
-            locale="en-US",
-            timezone_id="UTC",
-            extra_http_headers={
-                "Accept-Language": "en-US,en;q=0.9,de;q=0.8,ar;q=0.7",
-                "Upgrade-Insecure-Requests": "1",
-                "Sec-CH-UA": '"Chromium";v="115", "Not.A/Brand";v="24"',
-                "Sec-CH-UA-Platform": '"Windows"',
+async def _parse_table(page, platform: str, table: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Extract a parser table (None: title + main content) with a single page.evaluate,
+    probing fallbacks in the registry's order and recording which selector hit.
+    Missing descriptions fall back to the page's main content; meta tags fill empty fields.
+    """
+    ordered = _selectors.table(platform, table) if table else {}
+    data = await page.evaluate(_EXTRACT_JS, {"table": ordered, "maxBytes": SCRAPER_MAX_TEXT_BYTES})
+    picks = data.get("picks") or {}
+    for field, selectors in ordered.items():
+        if isinstance(selectors, list):
+            idx = picks.get(field, -1)
+            if isinstance(idx, int) and 0 <= idx < len(selectors):
+                _selectors.record(platform, field, selectors[: idx + 1], selectors[idx])
+            else:
+                _selectors.record(platform, field, selectors, None)
+    meta = data.get("meta") or {}
+    if table is None:
+        parsed = _result(platform, {"title": meta.get("page_title", ""), "description": data.get("body", "")})
+    else:
+        parsed = _result(platform, data.get("fields") or {})
+        if not parsed["description"]:
+            parsed["description"] = data.get("body", "")
+    _merge_meta(parsed, meta)
+    return parsed
+
+
+async def parse_upwork(page) -> Dict[str, Any]:
+    return await _parse_table(page, "upwork", UPWORK_FIELDS)
+
+
+async def parse_freelancer(page) -> Dict[str, Any]:
+    return await _parse_table(page, "freelancer", FREELANCER_FIELDS)
+
+
+async def parse_mostaql(page) -> Dict[str, Any]:
+    return await _parse_table(page, "mostaql", MOSTAQL_FIELDS)
+
+
+async def parse_generic(page) -> Dict[str, Any]:
+    return await _parse_table(page, "generic", None)
+
+
+def _env_list(name: str, default: str) -> List[str]:
+    return [p.strip().lower() for p in os.getenv(name, default).split(",") if p.strip()]
+
+
+# Request interception: resource types and analytics/ads hosts never needed for text extraction
+SCRAPER_BLOCKING = os.getenv("SCRAPER_BLOCKING", "true").lower() in ("1", "true", "yes", "on")
+SCRAPER_BLOCK_RESOURCES = _env_list("SCRAPER_BLOCK_RESOURCES", "image,media,font")
+SCRAPER_BLOCK_HOSTS = _env_list(
+    "SCRAPER_BLOCK_HOSTS",
+    "google-analytics.com,googletagmanager.com,googleadservices.com,doubleclick.net,"
+    "googlesyndication.com,facebook.net,connect.facebook.net,hotjar.com,segment.io,segment.com,"
+    "fullstory.com,clarity.ms,bat.bing.com,nr-data.net,optimizely.com,mixpanel.com,"
+    "amplitude.com,px.ads.linkedin.com,analytics.tiktok.com,quantserve.com,scorecardresearch.com",
+)
+# Max wait for a platform's readiness selector after DOMContentLoaded
+SCRAPER_READY_TIMEOUT_MS = int(os.getenv("SCRAPER_READY_TIMEOUT_MS", "10000"))
+
+_scrape_blocked = metrics.Counter(
+    "freelancer_toolkit_scrape_blocked_requests_total",
+    "Subresource requests aborted by the scraper",
+    ("platform", "resource_type"),
+)
+
+
+@dataclass(frozen=True)
+class PlatformProfile:
+    """
+    How to load and parse one job board.
+
+    ready_selectors: plain CSS selectors; the page counts as ready once any is attached.
+        Empty means "ready at the load event" (generic pages).
+    block_resources / block_hosts: added to the global SCRAPER_BLOCK_* lists.
+    fields: the parser table, reused by the static HTML tier.
+    """
+
+    name: str
+    hosts: Tuple[str, ...]
+    parser: Callable[[Any], Awaitable[Dict[str, Any]]]
+    ready_selectors: Tuple[str, ...] = ()
+    block_resources: Tuple[str, ...] = ()
+    block_hosts: Tuple[str, ...] = ()
+    # Parser table for the static (no browser) tier; None means title + body text
+    fields: Optional[Dict[str, Any]] = None
+
+    def matches(self, host: str) -> bool:
+        return any(h in host for h in self.hosts)
+
+
+PLATFORMS: List[PlatformProfile] = [
+    PlatformProfile(
+        "upwork",
+        ("upwork.com",),
+        parse_upwork,
+        # SPA: the description container renders after the app boots
+        ready_selectors=tuple(UPWORK_DESCRIPTION_SELECTORS) + ("h1[data-test='job-title']",),
+        block_resources=("stylesheet",),
+        fields=UPWORK_FIELDS,
+    ),
+    PlatformProfile(
+        "freelancer",
+        ("freelancer.com",),
+        parse_freelancer,
+        ready_selectors=tuple(FREELANCER_DESCRIPTION_SELECTORS[:2]) + ("h1.ProjectViewHeader-title",),
+        fields=FREELANCER_FIELDS,
+    ),
+    PlatformProfile(
+        "mostaql",
+        ("mostaql.com", "mostaqel.com", "mustaqel.com"),
+        parse_mostaql,
+        ready_selectors=tuple(MOSTAQL_DESCRIPTION_SELECTORS[:2]),
+        # Server-rendered: no scripts are needed to read the project
+        block_resources=("script", "stylesheet"),
+        fields=MOSTAQL_FIELDS,
+    ),
+]
+GENERIC_PLATFORM = PlatformProfile("generic", (), parse_generic)
+
+# Per-platform selector statistics; fallbacks are probed best-first
+SELECTOR_STATS_PATH = os.getenv("SELECTOR_STATS_PATH", "").strip()
+try:
+    _selectors = SelectorRegistry(SELECTOR_STATS_PATH)
+except Exception as _ex:
+    if DEBUG:
+        print(f"[WARN] selector stats not persisted: {_ex}", file=sys.stderr)
+    _selectors = SelectorRegistry()
+for _profile in PLATFORMS:
+    if _profile.fields:
+        _selectors.register(_profile.name, _profile.fields)
+
+
+def selector_stats() -> dict:
+    """
+    Probe order, hit/miss counters and average probes per platform field.
+    """
+    return _selectors.stats()
+
+
+def reset_selector_stats(platform: Optional[str] = None) -> None:
+    _selectors.reset(platform)
+
+
+def platform_for(host: str) -> PlatformProfile:
+    host = (host or "").lower()
+    for profile in PLATFORMS:
+        if profile.matches(host):
+            return profile
+    return GENERIC_PLATFORM
+
+
+def _should_block(profile: PlatformProfile, resource_type: str, host: str) -> bool:
+    if resource_type == "document":
+        return False
+    if resource_type in SCRAPER_BLOCK_RESOURCES or resource_type in profile.block_resources:
+        return True
+    host = (host or "").lower()
+    for blocked in (*SCRAPER_BLOCK_HOSTS, *profile.block_hosts):
+        if host == blocked or host.endswith("." + blocked):
+            return True
+    return False
+
+
+async def _install_blocking(page, profile: PlatformProfile) -> None:
+    async def handle(route):
+        request = route.request
+        if _should_block(profile, request.resource_type, urlparse(request.url).hostname or ""):
+            _scrape_blocked.inc(platform=profile.name, resource_type=request.resource_type)
+            await route.abort()
+        else:
+            await route.continue_()
+
+    await page.route("**/*", handle)
+
+
+async def _wait_until_ready(page, profile: PlatformProfile) -> None:
+    """
+    Wait for the platform's content selector instead of networkidle (which
+    long-polling SPAs never reach). Timeouts are not errors: parsers run anyway.
+    """
+    try:
+        if profile.ready_selectors:
+            await page.wait_for_selector(
+                ", ".join(profile.ready_selectors), state="attached", timeout=SCRAPER_READY_TIMEOUT_MS
+            )
+        else:
+            await page.wait_for_load_state("load", timeout=SCRAPER_READY_TIMEOUT_MS)
+    except Exception:
+        if DEBUG:
+            print(f"[DEBUG] scrape readiness timed out for {profile.name}", file=sys.stderr)
+
+
+# Static tier: plain HTTP GET + selectolax, before paying for a browser page
+SCRAPER_STATIC_ENABLED = os.getenv("SCRAPER_STATIC_ENABLED", "true").lower() in ("1", "true", "yes", "on")
+SCRAPER_STATIC_TIMEOUT = float(os.getenv("SCRAPER_STATIC_TIMEOUT", "10"))
+# Shorter descriptions are treated as a JS shell and retried in the browser
+SCRAPER_STATIC_MIN_DESCRIPTION = int(os.getenv("SCRAPER_STATIC_MIN_DESCRIPTION", "80"))
+
+# Playwright-only selector syntax that selectolax cannot evaluate
+_PLAYWRIGHT_ONLY_RE = re.compile(r":has-text\(|:text\(|>>")
+_STATIC_STRIP_TAGS = ["script", "style", "noscript", "template", "svg"]
+
+_scrape_tiers = metrics.Counter(
+    "freelancer_toolkit_scrape_tier_total",
+    "Scrapes by platform and the tier that served them (cache, static, browser)",
+    ("platform", "tier"),
+)
+
+_http: Optional[httpx.AsyncClient] = None
+
+
+def _get_http() -> httpx.AsyncClient:
+    global _http
+    if _http is None or _http.is_closed:
+        context = _pool.context_options
+        _http = httpx.AsyncClient(
+            headers={
+                "User-Agent": context["user_agent"],
+                "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8",
+                **context["extra_http_headers"],
             },
+            follow_redirects=True,
+            timeout=httpx.Timeout(SCRAPER_STATIC_TIMEOUT, connect=min(5.0, SCRAPER_STATIC_TIMEOUT)),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30),
         )
-        page = await context.new_page()
-        # Apply stealth to reduce bot detection (optional)
-        if _stealth_async is not None:
-            try:
-                await _stealth_async(page)
-            except Exception:
-                pass
-        await page.goto(url, timeout=60000, wait_until="domcontentloaded")
-        # Give page a moment for client-side rendering
+    return _http
+
+
+def _cap_text(text: str, max_bytes: Optional[int] = None) -> str:
+    """
+    Normalize whitespace and cut to max_bytes of UTF-8 (default SCRAPER_MAX_TEXT_BYTES,
+    0 = unlimited) without splitting a character. Raw text is cut first, so huge
+    inputs are never normalized in full.
+    """
+    if max_bytes is None:
+        max_bytes = SCRAPER_MAX_TEXT_BYTES
+    if not text:
+        return ""
+    if max_bytes > 0:
+        text = _normalize_text(text[: max_bytes * 4])
+        if len(text) * 3 > max_bytes:
+            text = text.encode("utf-8")[:max_bytes].decode("utf-8", "ignore")
+        return text
+    return _normalize_text(text)
+
+
+def _main_names(node) -> str:
+    attrs = node.attributes
+    return f"{attrs.get('class') or ''} {attrs.get('id') or ''}"
+
+
+def _main_unlikely(node) -> bool:
+    if node.tag in _MAIN_UNLIKELY_TAGS:
+        return True
+    names = _main_names(node)
+    return bool(_MAIN_NEGATIVE_RE.search(names)) and not _MAIN_MAYBE_RE.search(names)
+
+
+def _main_weight(node) -> int:
+    names = _main_names(node)
+    weight = _MAIN_TAG_WEIGHTS.get(node.tag, 0)
+    if _MAIN_NEGATIVE_RE.search(names):
+        weight -= 25
+    if _MAIN_POSITIVE_RE.search(names):
+        weight += 25
+    return weight
+
+
+def _mem_id(node: Node) -> int:
+    # selectolax's stubs declare mem_id as a method; it is a property
+    return cast(int, node.mem_id)
+
+
+def _static_main_text(tree: HTMLParser) -> str:
+    """
+    Main content of a parsed page (same scoring as mainText in _EXTRACT_JS).
+    """
+    body = tree.body
+    if body is None:
+        return ""
+    body_id = _mem_id(body)
+    # mem_id -> [node, text chars, link chars] / [node, own chars, commas] / [node, score]
+    totals: Dict[int, list] = {}
+    own: Dict[int, list] = {}
+    unlikely: Dict[int, bool] = {}
+    for node in body.traverse(include_text=True):
+        if node.tag != "-text":
+            continue
+        data = node.text_content or ""
+        n = len(data.strip())
+        if not n:
+            continue
+        chain = []
+        block = None
+        in_link = skip = False
+        el = node.parent
+        while el is not None:
+            mem_id = _mem_id(el)
+            if mem_id == body_id:
+                chain.append(el)
+                break
+            tag = el.tag
+            if mem_id not in unlikely:
+                unlikely[mem_id] = _main_unlikely(el)
+            if tag in _MAIN_SKIP_TAGS or unlikely[mem_id]:
+                skip = True
+                break
+            if tag == "a":
+                in_link = True
+            if block is None and tag in _MAIN_BLOCK_TAGS:
+                block = el
+            chain.append(el)
+            el = el.parent
+        if skip:
+            continue
+        for el in chain:
+            el_id = _mem_id(el)
+            entry = totals.get(el_id)
+            if entry is None:
+                entry = totals[el_id] = [el, 0, 0]
+            entry[1] += n
+            if in_link:
+                entry[2] += n
+        if block is not None:
+            block_id = _mem_id(block)
+            entry = own.get(block_id)
+            if entry is None:
+                entry = own[block_id] = [block, 0, 0]
+            entry[1] += n
+            entry[2] += data.count(",") + data.count("\u060c")
+
+    scores: Dict[int, list] = {}
+    for para, chars, commas in own.values():
+        if chars < _MAIN_MIN_PARAGRAPH:
+            continue
+        score = 1 + commas + min(chars // 100, 3)
+        el = para.parent
+        for level in range(3):
+            if el is None or el.tag == "html":
+                break
+            el_id = _mem_id(el)
+            entry = scores.get(el_id)
+            if entry is None:
+                entry = scores[el_id] = [el, float(_main_weight(el))]
+            entry[1] += score / (1 if level == 0 else 2 if level == 1 else level * 3)
+            el = el.parent
+
+    def final(mem_id: int) -> float:
+        _, text, links = totals.get(mem_id) or (None, 0, 0)
+        return scores[mem_id][1] * (1 - (links / text if text else 0))
+
+    best_id = max(scores, key=final, default=None)
+    chosen = [body]
+    parent = scores[best_id][0].parent if best_id is not None and best_id != body_id else None
+    if best_id is not None and parent is not None:
+        threshold = max(10.0, final(best_id) * 0.2)
+        chosen = [
+            el for el in parent.iter()
+            if _mem_id(el) == best_id or (_mem_id(el) in scores and final(_mem_id(el)) >= threshold)
+        ]
+    limit = SCRAPER_MAX_TEXT_BYTES * 4 if SCRAPER_MAX_TEXT_BYTES > 0 else 0
+    parts: List[str] = []
+    size = 0
+    for el in chosen:
+        text = el.text(separator=" ")
+        parts.append(text)
+        size += len(text)
+        if limit and size > limit:
+            break
+    return _cap_text(" ".join(parts))
+
+
+def _static_text(tree: HTMLParser, platform: str, field: str, selectors: List[str]) -> str:
+    probed: List[str] = []
+    for sel in _selectors.ordered(platform, field, selectors):
+        if _PLAYWRIGHT_ONLY_RE.search(sel):
+            continue
+        probed.append(sel)
         try:
-            await page.wait_for_load_state("networkidle", timeout=15000)
+            node = tree.css_first(sel)
         except Exception:
-            pass
-
-        host = urlparse(url).hostname or ""
-        host = host.lower()
-
-        parsed: Dict[str, Any]
-        if "upwork.com" in host:
-            parsed = await parse_upwork(page)
-        elif "freelancer.com" in host:
-            parsed = await parse_freelancer(page)
-        elif "mostaql.com" in host or "mostaqel.com" in host or "mustaqel.com" in host:
-            parsed = await parse_mostaql(page)
+            continue
+        if node is not None:
+            content = _cap_text(node.text(separator=" "))
+            if content:
+                _selectors.record(platform, field, probed, sel)
+                return content
+    if probed:
+        _selectors.record(platform, field, probed, None)
+    return ""
+
+
+def _static_all_texts(tree: HTMLParser, selector: str) -> List[str]:
+    try:
+        nodes = tree.css(selector)
+    except Exception:
+        return []
+    texts = [_cap_text(n.text(separator=" ")) for n in nodes]
+    return [t for t in texts if t]
+
+
+def _static_meta(tree: HTMLParser) -> Dict[str, str]:
+    data: Dict[str, str] = {}
+    for key, sel in (
+        ("meta_description", "meta[name='description']"),
+        ("meta_keywords", "meta[name='keywords']"),
+        ("og_description", "meta[property='og:description']"),
+    ):
+        node = tree.css_first(sel)
+        content = _normalize_text(node.attributes.get("content") if node is not None else "")
+        if content:
+            data[key] = content
+    title = tree.css_first("title")
+    if title is not None and _normalize_text(title.text()):
+        data["page_title"] = _normalize_text(title.text())
+    return data
+
+
+def _merge_meta(parsed: Dict[str, Any], meta: Dict[str, str]) -> None:
+    for k, v in meta.items():
+        if v and not parsed.get(k):
+            parsed[k] = v
+
+
+def parse_static_html(html: str, profile: PlatformProfile) -> Dict[str, Any]:
+    """
+    Parse server-rendered HTML with the platform's parser table (plain CSS selectors
+    only); generic pages get the title and their main content.
+    """
+    tree = HTMLParser(html)
+    meta = _static_meta(tree)
+    tree.strip_tags(_STATIC_STRIP_TAGS)
+    if profile.fields is None:
+        parsed = _result(profile.name, {"title": meta.get("page_title", ""), "description": _static_main_text(tree)})
+    else:
+        fields: Dict[str, Any] = {}
+        for name, selectors in profile.fields.items():
+            if name == "skills":
+                fields[name] = _static_all_texts(tree, selectors)
+            else:
+                fields[name] = _static_text(tree, profile.name, name, selectors)
+        parsed = _result(profile.name, fields)
+    _merge_meta(parsed, meta)
+    return parsed
+
+
+async def _scrape_static(url: str, profile: PlatformProfile) -> Optional[Dict[str, Any]]:
+    """
+    Static tier. Returns None when the page needs a browser (blocked, not HTML,
+    or title/description missing from the server-rendered markup).
+    """
+    try:
+        resp = await _get_http().get(url)
+    except httpx.HTTPError as ex:
+        record_upstream("job_page_static", "error")
+        if DEBUG:
+            print(f"[DEBUG] static scrape failed for {url}: {ex}", file=sys.stderr)
+        return None
+    record_upstream("job_page_static", resp.status_code)
+    if resp.status_code != 200 or "html" not in resp.headers.get("Content-Type", "").lower():
+        return None
+    parsed = parse_static_html(resp.text, profile)
+    if not parsed.get("title") or len(parsed.get("description") or "") < SCRAPER_STATIC_MIN_DESCRIPTION:
+        return None
+    parsed["url"] = url
+    parsed["http_status"] = resp.status_code
+    return parsed
+
+
+async def scrape_job_posting(url: str, force_refresh: bool = False) -> dict:
+    """
+    Scrape a job posting, served from the scrape cache when possible.
+
+    The canonical URL is the cache and single-flight key, so tracking parameters
+    and host aliases hit the same entry and concurrent scrapes of the same posting
+    share one run. The page itself is fetched from the URL as given.
+    force_refresh skips the cache lookup (the fresh result is still stored).
+    """
+    key = canonicalize_job_url(url)
+    cache = _get_cache() if SCRAPE_CACHE_ENABLED else None
+    if cache is not None:
+        if force_refresh:
+            cache.record_bypass()
         else:
-            # Generic fallback
-            parsed = {
-                "platform": "generic",
-                "title": _normalize_text(await page.title()),
-                "description": _normalize_text(await page.inner_text("body")),
-                "requirements": "",
-                "budget": "",
-                "timeline": "",
-                "skills": [],
-                "currency": "",
-                "location": "",
-            }
-        # Enrich result and attach fallbacks before closing
-        parsed["url"] = url
-        if not parsed.get("description"):
-            try:
-                body_text = await page.inner_text("body")
-            except Exception:
-                body_text = ""
-            parsed["description"] = _normalize_text(body_text)
+            cached = await cache.get(key)
+            if cached is not None:
+                if DEBUG:
+                    print(f"[DEBUG] scrape cache hit: {key}", file=sys.stderr)
+                _scrape_tiers.inc(platform=cached.get("platform") or "generic", tier="cache")
+                return {**cached, "scrape_tier": "cache"}
+    # Each caller gets its own copy so later mutations do not leak between requests
+    result = await singleflight.group("scrape").do(key, lambda: _scrape_and_store(url, key))
+    return dict(result)
 
-        # Attach meta tags if not already present
-        try:
-            meta = await _extract_meta(page)
-            for k, v in meta.items():
-                if v and not parsed.get(k):
-                    parsed[k] = v
-        except Exception:
-            pass
 
-        await context.close()
-        await browser.close()
-        return parsed
+async def _scrape_and_store(url: str, key: str) -> dict:
+    result = await _scrape_job_posting(url)
+    _scrape_tiers.inc(platform=result.get("platform") or "generic", tier=result.get("scrape_tier") or "browser")
+    ttl = SCRAPE_CACHE_TTLS.get(result.get("platform") or "generic", 0.0)
+    if SCRAPE_CACHE_ENABLED and ttl > 0 and result.get("description") and result.get("http_status", 200) < 400:
+        await _get_cache().set(key, result, ttl)
+    return result
+
+
+async def _scrape_job_posting(url: str) -> dict:
+    """
+    Tiered fetch: static HTML first, the browser only when required fields are missing.
+    The result's scrape_tier says which tier served it and page_requests how many
+    times the site was hit (2 when the static attempt fell through to the browser).
+    """
+    profile = platform_for(urlparse(url).hostname or "")
+    requests = 0
+    if SCRAPER_STATIC_ENABLED:
+        requests += 1
+        with stage("scrape_static"):
+            parsed = await _scrape_static(url, profile)
+        if parsed is not None:
+            parsed["scrape_tier"] = "static"
+            parsed["page_requests"] = requests
+            return parsed
+    parsed = await _scrape_browser(url, profile)
+    parsed["scrape_tier"] = "browser"
+    parsed["page_requests"] = requests + 1
+    return parsed
+
+
+async def _scrape_browser(url: str, profile: PlatformProfile) -> dict:
+    async with contextlib.AsyncExitStack() as stack:
+        with stage("scrape_lease"):
+            page = await stack.enter_async_context(_pool.lease())
+        with stage("scrape_load"):
+            if SCRAPER_BLOCKING:
+                await _install_blocking(page, profile)
+            # Apply stealth to reduce bot detection (optional)
+            if _stealth_async is not None:
+                try:
+                    await _stealth_async(page)
+                except Exception:
+                    pass
+            response = await page.goto(url, timeout=60000, wait_until="domcontentloaded")
+            record_upstream("job_page", response.status if response is not None else "error")
+            await _wait_until_ready(page, profile)
+
+        with stage("scrape_extract"):
+            parsed = await profile.parser(page)
+            parsed["url"] = url
+            if response is not None:
+                parsed["http_status"] = response.status
+    return parsed
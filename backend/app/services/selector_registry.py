@@ -0,0 +1,253 @@
+"""
+Adaptive selector registry for the scraper's parser tables.
+
+Each platform declares, per field, a list of fallback selectors (see the
+*_FIELDS tables in scraper.py), most specific first. The registry keeps
+per-selector statistics and moves selectors that have stopped matching to the
+back, so after a markup change the probes skip the dead ones first.
+
+- Success rate: exponentially weighted (recent scrapes count most), starting at
+  a neutral prior. Lookups where no selector matched (the page has no such
+  field) leave the rates alone.
+- Order: the declared order, except that a selector whose rate fell below
+  dead_rate after at least dead_after samples goes behind the live ones. A
+  fallback never overtakes an earlier selector that still matches.
+- Probes: every lookup records how many selectors were tried before a hit;
+  avg_probes per field is reported and trends toward 1 as the order adapts.
+- Persistence: optional SQLite file (hits, misses and rate per selector),
+  loaded on start and flushed every few lookups and on close.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+__all__ = ["SelectorRegistry"]
+
+_Key = Tuple[str, str, str]
+
+
+class _SelectorStats:
+    __slots__ = ("hits", "misses", "rate", "last_hit_at")
+
+    def __init__(
+        self,
+        hits: int = 0,
+        misses: int = 0,
+        rate: float = 0.5,
+        last_hit_at: float = 0.0,
+    ):
+        self.hits = hits
+        self.misses = misses
+        self.rate = rate
+        self.last_hit_at = last_hit_at
+
+
+class SelectorRegistry:
+    def __init__(
+        self,
+        path: str = "",
+        alpha: float = 0.2,
+        flush_every: int = 20,
+        dead_rate: float = 0.2,
+        dead_after: int = 5,
+    ):
+        self.path = path
+        self.alpha = min(1.0, max(0.01, alpha))
+        self.dead_rate = dead_rate
+        self.dead_after = max(1, dead_after)
+        self.flush_every = max(1, flush_every)
+        self._lock = threading.Lock()
+        self._declared: Dict[Tuple[str, str], List[str]] = {}
+        self._stats: Dict[_Key, _SelectorStats] = {}
+        # (platform, field) -> [lookups, probes]
+        self._probes: Dict[Tuple[str, str], List[int]] = {}
+        self._dirty: set = set()
+        self._conn: Optional[sqlite3.Connection] = None
+        if path:
+            self._open()
+
+    def _open(self) -> None:
+        parent = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(parent, exist_ok=True)
+        self._conn = sqlite3.connect(
+            self.path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS selector_stats ("
+            " platform TEXT NOT NULL,"
+            " field TEXT NOT NULL,"
+            " selector TEXT NOT NULL,"
+            " hits INTEGER NOT NULL,"
+            " misses INTEGER NOT NULL,"
+            " rate REAL NOT NULL,"
+            " last_hit_at REAL NOT NULL,"
+            " PRIMARY KEY (platform, field, selector))"
+        )
+        for (
+            platform,
+            field,
+            selector,
+            hits,
+            misses,
+            rate,
+            last_hit_at,
+        ) in self._conn.execute(
+            "SELECT platform, field, selector, hits, misses, rate, last_hit_at FROM selector_stats"
+        ):
+            self._stats[(platform, field, selector)] = _SelectorStats(
+                hits, misses, rate, last_hit_at
+            )
+
+    def register(self, platform: str, table: Dict[str, Any]) -> None:
+        """
+        Declare a platform's parser table. Only list-valued fields have fallbacks to rank.
+        """
+        with self._lock:
+            for field, selectors in table.items():
+                if isinstance(selectors, (list, tuple)):
+                    self._declared[(platform, field)] = list(selectors)
+
+    def ordered(self, platform: str, field: str, selectors: Sequence[str]) -> List[str]:
+        """
+        Selectors for a field in declared order, dead ones last.
+        """
+        with self._lock:
+            dead = [self._dead((platform, field, sel)) for sel in selectors]
+        return [sel for sel, d in zip(selectors, dead) if not d] + [
+            sel for sel, d in zip(selectors, dead) if d
+        ]
+
+    def table(self, platform: str, table: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Copy of a parser table with every fallback list reordered.
+        """
+        return {
+            field: (
+                self.ordered(platform, field, sels)
+                if isinstance(sels, (list, tuple))
+                else sels
+            )
+            for field, sels in table.items()
+        }
+
+    def _dead(self, key: _Key) -> bool:
+        stats = self._stats.get(key)
+        if stats is None:
+            return False
+        return (
+            stats.hits + stats.misses >= self.dead_after and stats.rate < self.dead_rate
+        )
+
+    def record(
+        self, platform: str, field: str, probed: Sequence[str], winner: Optional[str]
+    ) -> None:
+        """
+        Record one lookup: every probed selector before the winner missed. Without
+        a winner only the counters move.
+        """
+        now = time.time()
+        flush = False
+        with self._lock:
+            for sel in probed:
+                key = (platform, field, sel)
+                stats = self._stats.setdefault(key, _SelectorStats())
+                hit = sel == winner
+                if hit:
+                    stats.hits += 1
+                    stats.last_hit_at = now
+                else:
+                    stats.misses += 1
+                if winner is not None:
+                    stats.rate += self.alpha * ((1.0 if hit else 0.0) - stats.rate)
+                self._dirty.add(key)
+                if hit:
+                    break
+            counters = self._probes.setdefault((platform, field), [0, 0])
+            counters[0] += 1
+            counters[1] += len(probed)
+            flush = self._conn is not None and len(self._dirty) >= self.flush_every
+        if flush:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Write changed rows to SQLite (no-op without a path).
+        """
+        with self._lock:
+            if self._conn is None or not self._dirty:
+                return
+            rows = []
+            for key in self._dirty:
+                s = self._stats[key]
+                rows.append((*key, s.hits, s.misses, s.rate, s.last_hit_at))
+            self._dirty.clear()
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO selector_stats"
+                    " (platform, field, selector, hits, misses, rate, last_hit_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+            except sqlite3.Error:
+                pass
+
+    def reset(self, platform: Optional[str] = None) -> None:
+        with self._lock:
+            keys = [k for k in self._stats if platform is None or k[0] == platform]
+            for key in keys:
+                del self._stats[key]
+                self._dirty.discard(key)
+            for field_key in [
+                k for k in self._probes if platform is None or k[0] == platform
+            ]:
+                del self._probes[field_key]
+            if self._conn is not None:
+                if platform is None:
+                    self._conn.execute("DELETE FROM selector_stats")
+                else:
+                    self._conn.execute(
+                        "DELETE FROM selector_stats WHERE platform = ?", (platform,)
+                    )
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Per platform and field: current probe order, per-selector counters and avg probes.
+        """
+        with self._lock:
+            declared = dict(self._declared)
+        out: Dict[str, Any] = {}
+        for (platform, field), selectors in sorted(declared.items()):
+            order = self.ordered(platform, field, selectors)
+            with self._lock:
+                lookups, probes = self._probes.get((platform, field), [0, 0])
+                rows = []
+                for sel in order:
+                    s = self._stats.get((platform, field, sel)) or _SelectorStats()
+                    rows.append(
+                        {
+                            "selector": sel,
+                            "hits": s.hits,
+                            "misses": s.misses,
+                            "success_rate": round(s.rate, 4),
+                            "last_hit_at": s.last_hit_at or None,
+                        }
+                    )
+            out.setdefault(platform, {})[field] = {
+                "lookups": lookups,
+                "avg_probes": round(probes / lookups, 3) if lookups else None,
+                "selectors": rows,
+            }
+        return {"persistent": self.path != "", "platforms": out}
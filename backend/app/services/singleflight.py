@@ -0,0 +1,118 @@
+"""
+Single-flight request coalescing.
+
+Concurrent callers asking for the same key share one in-flight execution
+instead of each starting their own upstream call. Nothing is cached: once
+the shared call finishes, the next caller starts a new one.
+
+- SingleFlight.do(key, fn): asyncio variant; fn is a coroutine factory.
+  The work runs in its own task, so cancelling one waiter never cancels the
+  work for the others. The task is cancelled only when every waiter is gone.
+
+Groups are registered by name so stats() can report all of them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import threading
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+__all__ = ["SingleFlight", "group", "stats"]
+
+T = TypeVar("T")
+
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: "asyncio.Future[Any]"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.coalesced = 0
+        self.cancelled = 0
+        self.max_waiters = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        call = self._calls.get(key)
+        if call is None or call.task.done():
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(functools.partial(self._forget_done, key, call))
+            with self._lock:
+                self.executions += 1
+        else:
+            with self._lock:
+                self.coalesced += 1
+        call.waiters += 1
+        with self._lock:
+            self.max_waiters = max(self.max_waiters, call.waiters)
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Last interested caller went away: stop the work and let the
+                # next caller start fresh instead of joining a dying task.
+                self._forget(key, call)
+                call.task.cancel()
+                with self._lock:
+                    self.cancelled += 1
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def waiting(self) -> int:
+        with self._lock:
+            return sum(c.waiters for c in self._calls.values())
+
+    def stats(self) -> Dict[str, Any]:
+        in_flight = self.in_flight()
+        waiting = self.waiting()
+        with self._lock:
+            return {
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "cancelled": self.cancelled,
+                "in_flight": in_flight,
+                "waiting": waiting,
+                "max_waiters": self.max_waiters,
+            }
+
+    def _forget(self, key: str, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def _forget_done(self, key: str, call: _Call, _task: "asyncio.Future[Any]") -> None:
+        self._forget(key, call)
+
+
+_groups: Dict[str, SingleFlight] = {}
+_groups_lock = threading.Lock()
+
+
+def group(name: str) -> SingleFlight:
+    """
+    Return the process-wide single-flight group with this name.
+    """
+    with _groups_lock:
+        sf = _groups.get(name)
+        if sf is None:
+            sf = _groups[name] = SingleFlight(name)
+        return sf
+
+
+def stats() -> Dict[str, Dict[str, Any]]:
+    with _groups_lock:
+        groups = list(_groups.values())
+    return {g.name: g.stats() for g in groups}
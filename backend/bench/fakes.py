@@ -0,0 +1,418 @@
+"""
+Local stand-ins for the upstream services, for load tests and offline development.
+
+- Gemini: POST /v1beta/models/{model}:generateContent and :streamGenerateContent (SSE)
+- ElevenLabs: POST /v1/text-to-speech/{voice_id} (returns fake MP3 bytes)
+- Job pages: GET /jobs/{platform}/{job_id} (upwork | freelancer | mostaql | generic HTML)
+- Saved snapshots: GET /corpus/{platform}/{name} (the bench/corpus HTML fixtures, no latency)
+
+Each app takes an UpstreamProfile describing latency, error rate and payload size
+distributions. Point the backend at them with GEMINI_API_BASE and ELEVENLABS_API_BASE.
+
+Usage:
+    python -m bench.fakes --gemini-port 9101 --elevenlabs-port 9102 --jobs-port 9103 \
+        --latency-ms 400 --latency-jitter-ms 150 --error-rate 0.02
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, Tuple
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
+
+__all__ = [
+    "UpstreamProfile",
+    "create_gemini_app",
+    "create_elevenlabs_app",
+    "create_jobs_app",
+    "create_corpus_app",
+    "serve_fakes",
+]
+
+# Saved HTML snapshots (see bench/parsers.py)
+CORPUS_DIR = Path(__file__).resolve().parent / "corpus"
+
+
+@dataclass
+class UpstreamProfile:
+    """
+    Latency is lognormal around latency_ms (jitter = standard deviation), clamped
+    to >= 0. error_rate returns 500s and throttle_rate returns 429s with Retry-After.
+    Payload sizes are drawn uniformly from the given ranges.
+    """
+
+    latency_ms: float = 300.0
+    latency_jitter_ms: float = 100.0
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    retry_after_s: float = 1.0
+    text_words: Tuple[int, int] = (120, 600)
+    audio_bytes_per_char: int = 160
+    page_kb: Tuple[int, int] = (20, 200)
+    stream_chunks: int = 12
+    seed: Optional[int] = None
+    rng: random.Random = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.rng = random.Random(self.seed)
+
+    def latency(self) -> float:
+        mean = max(0.0, self.latency_ms)
+        if mean == 0:
+            return 0.0
+        sigma = max(0.0, self.latency_jitter_ms)
+        if sigma == 0:
+            return mean / 1000.0
+        # Lognormal with the requested mean and standard deviation
+        var = (sigma / mean) ** 2
+        mu = math.log(mean) - 0.5 * math.log1p(var)
+        s = math.sqrt(math.log1p(var))
+        return max(0.0, self.rng.lognormvariate(mu, s)) / 1000.0
+
+    def failure(self) -> Optional[Response]:
+        roll = self.rng.random()
+        if roll < self.throttle_rate:
+            return JSONResponse(
+                {"error": {"code": 429, "message": "Resource exhausted (fake)"}},
+                status_code=429,
+                headers={"Retry-After": str(self.retry_after_s)},
+            )
+        if roll < self.throttle_rate + self.error_rate:
+            return JSONResponse(
+                {"error": {"code": 500, "message": "Internal error (fake)"}},
+                status_code=500,
+            )
+        return None
+
+    def words(self) -> int:
+        lo, hi = self.text_words
+        return self.rng.randint(min(lo, hi), max(lo, hi))
+
+
+_LOREM = (
+    "scope deliverables timeline milestone payment client freelancer project design build "
+    "test deploy review revision support documentation integration dashboard api backend "
+    "frontend database security performance quality communication schedule estimate"
+).split()
+
+
+def _text(profile: UpstreamProfile, words: Optional[int] = None) -> str:
+    n = words or profile.words()
+    return " ".join(profile.rng.choice(_LOREM) for _ in range(n))
+
+
+def _markdown_contract(profile: UpstreamProfile) -> str:
+    body = _text(profile)
+    return (
+        "# Freelance Agreement\n\n## Scope of Work\n" + body + "\n\n"
+        "## Payment Terms\nTotal fee: $2,000. 50% deposit upfront, rest upon delivery. Due within 14 days.\n\n"
+        "## Revisions\nTwo rounds of revisions included.\n\n"
+        "## Termination\nEither party may terminate with 14 days written notice.\n\n"
+        "## Signatures\nClient: ____ Freelancer: ____\n"
+    )
+
+
+def _completion_text(profile: UpstreamProfile, payload: dict) -> str:
+    config = payload.get("generationConfig") or {}
+    if config.get("response_mime_type") == "application/json":
+        return json.dumps(
+            {
+                "proposal_text": _text(profile),
+                "pricing_strategy": "Fixed fee with milestones.",
+                "estimated_timeline": "2-3 weeks",
+                "success_tips": [
+                    "Show similar work",
+                    "Offer a call",
+                    "Confirm milestones",
+                ],
+            }
+        )
+    try:
+        prompt = payload["contents"][0]["parts"][0]["text"]
+    except Exception:
+        prompt = ""
+    if "contract" in prompt.lower():
+        return _markdown_contract(profile)
+    return _text(profile)
+
+
+def _candidate(text: str) -> dict:
+    return {"candidates": [{"content": {"parts": [{"text": text}], "role": "model"}}]}
+
+
+def create_gemini_app(profile: UpstreamProfile) -> FastAPI:
+    app = FastAPI(title="Fake Gemini")
+
+    @app.post("/v1beta/models/{model_action}")
+    async def generate(model_action: str, request: Request):
+        payload = await request.json()
+        failure = profile.failure()
+        total = profile.latency()
+        if failure is not None:
+            await asyncio.sleep(total / 4)
+            return failure
+        text = _completion_text(profile, payload)
+        if not model_action.endswith(":streamGenerateContent"):
+            await asyncio.sleep(total)
+            return JSONResponse(_candidate(text))
+
+        # Streamed: first chunk after ~20% of the latency, the rest spread over the remainder
+        words = text.split(" ")
+        n = max(1, min(profile.stream_chunks, len(words)))
+        step = (len(words) + n - 1) // n
+
+        async def events():
+            await asyncio.sleep(total * 0.2)
+            for i in range(0, len(words), step):
+                stop = i + step
+                chunk = " ".join(words[i:stop]) + (" " if stop < len(words) else "")
+                yield f"data: {json.dumps(_candidate(chunk))}\r\n\r\n"
+                await asyncio.sleep(total * 0.8 / n)
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def create_elevenlabs_app(profile: UpstreamProfile) -> FastAPI:
+    app = FastAPI(title="Fake ElevenLabs")
+
+    def _audio(text: str) -> bytes:
+        size = max(1024, len(text) * profile.audio_bytes_per_char)
+        return b"ID3\x03\x00\x00\x00\x00\x00\x00" + os.urandom(size)
+
+    @app.post("/v1/text-to-speech/{voice_id}")
+    async def tts(voice_id: str, request: Request):
+        payload = await request.json()
+        failure = profile.failure()
+        await asyncio.sleep(profile.latency())
+        if failure is not None:
+            return failure
+        return Response(_audio(str(payload.get("text", ""))), media_type="audio/mpeg")
+
+    @app.post("/v1/text-to-speech/{voice_id}/stream")
+    async def tts_stream(voice_id: str, request: Request):
+        payload = await request.json()
+        failure = profile.failure()
+        total = profile.latency()
+        if failure is not None:
+            await asyncio.sleep(total / 4)
+            return failure
+        audio = _audio(str(payload.get("text", "")))
+        chunk = max(4096, len(audio) // max(1, profile.stream_chunks))
+
+        async def body():
+            await asyncio.sleep(total * 0.2)
+            for i in range(0, len(audio), chunk):
+                stop = i + chunk
+                yield audio[i:stop]
+                await asyncio.sleep(total * 0.8 * chunk / len(audio))
+
+        return StreamingResponse(body(), media_type="audio/mpeg")
+
+    return app
+
+
+_JOB_TEMPLATES = {
+    "upwork": (
+        "<h1 data-test='job-title'>{title}</h1>"
+        "<div data-test='job-description'>{description}</div>"
+        "<span data-test='budget'>$1,500</span><div data-test='duration'>1 to 3 months</div>"
+        "<span data-test='client-location'>United States</span>"
+        "<a aria-label='Skill or expertise'>React</a><a aria-label='Skill or expertise'>FastAPI</a>"
+    ),
+    "freelancer": (
+        "<h1 class='ProjectViewHeader-title'>{title}</h1>"
+        "<div class='ProjectViewHeader-budget'>$250 - $750 USD</div>"
+        "<div class='Project-description'>{description}</div>"
+        "<a href='/jobs/react/'>React</a><a href='/jobs/python/'>Python</a>"
+    ),
+    "mostaql": (
+        "<h1 class='project-header__title'>{title}</h1>"
+        "<div class='project-content__text'>{description}</div>"
+        "<a class='project-skills__item'>React</a>"
+    ),
+    "generic": "<h1>{title}</h1><article><p>{description}</p></article>",
+}
+
+
+def create_jobs_app(profile: UpstreamProfile) -> FastAPI:
+    app = FastAPI(title="Fake job pages")
+
+    @app.get("/jobs/{platform}/{job_id}", response_class=HTMLResponse)
+    async def job_page(platform: str, job_id: str):
+        failure = profile.failure()
+        await asyncio.sleep(profile.latency())
+        if failure is not None:
+            return failure
+        template = _JOB_TEMPLATES.get(platform, _JOB_TEMPLATES["generic"])
+        lo, hi = profile.page_kb
+        target = profile.rng.randint(min(lo, hi), max(lo, hi)) * 1024
+        title = f"Senior React Developer #{job_id}"
+        description = (
+            "We are looking for an experienced developer to build a reporting dashboard. "
+            + _text(profile, 80)
+        )
+        main = template.format(title=title, description=description)
+        # Pad with navigation/footer chrome until the page reaches the target size
+        chrome = (
+            "<nav><a href='/'>Home</a><a href='/jobs'>Jobs</a><a href='/login'>Log in</a></nav>"
+            "<aside><h3>Related jobs</h3><ul>"
+            + "".join(
+                f"<li><a href='/jobs/generic/{i}'>Similar job {i}</a></li>"
+                for i in range(20)
+            )
+            + "</ul></aside>"
+            "<footer>We use cookies. © Example Inc. All rights reserved. Privacy Policy</footer>"
+        )
+        filler = []
+        size = len(main) + len(chrome)
+        while size < target:
+            para = f"<p class='filler'>{_text(profile, 60)}</p>"
+            filler.append(para)
+            size += len(para)
+        html = (
+            "<!doctype html><html><head>"
+            f"<title>{title}</title>"
+            "<meta name='description' content='Fake job page for load testing'>"
+            "<meta property='og:description' content='Fake job page'>"
+            f"</head><body>{chrome}<main>{main}</main>{''.join(filler)}</body></html>"
+        )
+        return HTMLResponse(html)
+
+    return app
+
+
+def create_corpus_app(root: Path) -> FastAPI:
+    """
+    Serve saved HTML snapshots verbatim from root/<platform>/<name>.html.
+    """
+    app = FastAPI(title="Saved job pages")
+    root = Path(root).resolve()
+
+    @app.get("/corpus/{platform}/{name}", response_class=HTMLResponse)
+    async def snapshot(platform: str, name: str):
+        path = (root / platform / f"{name}.html").resolve()
+        if path.parent.parent != root or not path.is_file():
+            raise HTTPException(status_code=404, detail="Unknown snapshot")
+        return HTMLResponse(path.read_text(encoding="utf-8"))
+
+    return app
+
+
+async def serve_fakes(
+    profile: UpstreamProfile,
+    gemini_port: int,
+    elevenlabs_port: int,
+    jobs_port: int,
+    host: str = "127.0.0.1",
+    corpus_port: Optional[int] = None,
+    corpus_dir: Optional[Path] = None,
+) -> list:
+    """
+    Start the fake servers on the running loop (the snapshot server only when
+    corpus_port is given). Returns the uvicorn Server objects; set
+    `server.should_exit = True` to stop them.
+    """
+    import uvicorn
+
+    apps = [
+        (create_gemini_app(profile), gemini_port),
+        (create_elevenlabs_app(profile), elevenlabs_port),
+        (create_jobs_app(profile), jobs_port),
+    ]
+    if corpus_port:
+        apps.append((create_corpus_app(corpus_dir or CORPUS_DIR), corpus_port))
+    servers = []
+    for app, port in apps:
+        config = uvicorn.Config(
+            app, host=host, port=port, log_level="warning", access_log=False
+        )
+        server = uvicorn.Server(config)
+        servers.append(server)
+        asyncio.create_task(server.serve())
+    while not all(s.started for s in servers):
+        await asyncio.sleep(0.05)
+    return servers
+
+
+def add_profile_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=100.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--text-words", type=int, nargs=2, default=(120, 600), metavar=("MIN", "MAX")
+    )
+    parser.add_argument(
+        "--page-kb", type=int, nargs=2, default=(20, 200), metavar=("MIN", "MAX")
+    )
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def profile_from_args(args: argparse.Namespace) -> UpstreamProfile:
+    return UpstreamProfile(
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        text_words=tuple(args.text_words),
+        page_kb=tuple(args.page_kb),
+        seed=args.seed,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Run fake Gemini, ElevenLabs and job page servers"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--gemini-port", type=int, default=9101)
+    parser.add_argument("--elevenlabs-port", type=int, default=9102)
+    parser.add_argument("--jobs-port", type=int, default=9103)
+    parser.add_argument(
+        "--corpus-port",
+        type=int,
+        default=9104,
+        help="Saved snapshot server (0 disables)",
+    )
+    add_profile_args(parser)
+    args = parser.parse_args()
+
+    async def run() -> None:
+        await serve_fakes(
+            profile_from_args(args),
+            args.gemini_port,
+            args.elevenlabs_port,
+            args.jobs_port,
+            args.host,
+            corpus_port=args.corpus_port,
+        )
+        print(
+            f"GEMINI_API_BASE=http://{args.host}:{args.gemini_port}\n"
+            f"ELEVENLABS_API_BASE=http://{args.host}:{args.elevenlabs_port}\n"
+            f"Job pages: http://{args.host}:{args.jobs_port}/jobs/<upwork|freelancer|mostaql|generic>/<id>"
+        )
+        if args.corpus_port:
+            print(
+                f"Saved snapshots: http://{args.host}:{args.corpus_port}/corpus/<platform>/<name>"
+            )
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,417 @@
+"""
+End-to-end load driver for the API.
+
+Starts the fake upstreams (bench/fakes.py) and the app under uvicorn in a
+subprocess wired to them, then drives each router at the requested
+concurrency levels with closed-loop workers. It reports throughput, latency
+percentiles, and the server process's peak RSS and open file descriptors as a
+versioned JSON report.
+
+Usage (from backend/):
+    python -m bench.loadtest --concurrency 1 8 32 --duration 15 --out bench_report.json
+    python -m bench.loadtest --target http://localhost:8000   # existing server, no RSS/FD data
+
+Endpoints: proposal (text or --proposal-mode url through the fake job pages),
+voice, voice_mood, contract.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from bench.fakes import add_profile_args, profile_from_args, serve_fakes
+
+REPORT_SCHEMA_VERSION = 1
+ENDPOINTS = ("proposal", "voice", "voice_mood", "contract")
+_BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    k = (len(sorted_values) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def _proc_usage(pid: Optional[int]) -> Tuple[Optional[int], Optional[int]]:
+    """
+    (rss_bytes, open_fds) for a process, from /proc (Linux only).
+    """
+    if pid is None:
+        return None, None
+    rss = fds = None
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    rss = int(line.split()[1]) * 1024
+                    break
+    except OSError:
+        pass
+    try:
+        fds = len(os.listdir(f"/proc/{pid}/fd"))
+    except OSError:
+        pass
+    return rss, fds
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=_BACKEND_DIR,
+            capture_output=True,
+            text=True,
+            timeout=5,
+        )
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def _request_factory(
+    endpoint: str, proposal_mode: str, jobs_base: str
+) -> Callable[[int], Tuple[str, dict]]:
+    """
+    Return n -> (path, json body). Bodies are unique per request so caches and
+    single-flight do not hide upstream load.
+    """
+    platforms = ["upwork", "freelancer", "mostaql", "generic"]
+
+    def proposal(n: int) -> Tuple[str, dict]:
+        if proposal_mode == "url":
+            return "/api/v1/proposal/generate", {
+                "job_url": f"{jobs_base}/jobs/{platforms[n % len(platforms)]}/{n}",
+                "user_skills": ["React", "FastAPI"],
+            }
+        return "/api/v1/proposal/generate", {
+            "job_description": f"Load test job #{n}: build a React dashboard with a FastAPI backend and charts.",
+            "user_skills": ["React", "FastAPI"],
+            "target_rate": 45.0,
+        }
+
+    def voice(n: int) -> Tuple[str, dict]:
+        return "/api/v1/voice/generate", {
+            "text_to_speak": f"Thanks for your message number {n}. I will follow up shortly."
+        }
+
+    def voice_mood(n: int) -> Tuple[str, dict]:
+        return "/api/v1/voice/generate-response", {
+            "message_text": f"Can we deliver ticket {n} faster? We need it this week.",
+            "language": "en",
+            "max_words": 80,
+        }
+
+    def contract(n: int) -> Tuple[str, dict]:
+        return "/api/v1/contract/generate", {
+            "project_description": f"Load test project {n}: authenticated web app with payments and admin reporting.",
+            "client_details": "ACME Inc.",
+        }
+
+    return {
+        "proposal": proposal,
+        "voice": voice,
+        "voice_mood": voice_mood,
+        "contract": contract,
+    }[endpoint]
+
+
+async def _run_level(
+    client: httpx.AsyncClient,
+    endpoint: str,
+    concurrency: int,
+    duration: float,
+    make_request: Callable[[int], Tuple[str, dict]],
+    server_pid: Optional[int],
+    counter: "itertools.count[int]",
+) -> Dict[str, Any]:
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    errors: Dict[str, int] = {}
+    deadline = time.perf_counter() + duration
+    peak_rss, peak_fds = _proc_usage(server_pid)
+    rss_start = peak_rss
+
+    async def worker() -> None:
+        while time.perf_counter() < deadline:
+            path, body = make_request(next(counter))
+            started = time.perf_counter()
+            try:
+                resp = await client.post(path, json=body)
+                key = str(resp.status_code)
+            except httpx.HTTPError as ex:
+                key = "exception"
+                errors[type(ex).__name__] = errors.get(type(ex).__name__, 0) + 1
+            latencies.append(time.perf_counter() - started)
+            statuses[key] = statuses.get(key, 0) + 1
+
+    async def sampler() -> None:
+        nonlocal peak_rss, peak_fds
+        while time.perf_counter() < deadline:
+            rss, fds = _proc_usage(server_pid)
+            if rss is not None:
+                peak_rss = max(peak_rss or 0, rss)
+            if fds is not None:
+                peak_fds = max(peak_fds or 0, fds)
+            await asyncio.sleep(0.25)
+
+    started = time.perf_counter()
+    await asyncio.gather(sampler(), *(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    ordered = sorted(latencies)
+    ok = sum(v for k, v in statuses.items() if k.startswith("2"))
+    return {
+        "endpoint": endpoint,
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 3),
+        "requests": len(latencies),
+        "ok": ok,
+        "status_counts": statuses,
+        "exceptions": errors,
+        "rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "ok_rps": round(ok / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            name: (round(v * 1000, 2) if v is not None else None)
+            for name, v in (
+                ("p50", _percentile(ordered, 50)),
+                ("p95", _percentile(ordered, 95)),
+                ("p99", _percentile(ordered, 99)),
+                ("max", ordered[-1] if ordered else None),
+            )
+        },
+        "server_rss_bytes": {"start": rss_start, "peak": peak_rss},
+        "server_open_fds_peak": peak_fds,
+    }
+
+
+def _start_server(
+    port: int,
+    gemini_base: str,
+    elevenlabs_base: str,
+    audio_dir: str,
+    extra_env: Dict[str, str],
+) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update(
+        {
+            "GEMINI_API_KEY": "bench",
+            "GEMINI_API_BASE": gemini_base,
+            "ELEVENLABS_API_KEY": "bench",
+            "ELEVENLABS_API_BASE": elevenlabs_base,
+            "AUDIO_STORAGE_PATH": audio_dir,
+            # Measure the upstream path, not the caches; keep the scheduler out of the way
+            "LLM_CACHE_ENABLED": "false",
+            "TTS_CACHE_ENABLED": "false",
+            "GEMINI_RATE_PER_SEC": "10000",
+            "GEMINI_BURST": "10000",
+            "GEMINI_MAX_CONCURRENCY": "1000",
+            "GEMINI_MAX_CONNECTIONS": "1000",
+            "ELEVENLABS_MAX_CONNECTIONS": "1000",
+        }
+    )
+    env.update(extra_env)
+    return subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        cwd=_BACKEND_DIR,
+        env=env,
+    )
+
+
+async def _wait_healthy(base: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {base} did not become healthy")
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    profile = profile_from_args(args)
+    gemini_port, eleven_port, jobs_port = _free_port(), _free_port(), _free_port()
+    fakes = await serve_fakes(profile, gemini_port, eleven_port, jobs_port)
+    jobs_base = f"http://127.0.0.1:{jobs_port}"
+
+    server: Optional[subprocess.Popen] = None
+    audio_dir = tempfile.mkdtemp(prefix="bench_audio_")
+    if args.target:
+        base = args.target.rstrip("/")
+    else:
+        port = _free_port()
+        extra = dict(kv.split("=", 1) for kv in args.server_env)
+        server = _start_server(
+            port,
+            f"http://127.0.0.1:{gemini_port}",
+            f"http://127.0.0.1:{eleven_port}",
+            audio_dir,
+            extra,
+        )
+        base = f"http://127.0.0.1:{port}"
+
+    results: List[Dict[str, Any]] = []
+    try:
+        await _wait_healthy(base)
+        limits = httpx.Limits(
+            max_connections=max(args.concurrency) * 2,
+            max_keepalive_connections=max(args.concurrency),
+        )
+        counter = itertools.count()
+        async with httpx.AsyncClient(
+            base_url=base, timeout=args.timeout, limits=limits
+        ) as client:
+            for endpoint in args.endpoints:
+                make_request = _request_factory(endpoint, args.proposal_mode, jobs_base)
+                for level in args.concurrency:
+                    if args.warmup > 0:
+                        await _run_level(
+                            client,
+                            endpoint,
+                            level,
+                            args.warmup,
+                            make_request,
+                            None,
+                            counter,
+                        )
+                    result = await _run_level(
+                        client,
+                        endpoint,
+                        level,
+                        args.duration,
+                        make_request,
+                        server.pid if server else None,
+                        counter,
+                    )
+                    results.append(result)
+                    print(
+                        f"{endpoint:<11} c={level:<4} rps={result['rps']:<8} ok={result['ok']}/{result['requests']} "
+                        f"p50={result['latency_ms']['p50']}ms p95={result['latency_ms']['p95']}ms "
+                        f"p99={result['latency_ms']['p99']}ms",
+                        file=sys.stderr,
+                    )
+    finally:
+        if server is not None:
+            server.terminate()
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+        for s in fakes:
+            s.should_exit = True
+        await asyncio.sleep(0.1)
+
+    return {
+        "schema_version": REPORT_SCHEMA_VERSION,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "target": args.target or "local-subprocess",
+        "config": {
+            "endpoints": list(args.endpoints),
+            "concurrency": list(args.concurrency),
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "proposal_mode": args.proposal_mode,
+            "upstream_profile": {
+                "latency_ms": profile.latency_ms,
+                "latency_jitter_ms": profile.latency_jitter_ms,
+                "error_rate": profile.error_rate,
+                "throttle_rate": profile.throttle_rate,
+                "text_words": list(profile.text_words),
+                "page_kb": list(profile.page_kb),
+                "seed": profile.seed,
+            },
+        },
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Load test the API against local fake upstreams"
+    )
+    parser.add_argument(
+        "--endpoints", nargs="+", choices=ENDPOINTS, default=list(ENDPOINTS)
+    )
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=10.0,
+        help="Seconds per endpoint/concurrency level",
+    )
+    parser.add_argument(
+        "--warmup", type=float, default=1.0, help="Unmeasured seconds before each level"
+    )
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument(
+        "--proposal-mode",
+        choices=("text", "url"),
+        default="text",
+        help="url scrapes the fake job pages (needs Playwright Chromium)",
+    )
+    parser.add_argument(
+        "--target", default="", help="Existing server base URL (skips launching one)"
+    )
+    parser.add_argument(
+        "--server-env",
+        nargs="*",
+        default=[],
+        metavar="KEY=VALUE",
+        help="Extra environment for the launched server",
+    )
+    parser.add_argument(
+        "--out", default="", help="Write the JSON report here (default: stdout)"
+    )
+    add_profile_args(parser)
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+        print(f"Report written to {args.out}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,421 @@
+"""
+Offline parser benchmark over the saved HTML corpus (bench/corpus).
+
+Each <platform>/<name>.html snapshot has a <name>.golden.json next to it holding
+the page's original URL (which picks the platform profile) and the fields the
+parsers should extract. Per page the benchmark times:
+
+- static: parse_static_html with the platform's parser table (selectolax)
+- meta: _static_meta on a parsed tree (the browser path reads meta tags inside
+  its single page.evaluate, so there is no separate browser timing for it)
+- browser (--browser): the platform's Playwright parser (parse_upwork,
+  parse_freelancer, parse_mostaql or parse_generic) on the snapshot served locally
+
+and compares each path's output with the golden fields. A golden file's
+"static_fields" lists fields the static path leaves empty on that page because
+only a Playwright-only selector (:has-text, :text) matches there.
+Text is compared ignoring whitespace, since innerText and selectolax join nodes
+differently. The exit status is 1 when any output differs from its golden file.
+
+Usage (from backend/):
+    python -m bench.parsers --iterations 200 --out parser_report.json
+    python -m bench.parsers --browser             # also time the Playwright parsers (needs Chromium)
+    python -m bench.parsers --update-golden       # rewrite goldens from the current parsers
+    python -m bench.fakes                         # serves the corpus at :9104/corpus/<platform>/<name>
+
+Adding a page: save the HTML as corpus/<platform>/<name>.html, create
+<name>.golden.json with {"url": "<original URL>"} and run --update-golden
+(with --browser for fields only the browser path can read), then review the diff.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import json
+import platform
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import urlparse
+
+from selectolax.parser import HTMLParser
+
+from app.services import scraper
+from app.services.selector_registry import SelectorRegistry
+from bench.fakes import CORPUS_DIR, create_corpus_app
+from bench.loadtest import _free_port, _git_commit
+
+REPORT_SCHEMA_VERSION = 1
+# Per-scrape keys that are not parser output
+_UNCOMPARED = {"url", "http_status", "scrape_tier"}
+_META_KEYS = ("meta_description", "meta_keywords", "og_description", "page_title")
+
+
+@dataclass
+class Fixture:
+    platform: str
+    name: str
+    path: Path
+    golden_path: Path
+    url: str
+    html: str
+    golden: Dict[str, Any]
+
+    @property
+    def id(self) -> str:
+        return f"{self.platform}/{self.name}"
+
+    @property
+    def profile(self) -> scraper.PlatformProfile:
+        return scraper.platform_for(urlparse(self.url).hostname or "")
+
+
+def load_corpus(
+    root: Path = CORPUS_DIR, platforms: Optional[List[str]] = None
+) -> List[Fixture]:
+    fixtures = []
+    for path in sorted(Path(root).glob("*/*.html")):
+        platform_name = path.parent.name
+        if platforms and platform_name not in platforms:
+            continue
+        golden_path = path.with_suffix(".golden.json")
+        if not golden_path.is_file():
+            raise FileNotFoundError(
+                f"{golden_path} is missing (it must at least hold the page url)"
+            )
+        golden = json.loads(golden_path.read_text(encoding="utf-8"))
+        fixtures.append(
+            Fixture(
+                platform=platform_name,
+                name=path.stem,
+                path=path,
+                golden_path=golden_path,
+                url=golden["url"],
+                html=path.read_text(encoding="utf-8"),
+                golden=golden,
+            )
+        )
+    return fixtures
+
+
+def _has_browser_only(selectors: Any) -> bool:
+    if isinstance(selectors, str):
+        selectors = [selectors]
+    return any(scraper._PLAYWRIGHT_ONLY_RE.search(sel) for sel in selectors)
+
+
+def expected_fields(fixture: Fixture, path: str) -> Dict[str, Any]:
+    """
+    Golden fields as the given path ("static", "meta" or "browser") should produce them.
+    """
+    expected = dict(fixture.golden.get("fields") or {})
+    if path == "meta":
+        return {k: v for k, v in expected.items() if k in _META_KEYS}
+    if path == "static":
+        expected.update(fixture.golden.get("static_fields") or {})
+    return expected
+
+
+def _loose(value: Any) -> Any:
+    if isinstance(value, (list, tuple)):
+        return [_loose(v) for v in value]
+    if isinstance(value, str):
+        return "".join(value.split())
+    return value
+
+
+def compare(actual: Dict[str, Any], expected: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Field-by-field differences; missing and empty values count as equal.
+    """
+    mismatches = []
+    for key in sorted((set(actual) | set(expected)) - _UNCOMPARED):
+        got, want = actual.get(key) or "", expected.get(key) or ""
+        if _loose(got) != _loose(want):
+            mismatches.append({"field": key, "expected": want, "actual": got})
+    return mismatches
+
+
+def _timings(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 4),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 4),
+        "p95_ms": round(
+            ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 4
+        ),
+        "min_ms": round(ordered[0] * 1000, 4),
+    }
+
+
+@contextlib.contextmanager
+def isolated_selectors() -> Iterator[SelectorRegistry]:
+    """
+    Run with a fresh in-memory selector registry, so each page is parsed from
+    the declared fallback order (results do not depend on which pages ran
+    before it) and nothing is written to SELECTOR_STATS_PATH.
+    """
+    saved = scraper._selectors
+    registry = SelectorRegistry()
+    for profile in scraper.PLATFORMS:
+        if profile.fields:
+            registry.register(profile.name, profile.fields)
+    scraper._selectors = registry
+    try:
+        yield registry
+    finally:
+        scraper._selectors = saved
+
+
+def bench_static(fixtures: List[Fixture], iterations: int) -> List[Dict[str, Any]]:
+    rows = []
+    for fx in fixtures:
+        profile = fx.profile
+        with isolated_selectors():
+            parsed = scraper.parse_static_html(fx.html, profile)
+            samples = []
+            for _ in range(iterations):
+                start = time.perf_counter()
+                scraper.parse_static_html(fx.html, profile)
+                samples.append(time.perf_counter() - start)
+        rows.append(
+            {
+                "fixture": fx.id,
+                "path": "static",
+                "parser": "parse_static_html",
+                "bytes": len(fx.html.encode("utf-8")),
+                **_timings(samples),
+                "output": parsed,
+            }
+        )
+
+        tree = HTMLParser(fx.html)
+        samples = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            scraper._static_meta(tree)
+            samples.append(time.perf_counter() - start)
+        rows.append(
+            {
+                "fixture": fx.id,
+                "path": "meta",
+                "parser": "_static_meta",
+                "bytes": len(fx.html.encode("utf-8")),
+                **_timings(samples),
+                "output": scraper._static_meta(tree),
+            }
+        )
+    return rows
+
+
+async def bench_browser(
+    fixtures: List[Fixture], iterations: int, root: Path = CORPUS_DIR
+) -> List[Dict[str, Any]]:
+    """
+    Load each snapshot once in Chromium from a local server and time repeated
+    runs of the platform's parser on the loaded page.
+    """
+    import uvicorn
+
+    from app.services.browser_pool import BrowserPool
+
+    port = _free_port()
+    server = uvicorn.Server(
+        uvicorn.Config(
+            create_corpus_app(root),
+            host="127.0.0.1",
+            port=port,
+            log_level="warning",
+            access_log=False,
+        )
+    )
+    task = asyncio.create_task(server.serve())
+    pool = BrowserPool(
+        max_pages=1,
+        launch_options=scraper._pool.launch_options,
+        context_options=scraper._pool.context_options,
+    )
+    rows = []
+    try:
+        while not server.started:
+            await asyncio.sleep(0.05)
+        for fx in fixtures:
+            profile = fx.profile
+            async with pool.lease() as page:
+                await scraper._install_blocking(page, profile)
+                await page.goto(
+                    f"http://127.0.0.1:{port}/corpus/{fx.id}",
+                    wait_until="domcontentloaded",
+                )
+                with isolated_selectors():
+                    parsed = await profile.parser(page)
+                    samples = []
+                    for _ in range(iterations):
+                        start = time.perf_counter()
+                        await profile.parser(page)
+                        samples.append(time.perf_counter() - start)
+            rows.append(
+                {
+                    "fixture": fx.id,
+                    "path": "browser",
+                    "parser": profile.parser.__name__,
+                    "bytes": len(fx.html.encode("utf-8")),
+                    **_timings(samples),
+                    "output": parsed,
+                }
+            )
+    finally:
+        await pool.shutdown()
+        server.should_exit = True
+        await task
+    return rows
+
+
+def update_golden(fixtures: List[Fixture], rows: List[Dict[str, Any]]) -> int:
+    """
+    Rewrite golden files from this run. "fields" comes from the browser output
+    when there is one, otherwise from the static output with the existing values
+    kept for fields only a Playwright selector can read on that page; those are
+    listed under "static_fields" as empty. Returns the number of files changed.
+    """
+    by_key = {(row["fixture"], row["path"]): row["output"] for row in rows}
+    changed = 0
+    for fx in fixtures:
+        static = {
+            k: v for k, v in by_key[(fx.id, "static")].items() if k not in _UNCOMPARED
+        }
+        browser = by_key.get((fx.id, "browser"))
+        reference = (
+            {k: v for k, v in browser.items() if k not in _UNCOMPARED}
+            if browser is not None
+            else dict(fx.golden.get("fields") or {})
+        )
+        static_fields = {
+            name: static.get(name) or ([] if name == "skills" else "")
+            for name, selectors in (fx.profile.fields or {}).items()
+            if _has_browser_only(selectors)
+            and not static.get(name)
+            and reference.get(name)
+        }
+        fields = (
+            dict(reference)
+            if browser is not None
+            else {**static, **{name: reference[name] for name in static_fields}}
+        )
+        golden = {"url": fx.url, "fields": fields}
+        if static_fields:
+            golden["static_fields"] = static_fields
+        if golden == fx.golden:
+            continue
+        fx.golden_path.write_text(
+            json.dumps(golden, indent=2, ensure_ascii=False) + "\n", encoding="utf-8"
+        )
+        fx.golden = golden
+        changed += 1
+    return changed
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    fixtures = load_corpus(Path(args.corpus), args.platforms or None)
+    rows = bench_static(fixtures, args.iterations)
+    if args.browser:
+        rows += await bench_browser(
+            fixtures, args.browser_iterations, Path(args.corpus)
+        )
+    if args.update_golden:
+        changed = update_golden(fixtures, rows)
+        print(f"{changed} golden file(s) updated", file=sys.stderr)
+    by_id = {fx.id: fx for fx in fixtures}
+    for row in rows:
+        row["mismatches"] = compare(
+            row["output"], expected_fields(by_id[row["fixture"]], row["path"])
+        )
+        if not args.include_output:
+            del row["output"]
+    return {
+        "schema_version": REPORT_SCHEMA_VERSION,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "config": {
+            "iterations": args.iterations,
+            "browser_iterations": args.browser_iterations if args.browser else None,
+            "fixtures": len(fixtures),
+        },
+        "mismatches": sum(len(row["mismatches"]) for row in rows),
+        "results": rows,
+    }
+
+
+def _print_summary(report: Dict[str, Any]) -> None:
+    print(
+        f"{'fixture':36} {'path':8} {'KB':>6} {'p50 ms':>9} {'p95 ms':>9}  golden",
+        file=sys.stderr,
+    )
+    for row in report["results"]:
+        status = (
+            "ok"
+            if not row["mismatches"]
+            else ", ".join(m["field"] for m in row["mismatches"])
+        )
+        print(
+            f"{row['fixture']:36} {row['path']:8} {row['bytes'] / 1024:6.1f} "
+            f"{row['p50_ms']:9.3f} {row['p95_ms']:9.3f}  {status}",
+            file=sys.stderr,
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the job page parsers on saved HTML snapshots"
+    )
+    parser.add_argument("--corpus", default=str(CORPUS_DIR))
+    parser.add_argument(
+        "--platforms", nargs="*", choices=("upwork", "freelancer", "mostaql", "generic")
+    )
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        default=100,
+        help="Timed runs per page (static and meta)",
+    )
+    parser.add_argument(
+        "--browser",
+        action="store_true",
+        help="Also time the Playwright parsers (needs Chromium)",
+    )
+    parser.add_argument("--browser-iterations", type=int, default=20)
+    parser.add_argument(
+        "--update-golden",
+        action="store_true",
+        help="Rewrite golden files from this run",
+    )
+    parser.add_argument(
+        "--include-output", action="store_true", help="Keep parser output in the report"
+    )
+    parser.add_argument(
+        "--out", default="", help="Write the JSON report here (default: stdout)"
+    )
+    args = parser.parse_args()
+    args.iterations = max(1, args.iterations)
+    args.browser_iterations = max(1, args.browser_iterations)
+
+    report = asyncio.run(run(args))
+    _print_summary(report)
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+        print(f"Report written to {args.out}", file=sys.stderr)
+    else:
+        print(text)
+    sys.exit(1 if report["mismatches"] else 0)
+
+
+if __name__ == "__main__":
+    main()
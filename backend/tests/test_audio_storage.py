@@ -0,0 +1,81 @@
+import os
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.services import audio_storage
+from app.services.audio_storage import AudioStaticFiles, AudioSweeper
+
+NOW = 1_000_000.0
+DAY = 24 * 3600.0
+
+
+def _file(directory, name, size, last_used):
+    path = directory / name
+    path.write_bytes(b"x" * size)
+    os.utime(path, (last_used, last_used))
+    return path
+
+
+def test_sweep_expires_then_evicts_least_recently_used(tmp_path):
+    expired = _file(tmp_path, "tts_old.mp3", 100, NOW - 40 * DAY)
+    lru = _file(tmp_path, "tts_lru.mp3", 100, NOW - 3 * DAY)
+    pinned = _file(tmp_path, "tts_pinned.mp3", 100, NOW - 2 * DAY)
+    middle = _file(tmp_path, "tts_mid.mp3", 100, NOW - 1 * DAY)
+    fresh = _file(tmp_path, "tts_fresh.mp3", 100, NOW - 60)
+    stale_part = _file(tmp_path, "tts_x.mp3.abc.part", 50, NOW - 2 * 3600)
+    live_part = _file(tmp_path, "tts_y.mp3.def.part", 50, NOW - 10)
+    notes = _file(tmp_path, "README.txt", 1000, NOW - 400 * DAY)
+
+    sweeper = AudioSweeper(
+        str(tmp_path),
+        max_bytes=250,
+        max_age=30 * DAY,
+        grace=600,
+        part_max_age=3600,
+        clock=lambda: NOW,
+    )
+    with audio_storage.pinned(str(pinned)):
+        result = sweeper.sweep()
+
+    assert result == {"expired": 1, "evicted": 2, "freed_bytes": 300, "skipped": 1}
+    assert not expired.exists() and not lru.exists() and not stale_part.exists()
+    # The in-use file is skipped, so the next least recently used one makes room instead
+    assert pinned.exists() and not middle.exists()
+    assert fresh.exists() and live_part.exists() and notes.exists()
+    stats = sweeper.stats()
+    assert (stats["bytes"], stats["files"]) == (200, 2)
+    assert (
+        stats["expired"],
+        stats["evicted"],
+        stats["partials_removed"],
+        stats["skipped_in_use"],
+    ) == (1, 2, 1, 1)
+
+
+def test_recently_used_files_survive_quota_pressure(tmp_path):
+    used = _file(tmp_path, "tts_used.mp3", 100, NOW - 5 * DAY)
+    idle = _file(tmp_path, "tts_idle.mp3", 100, NOW - 4 * DAY)
+    clock = [NOW]
+    sweeper = AudioSweeper(
+        str(tmp_path), max_bytes=150, max_age=0, grace=600, clock=lambda: clock[0]
+    )
+
+    # A cache hit touches the file: it becomes the most recently used one
+    assert audio_storage.touch(str(used)) == 100
+    clock[0] = used.stat().st_atime + 1
+    sweeper.sweep()
+    assert used.exists() and not idle.exists()
+    assert sweeper.stats()["bytes"] == 100 and sweeper.note_write(100) is True
+
+
+def test_static_files_mark_served_audio_as_used(tmp_path):
+    served = _file(tmp_path, "tts_served.mp3", 10, NOW)
+    app = FastAPI()
+    app.mount("/audio", AudioStaticFiles(directory=str(tmp_path)), name="audio")
+
+    res = TestClient(app).get("/audio/tts_served.mp3")
+    assert res.status_code == 200 and res.content == b"x" * 10
+    assert served.stat().st_atime > NOW + 1000
+    assert served.stat().st_mtime == NOW
+    assert audio_storage._pins == {}
@@ -0,0 +1,65 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from bench.fakes import (
+    CORPUS_DIR,
+    UpstreamProfile,
+    create_corpus_app,
+    create_elevenlabs_app,
+    create_gemini_app,
+    create_jobs_app,
+)
+
+_FAST = dict(
+    latency_ms=0, latency_jitter_ms=0, text_words=(5, 10), page_kb=(1, 2), seed=1
+)
+
+
+def test_fake_gemini_returns_proposal_json_and_streams():
+    client = TestClient(create_gemini_app(UpstreamProfile(**_FAST)))
+    payload = {
+        "contents": [{"parts": [{"text": "proposal prompt"}]}],
+        "generationConfig": {"response_mime_type": "application/json"},
+    }
+    res = client.post("/v1beta/models/gemini-2.5-flash:generateContent", json=payload)
+    text = res.json()["candidates"][0]["content"]["parts"][0]["text"]
+    assert set(json.loads(text)) >= {
+        "proposal_text",
+        "pricing_strategy",
+        "estimated_timeline",
+        "success_tips",
+    }
+
+    res = client.post(
+        "/v1beta/models/gemini-2.5-flash:streamGenerateContent?alt=sse",
+        json={"contents": [{"parts": [{"text": "Draft a contract"}]}]},
+    )
+    frames = [line for line in res.text.splitlines() if line.startswith("data:")]
+    assert len(frames) > 1
+
+
+def test_fake_upstreams_inject_errors_and_serve_media():
+    failing = TestClient(
+        create_elevenlabs_app(UpstreamProfile(**_FAST, throttle_rate=1.0))
+    )
+    res = failing.post("/v1/text-to-speech/voice", json={"text": "hello"})
+    assert res.status_code == 429 and "retry-after" in res.headers
+
+    tts = TestClient(create_elevenlabs_app(UpstreamProfile(**_FAST)))
+    res = tts.post("/v1/text-to-speech/voice", json={"text": "hello"})
+    assert res.headers["content-type"] == "audio/mpeg" and res.content.startswith(
+        b"ID3"
+    )
+
+    jobs = TestClient(create_jobs_app(UpstreamProfile(**_FAST)))
+    res = jobs.get("/jobs/upwork/7")
+    assert "data-test='job-description'" in res.text and len(res.content) >= 1024
+
+
+def test_corpus_app_serves_saved_snapshots_only():
+    client = TestClient(create_corpus_app(CORPUS_DIR))
+    res = client.get("/corpus/mostaql/mobile_app")
+    assert res.status_code == 200 and "project-content__text" in res.text
+    assert client.get("/corpus/mostaql/missing").status_code == 404
+    assert client.get("/corpus/..%2F..%2Fapp/main").status_code == 404
@@ -0,0 +1,173 @@
+import asyncio
+
+import pytest
+
+from app.services.browser_pool import BrowserPool, BrowserPoolClosed
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+        self.closed = False
+
+    async def new_page(self):
+        if not self.browser.connected:
+            raise RuntimeError("Target closed")
+        return object()
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+        self.closed = False
+        self.contexts = []
+        self._handlers = []
+
+    def on(self, event, handler):
+        self._handlers.append(handler)
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **options):
+        if not self.connected:
+            raise RuntimeError("Browser has been closed")
+        ctx = FakeContext(self)
+        self.contexts.append(ctx)
+        return ctx
+
+    def crash(self):
+        self.connected = False
+        for handler in self._handlers:
+            handler(self)
+
+    async def close(self):
+        self.closed = True
+        self.connected = False
+
+
+class FakePool(BrowserPool):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.browsers = []
+
+    async def _launch(self):
+        browser = FakeBrowser()
+        self.browsers.append(browser)
+        return browser
+
+
+def test_pool_reuses_browser_and_isolates_contexts():
+    async def main():
+        pool = FakePool(max_pages=2)
+        await pool.start()
+        for _ in range(3):
+            async with pool.lease():
+                pass
+        browser = pool.browsers[0]
+        assert len(pool.browsers) == 1
+        assert len(browser.contexts) == 3
+        assert all(ctx.closed for ctx in browser.contexts)
+        await pool.shutdown()
+        assert browser.closed
+        with pytest.raises(BrowserPoolClosed):
+            async with pool.lease():
+                pass
+
+    asyncio.run(main())
+
+
+def test_pool_caps_concurrent_pages():
+    async def main():
+        pool = FakePool(max_pages=2)
+        peak = 0
+
+        async def scrape():
+            nonlocal peak
+            async with pool.lease():
+                peak = max(peak, pool.stats()["active_pages"])
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(scrape() for _ in range(6)))
+        assert peak == 2
+        assert pool.stats()["pages_served"] == 6
+        await pool.shutdown()
+
+    asyncio.run(main())
+
+
+def test_pool_recycles_after_max_uses_and_after_crash():
+    async def main():
+        pool = FakePool(max_uses=2)
+        for _ in range(2):
+            async with pool.lease():
+                pass
+        await asyncio.sleep(0)
+        assert pool.browsers[0].closed
+        assert pool.stats()["recycles"] == 1
+
+        async with pool.lease():
+            pass
+        pool.browsers[1].crash()
+        async with pool.lease():
+            pass
+        assert len(pool.browsers) == 3
+        assert pool.stats()["crashes"] == 1
+        await pool.shutdown()
+
+    asyncio.run(main())
+
+
+def test_pool_shutdown_drains_in_flight_pages():
+    async def main():
+        pool = FakePool()
+        finished = []
+
+        async def scrape():
+            async with pool.lease():
+                await asyncio.sleep(0.05)
+                finished.append(True)
+
+        task = asyncio.ensure_future(scrape())
+        await asyncio.sleep(0.01)
+        await pool.shutdown()
+        assert finished == [True]
+        assert pool.browsers[0].closed
+        await task
+
+    asyncio.run(main())
+
+
+def test_pool_shutdown_awaits_retired_closes_and_can_reopen():
+    async def main():
+        pool = FakePool(max_uses=1)
+        async with pool.lease():
+            pass
+        first = pool.browsers[0]
+        closing = asyncio.Event()
+
+        async def slow_close():
+            closing.set()
+            await asyncio.sleep(0.02)
+            first.closed = True
+
+        first.close = slow_close
+        async with pool.lease():
+            pass
+        # The first browser retired at its only use and closes in the background
+        await closing.wait()
+        await pool.shutdown()
+        assert first.closed and not pool._closes
+        with pytest.raises(BrowserPoolClosed):
+            async with pool.lease():
+                pass
+
+        pool.open()
+        async with pool.lease():
+            pass
+        await pool.shutdown()
+
+    asyncio.run(main())
@@ -0,0 +1,98 @@
+import asyncio
+import time
+
+from app.services import perplexity
+from app.services.cache import LRUCache, SQLiteCache, TieredCache, make_key
+
+
+def test_make_key_is_order_independent_for_dicts():
+    assert make_key("m", {"a": 1, "b": 2}) == make_key("m", {"b": 2, "a": 1})
+    assert make_key("m", {"a": 1}) != make_key("other", {"a": 1})
+
+
+def test_lru_evicts_oldest_and_expires():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", "1", ttl=60)
+    cache.set("b", "2", ttl=60)
+    assert cache.get("a") == "1"  # touch "a" so "b" is least recently used
+    cache.set("c", "3", ttl=60)
+    assert cache.get("b") is None
+    assert cache.get("a") == "1" and cache.get("c") == "3"
+    assert cache.evictions == 1
+
+    cache.set("d", "4", ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("d") is None
+
+
+def test_sqlite_tier_survives_new_memory_tier(tmp_path):
+    path = str(tmp_path / "cache.db")
+    first = TieredCache("t", LRUCache(), SQLiteCache(path, "t"))
+    asyncio.run(first.set("k", {"v": 1}, ttl=60))
+    first.close()
+
+    second = TieredCache("t", LRUCache(), SQLiteCache(path, "t"))
+    assert asyncio.run(second.get("k")) == {"v": 1}
+    assert second.stats()["disk_hits"] == 1
+    assert asyncio.run(second.get("k")) == {"v": 1}
+    assert second.stats()["memory_hits"] == 1
+    second.close()
+
+
+def test_completion_cache_hits_and_bypass(monkeypatch):
+    calls = []
+
+    async def fake_post(payload, lane="default"):
+        calls.append(payload)
+        return f"answer {len(calls)}"
+
+    monkeypatch.setattr(perplexity, "_post_to_gemini", fake_post)
+    monkeypatch.setattr(perplexity, "LLM_CACHE_SQLITE_PATH", "")
+    monkeypatch.setattr(perplexity, "_cache", None)
+
+    first = asyncio.run(perplexity.get_text_completion("same prompt"))
+    second = asyncio.run(perplexity.get_text_completion("same prompt"))
+    assert first == second == "answer 1"
+    assert len(calls) == 1
+
+    fresh = asyncio.run(
+        perplexity.get_text_completion("same prompt", bypass_cache=True)
+    )
+    assert fresh == "answer 2"
+    stats = perplexity.cache_stats()
+    assert stats["memory_hits"] == 1 and stats["bypasses"] == 1
+
+
+def test_completion_cache_skips_errors(monkeypatch):
+    async def failing_post(payload, lane="default"):
+        return "AI service error"
+
+    monkeypatch.setattr(perplexity, "_post_to_gemini", failing_post)
+    monkeypatch.setattr(perplexity, "LLM_CACHE_SQLITE_PATH", "")
+    monkeypatch.setattr(perplexity, "_cache", None)
+
+    asyncio.run(perplexity.get_proposal_completion_json("prompt"))
+    assert perplexity.cache_stats()["writes"] == 0
+
+
+def test_gemini_calls_share_flight_only_within_a_lane(monkeypatch):
+    calls = []
+
+    async def fake_once(payload, lane):
+        calls.append(lane)
+        await asyncio.sleep(0.01)
+        return f"answer for {lane}"
+
+    monkeypatch.setattr(perplexity, "_post_to_gemini_once", fake_once)
+    payload = {"contents": [{"parts": [{"text": "same"}]}]}
+
+    async def main():
+        return await asyncio.gather(
+            perplexity._post_to_gemini(payload, "batch"),
+            perplexity._post_to_gemini(payload, "batch"),
+            perplexity._post_to_gemini(payload, "interactive"),
+        )
+
+    results = asyncio.run(main())
+    assert results == ["answer for batch", "answer for batch", "answer for interactive"]
+    assert sorted(calls) == ["batch", "interactive"]
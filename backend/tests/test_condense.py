@@ -0,0 +1,50 @@
+from app.services.condense import condense_job_text, estimate_tokens
+
+_GENERIC_PAGE = (
+    "Home Jobs Post a Job\n"
+    "We use cookies to improve your experience. Accept all\n"
+    "Senior React Developer\n"
+    "We are looking for an experienced React developer to build a reporting dashboard with charts.\n"
+    "You will integrate a FastAPI backend and deliver within 4 weeks. Budget: $3,000 fixed.\n"
+    "Requirements: 3+ years of React and TypeScript experience.\n"
+    "Similar jobs\n"
+    "Related jobs: Vue developer needed for landing page\n"
+    "We are looking for an experienced React developer to build a reporting dashboard with charts.\n"
+    "© 2025 Example Inc. All rights reserved. Privacy Policy | Terms of Service\n"
+)
+
+
+def test_removes_boilerplate_and_duplicates():
+    out = condense_job_text(_GENERIC_PAGE, max_tokens=100)
+    assert "cookies" not in out.lower()
+    assert "rights reserved" not in out.lower()
+    assert "similar jobs" not in out.lower()
+    assert out.count("looking for an experienced React developer") == 1
+    assert "Budget: $3,000 fixed." in out
+    assert "Requirements: 3+ years" in out
+
+
+def test_trims_to_budget_keeping_relevant_blocks_in_order():
+    filler = " ".join(
+        f"Sidebar entry number {i} about nothing in particular." for i in range(200)
+    )
+    text = (
+        filler
+        + " We need a Django developer to build a REST API. Budget is $500 and the deadline is 2 weeks."
+    )
+    out = condense_job_text(text, max_tokens=40)
+    assert estimate_tokens(out) <= 40
+    assert "We need a Django developer to build a REST API." in out
+    assert "Budget is $500" in out
+
+
+def test_short_text_is_left_intact():
+    text = "We need a React dashboard with FastAPI backend for authentication and reporting."
+    assert condense_job_text(text) == text
+
+
+def test_text_within_budget_keeps_short_content_lines():
+    text = "We need a backend developer.\nPython Django PostgreSQL\nRemote only"
+    assert condense_job_text(text) == text
+    duplicated = text + "\nWe need a backend developer."
+    assert condense_job_text(duplicated) == text
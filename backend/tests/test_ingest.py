@@ -0,0 +1,209 @@
+import asyncio
+import time
+
+from app.services.ingest import Crawler, IngestStore
+
+
+async def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def test_crawler_ingests_frontier_politely(tmp_path):
+    store = IngestStore(str(tmp_path / "ingest.sqlite3"))
+    starts = {}
+    active = {}
+    peak = {}
+
+    async def fetch(url):
+        host = url.split("/")[2]
+        starts.setdefault(host, []).append(time.monotonic())
+        active[host] = active.get(host, 0) + 1
+        peak[host] = max(peak.get(host, 0), active[host])
+        await asyncio.sleep(0.02)
+        active[host] -= 1
+        return {
+            "platform": "generic",
+            "title": url,
+            "description": "A job",
+            "skills": ["Python"],
+            "http_status": 200,
+        }
+
+    async def main():
+        crawler = Crawler(
+            store, fetch, workers=8, host_concurrency=1, host_interval=0.05
+        )
+        await crawler.start()
+        urls = [f"https://a.example/jobs/{i}" for i in range(5)] + [
+            f"https://b.example/jobs/{i}" for i in range(5)
+        ]
+        assert await crawler.enqueue(urls + urls[:3]) == 10
+        await _wait_for(lambda: crawler.succeeded == 10)
+        await crawler.stop()
+
+    asyncio.run(main())
+    assert store.counts() == {"done": 10, "jobs": 10}
+    assert peak == {"a.example": 1, "b.example": 1}
+    for times in starts.values():
+        gaps = [b - a for a, b in zip(times, times[1:])]
+        assert min(gaps) >= 0.035
+    jobs = store.recent_jobs(limit=20)
+    assert len(jobs) == 10 and jobs[0]["skills"] == ["Python"]
+
+
+def test_crawler_retries_throttles_and_gives_up(tmp_path):
+    store = IngestStore(str(tmp_path / "ingest.sqlite3"))
+    calls = {}
+
+    async def fetch(url):
+        n = calls[url] = calls.get(url, 0) + 1
+        if url.endswith("/gone"):
+            return {"http_status": 404}
+        if url.endswith("/flaky") and n == 1:
+            raise RuntimeError("connection reset")
+        if url.endswith("/busy") and n == 1:
+            return {"http_status": 429}
+        if url.endswith("/broken"):
+            raise RuntimeError("always fails")
+        return {
+            "platform": "generic",
+            "title": "ok",
+            "description": "A job",
+            "http_status": 200,
+        }
+
+    async def main():
+        crawler = Crawler(
+            store,
+            fetch,
+            workers=4,
+            host_concurrency=2,
+            host_interval=0.0,
+            host_cooldown=0.05,
+            max_attempts=3,
+            backoff_base=0.02,
+            backoff_max=0.05,
+        )
+        await crawler.start()
+        await crawler.enqueue(
+            [
+                "https://c.example/gone",
+                "https://c.example/flaky",
+                "https://d.example/busy",
+                "https://c.example/broken",
+            ]
+        )
+        await _wait_for(lambda: crawler.succeeded == 2 and crawler.failed == 2)
+        stats = crawler.stats()
+        await crawler.stop()
+        return stats
+
+    stats = asyncio.run(main())
+    assert stats["throttled"] == 1
+    assert calls["https://c.example/gone"] == 1
+    assert calls["https://c.example/broken"] == 3
+    assert store.counts() == {"done": 2, "failed": 2, "jobs": 2}
+
+
+def test_store_requeues_interrupted_urls(tmp_path):
+    path = str(tmp_path / "ingest.sqlite3")
+    store = IngestStore(path)
+    store.add_urls(
+        ["https://a.example/1", "https://a.example/2", "https://a.example/3"]
+    )
+    assert len(store.claim(limit=10, per_host=2)) == 2
+    store.close()
+
+    reopened = IngestStore(path)
+    assert reopened.requeue_in_progress() == 2
+    assert reopened.counts()["pending"] == 3
+
+
+def test_enqueue_endpoint_requires_admin_token(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+    from app.routers import admin
+    from app.services import ingest
+
+    added = []
+
+    async def fake_enqueue(urls, priority=0):
+        added.extend(urls)
+        return len(urls)
+
+    monkeypatch.setattr(ingest, "enqueue_urls", fake_enqueue)
+    client = TestClient(app)
+    body = {"urls": ["https://www.upwork.com/jobs/~01ab"]}
+
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "")
+    assert client.post("/api/v1/admin/ingest/urls", json=body).status_code == 404
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "secret")
+    assert client.post("/api/v1/admin/ingest/urls", json=body).status_code == 401
+    res = client.post(
+        "/api/v1/admin/ingest/urls", json=body, headers={"X-Admin-Token": "secret"}
+    )
+    assert res.json() == {"submitted": 1, "added": 1}
+    assert added == body["urls"]
+
+
+def test_frontier_dedups_by_canonical_url_but_fetches_as_given(tmp_path):
+    from app.services.scraper import canonicalize_job_url
+
+    store = IngestStore(str(tmp_path / "ingest.sqlite3"))
+    fetched = []
+
+    async def fetch(url):
+        fetched.append(url)
+        return {"platform": "upwork", "description": "A job", "http_status": 200}
+
+    async def main():
+        crawler = Crawler(store, fetch, workers=2, host_interval=0.0)
+        await crawler.start()
+        added = await crawler.enqueue(
+            [
+                "http://upwork.com/jobs/~01ab/?utm_source=mail",
+                "https://www.upwork.com/jobs/~01ab",
+            ],
+            key=canonicalize_job_url,
+        )
+        assert added == 1
+        await _wait_for(lambda: crawler.succeeded == 1)
+        await crawler.stop()
+
+    asyncio.run(main())
+    assert fetched == ["http://upwork.com/jobs/~01ab/?utm_source=mail"]
+    assert store.recent_jobs()[0]["url"] == "https://www.upwork.com/jobs/~01ab"
+
+
+def test_crawler_charges_host_for_every_scrape_request(tmp_path):
+    store = IngestStore(str(tmp_path / "ingest.sqlite3"))
+    starts = []
+
+    async def fetch(url):
+        starts.append(time.monotonic())
+        # Static tier missed, browser tier served: two hits on the site
+        return {
+            "platform": "generic",
+            "title": url,
+            "description": "A job",
+            "http_status": 200,
+            "page_requests": 2,
+        }
+
+    async def main():
+        crawler = Crawler(
+            store, fetch, workers=4, host_concurrency=1, host_interval=0.05
+        )
+        await crawler.start()
+        await crawler.enqueue([f"https://a.example/jobs/{i}" for i in range(4)])
+        await _wait_for(lambda: crawler.succeeded == 4)
+        await crawler.stop()
+        assert crawler.stats()["extra_requests"] == 4
+
+    asyncio.run(main())
+    gaps = [b - a for a, b in zip(starts, starts[1:])]
+    assert min(gaps) >= 0.075
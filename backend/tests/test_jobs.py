@@ -0,0 +1,208 @@
+import asyncio
+import hashlib
+import hmac
+import json
+
+import httpx
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.core import utils
+from app.core.utils import check_callback_url
+from app.services.jobs import Job, JobRunner, JobStore, JobsUnavailable
+
+
+def test_runner_runs_jobs_in_background_and_long_polls():
+    async def main():
+        runner = JobRunner(JobStore(), workers=1, queue_size=1)
+        await runner.start()
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+            return {"ok": True}
+
+        async def broken():
+            raise HTTPException(status_code=502, detail="AI service error")
+
+        job = runner.submit("proposal", slow)
+        assert job.status == "queued"
+        await asyncio.sleep(0.01)
+        failing = runner.submit("proposal", broken)
+        # One running, one queued: the queue is full
+        with pytest.raises(JobsUnavailable):
+            runner.submit("proposal", slow)
+
+        polled = await runner.wait(job.id, timeout=0.05)
+        assert polled.status == "running"
+        release.set()
+        done = await runner.wait(job.id, timeout=1)
+        assert done.status == "succeeded" and done.result == {"ok": True}
+        failed = await runner.wait(failing.id, timeout=1)
+        assert failed.status == "failed"
+        assert failed.error == {"status_code": 502, "detail": "AI service error"}
+        assert runner.stats()["rejected"] == 1
+        await runner.stop()
+
+    asyncio.run(main())
+
+
+def test_store_expires_and_evicts_finished_jobs_only():
+    now = [1000.0]
+    store = JobStore(max_jobs=2, ttl=60, clock=lambda: now[0])
+    first = Job(
+        id="a",
+        kind="proposal",
+        created_at=now[0],
+        status="succeeded",
+        finished_at=now[0],
+    )
+    store.add(first)
+    store.mark_finished(first)
+    store.add(Job(id="b", kind="proposal", created_at=now[0]))
+    # Full: the finished job makes room, the running one never does
+    store.add(Job(id="c", kind="proposal", created_at=now[0]))
+    assert store.get("a") is None and store.stats()["evicted"] == 1
+    with pytest.raises(JobsUnavailable):
+        store.add(Job(id="d", kind="proposal", created_at=now[0]))
+
+    done = store.get("b")
+    done.status, done.finished_at = "succeeded", now[0]
+    store.mark_finished(done)
+    now[0] += 61
+    assert store.get("b") is None and store.get("c") is not None
+    assert store.stats()["expired"] == 1
+
+
+def _resolves_to(monkeypatch, address):
+    async def fake_resolve(host):
+        return [address]
+
+    monkeypatch.setattr(utils, "_resolve", fake_resolve)
+
+
+def test_callback_is_signed_and_retried(monkeypatch):
+    _resolves_to(monkeypatch, "93.184.216.34")
+    received = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        received.append(request)
+        return httpx.Response(500 if len(received) == 1 else 204)
+
+    async def main():
+        runner = JobRunner(JobStore(), callback_secret="s3cret", callback_backoff=0)
+        runner._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        await runner.start()
+
+        async def work():
+            return {"proposal_text": "Hello"}
+
+        job = runner.submit(
+            "proposal", work, callback_url="https://hooks.example.com/done"
+        )
+        await runner.wait(job.id, timeout=1)
+        while job.callback["status"] == "pending":
+            await asyncio.sleep(0.01)
+        await runner.stop()
+        return job
+
+    job = asyncio.run(main())
+    assert job.callback == {"status": "delivered", "attempts": 2, "last_status": 204}
+    body = received[-1].content
+    assert json.loads(body)["result"] == {"proposal_text": "Hello"}
+    expected = hmac.new(b"s3cret", body, hashlib.sha256).hexdigest()
+    assert received[-1].headers["x-toolkit-signature"] == f"sha256={expected}"
+
+
+def test_callback_url_validation():
+    assert (
+        check_callback_url("https://hooks.example.com/x")
+        == "https://hooks.example.com/x"
+    )
+    for bad in (
+        "ftp://example.com/x",
+        "/relative",
+        "http://localhost:9000/x",
+        "http://10.0.0.5/x",
+        "http://[::1]/x",
+    ):
+        with pytest.raises(ValueError):
+            check_callback_url(bad)
+
+
+def test_callback_to_a_name_resolving_to_a_private_address_is_refused(monkeypatch):
+    _resolves_to(monkeypatch, "10.0.0.7")
+    received = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        received.append(request)
+        return httpx.Response(204)
+
+    async def main():
+        runner = JobRunner(JobStore(), callback_backoff=0)
+        runner._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        await runner.start()
+
+        async def work():
+            return {"proposal_text": "Hello"}
+
+        job = runner.submit(
+            "proposal", work, callback_url="https://internal.example.com/done"
+        )
+        await runner.wait(job.id, timeout=1)
+        while job.callback["status"] == "pending":
+            await asyncio.sleep(0.01)
+        await runner.stop()
+        return job
+
+    job = asyncio.run(main())
+    assert job.callback == {"status": "failed", "attempts": 1, "last_status": None}
+    assert received == []
+
+
+def test_proposal_job_api_returns_202_then_result(monkeypatch):
+    from app.main import app
+    from app.routers import proposal
+    from app.services import scraper
+
+    async def fake_completion(prompt, bypass_cache=False):
+        await asyncio.sleep(0.05)
+        return json.dumps(
+            {
+                "proposal_text": "Hello, I can build this for you.",
+                "pricing_strategy": "Fixed fee",
+                "estimated_timeline": "2 weeks",
+                "success_tips": ["a"],
+            }
+        )
+
+    monkeypatch.setattr(proposal, "get_proposal_completion_json", fake_completion)
+    monkeypatch.setattr(scraper, "SCRAPER_WARMUP", False)
+    with TestClient(app) as client:
+        res = client.post(
+            "/api/v1/proposal/jobs",
+            json={"job_description": "Build a React dashboard with charts."},
+        )
+        assert res.status_code == 202
+        accepted = res.json()
+        assert (
+            res.headers["location"]
+            == accepted["status_url"]
+            == f"/api/v1/jobs/{accepted['job_id']}"
+        )
+
+        res = client.get(accepted["status_url"], params={"wait": 5})
+        body = res.json()
+        assert body["status"] == "succeeded"
+        assert body["result"]["estimated_timeline"] == "2 weeks"
+
+        assert client.get("/api/v1/jobs/unknown").status_code == 404
+        res = client.post(
+            "/api/v1/proposal/jobs",
+            json={
+                "job_description": "Build a React dashboard with charts.",
+                "callback_url": "http://127.0.0.1/hook",
+            },
+        )
+        assert res.status_code == 422
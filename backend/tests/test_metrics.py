@@ -0,0 +1,63 @@
+import httpx
+from fastapi.testclient import TestClient
+
+from app.core import metrics
+from app.main import app
+from app.services import perplexity
+
+
+def test_histogram_renders_cumulative_buckets():
+    hist = metrics.Histogram(
+        "test_latency_seconds", "test", ("stage",), buckets=(0.1, 1.0)
+    )
+    hist.observe(0.05, stage="llm")
+    hist.observe(0.5, stage="llm")
+    hist.observe(5.0, stage="llm")
+    lines = hist.render()
+    assert 'test_latency_seconds_bucket{stage="llm",le="0.1"} 1' in lines
+    assert 'test_latency_seconds_bucket{stage="llm",le="1.0"} 2' in lines
+    assert 'test_latency_seconds_bucket{stage="llm",le="+Inf"} 3' in lines
+    assert 'test_latency_seconds_count{stage="llm"} 3' in lines
+
+
+def test_server_timing_and_metrics_endpoint(monkeypatch):
+    def handler(request: httpx.Request) -> httpx.Response:
+        text = "# Agreement\n## Payment\nBuild the app."
+        return httpx.Response(
+            200, json={"candidates": [{"content": {"parts": [{"text": text}]}}]}
+        )
+
+    monkeypatch.setattr(perplexity, "GEMINI_API_KEY", "test")
+    monkeypatch.setattr(perplexity, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(
+        perplexity, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+
+    client = TestClient(app)
+    res = client.post(
+        "/api/v1/contract/generate",
+        json={"project_description": "Build an authenticated web app with reporting."},
+    )
+    assert res.status_code == 200, res.text
+    timing = res.headers["server-timing"]
+    for name in ("prompt_build", "llm", "risk", "total"):
+        assert f"{name};dur=" in timing
+
+    res = client.post(
+        "/api/v1/proposal/generate",
+        json={"job_description": "Build a React dashboard with charts and exports."},
+    )
+    assert res.status_code == 200, res.text
+    for name in ("prompt_build", "llm", "parse", "total"):
+        assert f"{name};dur=" in res.headers["server-timing"]
+
+    body = client.get("/metrics").text
+    assert 'stage="llm"' in body
+    assert 'endpoint="/api/v1/contract/generate"' in body
+    assert (
+        'freelancer_toolkit_upstream_responses_total{upstream="gemini",status="200"}'
+        in body
+    )
+    # /metrics itself is not instrumented
+    assert 'endpoint="/metrics"' not in body
+    assert "server-timing" not in client.get("/metrics").headers
@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from app.services import scraper
+from bench.parsers import (
+    bench_static,
+    compare,
+    expected_fields,
+    isolated_selectors,
+    load_corpus,
+    update_golden,
+)
+
+CORPUS = load_corpus()
+
+
+def test_corpus_covers_every_platform():
+    assert {fx.platform for fx in CORPUS} == {
+        "upwork",
+        "freelancer",
+        "mostaql",
+        "generic",
+    }
+    for fx in CORPUS:
+        assert fx.profile.name == fx.platform
+
+
+@pytest.mark.parametrize("fixture", CORPUS, ids=lambda fx: fx.id)
+def test_static_parser_matches_golden(fixture):
+    with isolated_selectors():
+        parsed = scraper.parse_static_html(fixture.html, fixture.profile)
+    assert compare(parsed, expected_fields(fixture, "static")) == []
+
+
+def test_compare_ignores_whitespace_and_flags_wrong_fields():
+    expected = {"title": "Build a dashboard", "skills": ["React", "Jest"], "budget": ""}
+    assert (
+        compare(
+            {"title": "Build  a\ndashboard", "skills": ["React", "Jest"], "url": "x"},
+            expected,
+        )
+        == []
+    )
+    mismatches = compare(
+        {"title": "Hourly", "skills": ["React"], "budget": ""}, expected
+    )
+    assert [m["field"] for m in mismatches] == ["skills", "title"]
+
+
+def test_update_golden_keeps_browser_only_values(tmp_path):
+    fixture = next(
+        fx
+        for fx in load_corpus(platforms=["upwork"])
+        if fx.name == "fixed_price_legacy"
+    )
+    fixture.golden_path = tmp_path / "golden.json"
+    rows = bench_static([fixture], iterations=1)
+    assert update_golden([fixture], rows) == 0
+
+    fixture.golden = {
+        "url": fixture.url,
+        "fields": {**fixture.golden["fields"], "title": "stale"},
+    }
+    assert update_golden([fixture], rows) == 1
+    written = json.loads(fixture.golden_path.read_text(encoding="utf-8"))
+    assert written["fields"]["title"] == "Shopify Store Migration From WooCommerce"
+    # Only a Playwright selector reads these on this page
+    assert written["fields"]["timeline"] == "1 to 3 months"
+    assert written["static_fields"] == {"timeline": "", "location": ""}
@@ -0,0 +1,59 @@
+from app.services.risk import analyze_contract_risk
+
+_SOLID_CONTRACT = """# Freelance Software Development Agreement
+
+## 1. Scope of Work
+Build a web app. Out-of-scope work requires a change request and is billed separately.
+
+## 2. Timeline
+Delivery within 6 weeks from signing.
+
+## 3. Payment Terms
+Total fee: $3,000. 30% deposit upfront, the rest upon delivery. Invoices are due within 14 days.
+Late payments incur 2% monthly interest.
+
+## 4. Revisions
+Includes two rounds of revisions.
+
+## 5. Intellectual Property
+Ownership transfers to the Client upon receipt of full payment.
+
+## 6. Confidentiality
+Both parties keep shared information confidential.
+
+## 7. Limitation of Liability
+In no event shall liability exceed the fees paid.
+
+## 8. Termination
+Either party may terminate with 14 days written notice. The Client pays for work completed.
+
+## 9. Signatures
+Client: ______  Freelancer: ______
+"""
+
+
+def test_complete_contract_scores_low():
+    risk = analyze_contract_risk(_SOLID_CONTRACT)
+    assert risk["risk_score"] == 0
+    assert risk["risk_level"] == "low"
+    assert risk["risk_flags"] == [] and risk["recommendations"] == []
+
+
+def test_missing_clauses_are_flagged():
+    text = _SOLID_CONTRACT.replace(
+        "Includes two rounds of revisions.",
+        "Unlimited revisions until the client is satisfied.",
+    )
+    text = text.split("## 8. Termination")[0]
+    risk = analyze_contract_risk(text)
+    assert "Revisions not capped" in risk["risk_flags"]
+    assert "Termination terms missing" in risk["risk_flags"]
+    assert "Signature block missing" in risk["risk_flags"]
+    assert len(risk["recommendations"]) == len(risk["risk_flags"])
+    assert 0 < risk["risk_score"] <= 100
+
+
+def test_empty_contract_is_high_risk():
+    risk = analyze_contract_risk("")
+    assert risk["risk_level"] == "high"
+    assert risk["risk_score"] == 100
@@ -0,0 +1,93 @@
+import asyncio
+
+import httpx
+
+from app.services.scheduler import UpstreamScheduler, parse_retry_after
+
+
+def test_parse_retry_after_seconds_and_garbage():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("") is None
+    assert parse_retry_after("soon") is None
+
+
+def test_interactive_lane_is_served_before_batch():
+    sched = UpstreamScheduler("test", rate_per_sec=1000, burst=100, max_concurrency=1)
+    order = []
+
+    async def job(name, lane):
+        async with sched.slot(lane):
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    async def main():
+        blocker = asyncio.create_task(job("first", "default"))
+        await asyncio.sleep(0)
+        waiting = [
+            asyncio.create_task(job("batch-1", "batch")),
+            asyncio.create_task(job("batch-2", "batch")),
+            asyncio.create_task(job("voice", "interactive")),
+        ]
+        await asyncio.sleep(0)
+        assert sched.stats()["queue_depth"] == {
+            "interactive": 1,
+            "default": 0,
+            "batch": 2,
+        }
+        await asyncio.gather(blocker, *waiting)
+
+    asyncio.run(main())
+    assert order == ["first", "voice", "batch-1", "batch-2"]
+
+
+def test_retries_429_then_succeeds_and_backs_off_rate():
+    sched = UpstreamScheduler(
+        "test", rate_per_sec=1000, burst=100, backoff_base=0.001, backoff_max=0.05
+    )
+    responses = [
+        httpx.Response(429, headers={"Retry-After": "0.01"}),
+        httpx.Response(503),
+        httpx.Response(200, text="ok"),
+    ]
+
+    async def send():
+        return responses.pop(0)
+
+    resp = asyncio.run(sched.request(send))
+    assert resp.status_code == 200
+    stats = sched.stats()
+    assert stats["retries"] == 2 and stats["throttled"] == 1
+    assert stats["effective_rate_per_sec"] < 1000
+
+
+def test_gives_up_after_max_retries():
+    sched = UpstreamScheduler(
+        "test", rate_per_sec=1000, burst=100, max_retries=1, backoff_base=0.001
+    )
+
+    async def send():
+        return httpx.Response(500)
+
+    assert asyncio.run(sched.request(send)).status_code == 500
+    assert sched.stats()["failures"] == 1
+
+
+def test_hold_retries_the_open_and_keeps_the_slot_for_the_block():
+    sched = UpstreamScheduler(
+        "test", rate_per_sec=1000, burst=100, backoff_base=0.001, backoff_max=0.05
+    )
+    responses = [httpx.Response(503), httpx.Response(200, text="data: hi")]
+    sent = []
+
+    async def send():
+        sent.append(responses[0])
+        return responses.pop(0)
+
+    async def main():
+        async with sched.hold(send) as resp:
+            assert resp.status_code == 200
+            assert sched.stats()["active"] == 1
+        assert sched.stats()["active"] == 0
+
+    asyncio.run(main())
+    assert sent[0].is_closed and sched.stats()["retries"] == 1
@@ -0,0 +1,260 @@
+import asyncio
+
+import httpx
+
+from app.services import scraper
+
+
+def test_platform_for_host():
+    assert scraper.platform_for("www.upwork.com").name == "upwork"
+    assert scraper.platform_for("WWW.Freelancer.com").name == "freelancer"
+    assert scraper.platform_for("mostaql.com").name == "mostaql"
+    assert scraper.platform_for("jobs.example.org") is scraper.GENERIC_PLATFORM
+
+
+def test_should_block_resources_and_trackers():
+    upwork = scraper.platform_for("www.upwork.com")
+    generic = scraper.GENERIC_PLATFORM
+    assert scraper._should_block(generic, "image", "cdn.example.org")
+    assert scraper._should_block(generic, "script", "www.googletagmanager.com")
+    assert not scraper._should_block(generic, "script", "cdn.example.org")
+    assert not scraper._should_block(generic, "stylesheet", "cdn.example.org")
+    # Per-platform additions
+    assert scraper._should_block(upwork, "stylesheet", "assets.static-upwork.com")
+    # The page itself is never blocked
+    assert not scraper._should_block(generic, "document", "www.google-analytics.com")
+
+
+def test_ready_selectors_are_plain_css():
+    for profile in scraper.PLATFORMS:
+        assert profile.ready_selectors
+        for selector in profile.ready_selectors:
+            assert ":has" not in selector
+
+
+def test_canonicalize_job_url():
+    assert (
+        scraper.canonicalize_job_url(
+            "http://Mostaqel.com/project/123-build-app/?utm_source=x&ref=feed#top"
+        )
+        == "https://mostaql.com/project/123-build-app"
+    )
+    assert scraper.canonicalize_job_url("upwork.com/jobs/~01ab?b=2&a=1&fbclid=z") == (
+        "https://www.upwork.com/jobs/~01ab?a=1&b=2"
+    )
+    # Off the known platforms only utm_* goes: ?source= may select the page
+    assert scraper.canonicalize_job_url(
+        "https://jobs.example.com/view?source=board&utm_medium=mail&id=7"
+    ) == ("https://jobs.example.com/view?id=7&source=board")
+
+
+def test_scrape_cache_skips_browser_on_repeat(monkeypatch):
+    calls = []
+
+    async def fake_scrape(url):
+        calls.append(url)
+        return {
+            "platform": "mostaql",
+            "url": url,
+            "description": "Build a mobile app",
+            "skills": [],
+        }
+
+    monkeypatch.setattr(scraper, "_scrape_job_posting", fake_scrape)
+    monkeypatch.setattr(scraper, "_cache", None)
+    monkeypatch.setattr(scraper, "SCRAPE_CACHE_SQLITE_PATH", "")
+
+    async def main():
+        first = await scraper.scrape_job_posting(
+            "https://mostaqel.com/project/1?utm_medium=mail"
+        )
+        first["title"] = "mutated by caller"
+        second = await scraper.scrape_job_posting("https://www.mostaql.com/project/1/")
+        assert "title" not in second
+        await scraper.scrape_job_posting(
+            "https://mostaql.com/project/1", force_refresh=True
+        )
+
+    asyncio.run(main())
+    # Cached under the canonical URL, fetched from the URL as given
+    assert calls == [
+        "https://mostaqel.com/project/1?utm_medium=mail",
+        "https://mostaql.com/project/1",
+    ]
+    stats = scraper.cache_stats()
+    assert stats["memory_hits"] == 1 and stats["bypasses"] == 1
+
+
+def test_fetchers_receive_the_original_url(monkeypatch):
+    requested = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested.append(str(request.url))
+        return httpx.Response(
+            200,
+            text="<html><body><div id=root></div></body></html>",
+            headers={"Content-Type": "text/html"},
+        )
+
+    async def fake_browser(url, profile):
+        requested.append(url)
+        return {
+            "platform": profile.name,
+            "url": url,
+            "title": "T",
+            "description": "from browser",
+        }
+
+    monkeypatch.setattr(
+        scraper, "_http", httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    monkeypatch.setattr(scraper, "_scrape_browser", fake_browser)
+    monkeypatch.setattr(scraper, "SCRAPE_CACHE_ENABLED", False)
+
+    url = "http://upwork.com/jobs/~01ab/?ref=feed&source=share"
+    result = asyncio.run(scraper.scrape_job_posting(url))
+    assert result["scrape_tier"] == "browser"
+    assert requested == [url, url]
+
+
+MOSTAQL_HTML = """
+<html><head><title>Build an app | Mostaql</title>
+<meta name="description" content="Mobile app project"></head>
+<body><nav>Menu</nav>
+<h1 class="project-header__title">تطوير تطبيق جوال</h1>
+<div class="project-content__text">نحتاج إلى مطور لبناء تطبيق جوال متكامل مع لوحة تحكم ونظام دفع إلكتروني وإشعارات فورية للمستخدمين.</div>
+<a class="project-skills__item">Flutter</a><a class="project-skills__item">Firebase</a>
+<script>window.__state = {"ignored": true}</script>
+</body></html>
+"""
+
+
+def test_parse_static_html_uses_parser_table():
+    parsed = scraper.parse_static_html(
+        MOSTAQL_HTML, scraper.platform_for("mostaql.com")
+    )
+    assert parsed["platform"] == "mostaql"
+    assert parsed["title"] == "تطوير تطبيق جوال"
+    assert parsed["description"].startswith("نحتاج إلى مطور")
+    assert parsed["skills"] == ["Flutter", "Firebase"]
+    assert parsed["meta_description"] == "Mobile app project"
+
+
+def test_static_tier_serves_server_rendered_pages(monkeypatch):
+    browser_calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/project/1":
+            return httpx.Response(
+                200,
+                text=MOSTAQL_HTML,
+                headers={"Content-Type": "text/html; charset=utf-8"},
+            )
+        # JS shell: no description in the markup
+        return httpx.Response(
+            200,
+            text="<html><title>App</title><body><div id=root></div></body></html>",
+            headers={"Content-Type": "text/html"},
+        )
+
+    async def fake_browser(url, profile):
+        browser_calls.append(url)
+        return {
+            "platform": profile.name,
+            "url": url,
+            "title": "T",
+            "description": "from browser",
+        }
+
+    monkeypatch.setattr(
+        scraper, "_http", httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    monkeypatch.setattr(scraper, "_scrape_browser", fake_browser)
+
+    async def main():
+        static = await scraper._scrape_job_posting("https://mostaql.com/project/1")
+        fallback = await scraper._scrape_job_posting("https://spa.example.org/job/2")
+        return static, fallback
+
+    static, fallback = asyncio.run(main())
+    assert static["scrape_tier"] == "static"
+    assert fallback["scrape_tier"] == "browser"
+    assert browser_calls == ["https://spa.example.org/job/2"]
+
+
+class FakeEvalPage:
+    def __init__(self, data):
+        self.data = data
+        self.calls = []
+
+    async def evaluate(self, script, arg):
+        self.calls.append(arg)
+        return self.data
+
+
+def test_browser_parsers_extract_in_one_round_trip():
+    page = FakeEvalPage(
+        {
+            "fields": {
+                "title": "Build a dashboard",
+                "description": "",
+                "budget": "$500",
+                "skills": ["React"],
+            },
+            "meta": {
+                "meta_description": "Dashboard job",
+                "page_title": "Build a dashboard | Upwork",
+            },
+            "body": "Full page text",
+        }
+    )
+    parsed = asyncio.run(scraper.parse_upwork(page))
+    assert len(page.calls) == 1
+    assert page.calls[0]["table"].keys() == scraper.UPWORK_FIELDS.keys()
+    assert page.calls[0]["maxBytes"] == scraper.SCRAPER_MAX_TEXT_BYTES
+    assert parsed["platform"] == "upwork"
+    assert parsed["budget"] == "$500" and parsed["skills"] == ["React"]
+    # Empty description falls back to body text; meta fills extra keys
+    assert parsed["description"] == "Full page text"
+    assert parsed["meta_description"] == "Dashboard job"
+
+    generic = FakeEvalPage(
+        {"fields": {}, "meta": {"page_title": "Job"}, "body": "Body"}
+    )
+    parsed = asyncio.run(scraper.parse_generic(generic))
+    assert (parsed["title"], parsed["description"]) == ("Job", "Body")
+
+
+def test_static_main_text_skips_page_chrome():
+    related = "".join(
+        f'<li class="related-job"><a href="/j/{i}">Senior Python Developer {i}</a> 3 days ago</li>'
+        for i in range(50)
+    )
+    comments = "".join(
+        '<div class="comment"><p>Is this still open? I applied, but I have not heard back yet.</p></div>'
+        for _ in range(20)
+    )
+    html = f"""
+    <html><head><title>Data Engineer</title></head><body>
+    <nav><a href="/">Home</a> <a href="/jobs">Browse all jobs and categories</a></nav>
+    <div class="job-post"><h1>Data Engineer</h1>
+      <div class="job-content">
+        <p>We are moving our nightly ETL from cron jobs to Airflow, and we need help with the DAGs.</p>
+        <p>You will write dbt models, add data tests, and document the setup for our analysts.</p>
+      </div>
+    </div>
+    <aside><ul>{related}</ul></aside>
+    <section class="comments">{comments}</section>
+    <footer>Copyright, terms, privacy, and other links that are not the job</footer>
+    </body></html>
+    """
+    parsed = scraper.parse_static_html(html, scraper.GENERIC_PLATFORM)
+    assert parsed["description"].startswith("We are moving our nightly ETL")
+    assert parsed["description"].endswith("for our analysts.")
+
+
+def test_cap_text_keeps_whole_characters():
+    assert scraper._cap_text("  a\n b  ", 0) == "a b"
+    capped = scraper._cap_text("مرحبا " * 100, 25)
+    # 24 bytes fit; the 25th would split a two-byte letter
+    assert capped == "مرحبا مرحبا م"
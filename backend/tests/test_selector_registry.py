@@ -0,0 +1,104 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.selector_registry import SelectorRegistry
+
+SELECTORS = ["div.old-description", "div.legacy", "div.new-description"]
+
+
+def test_registry_promotes_working_selector():
+    reg = SelectorRegistry()
+    reg.register("upwork", {"description": SELECTORS, "skills": "a.skill"})
+    assert reg.ordered("upwork", "description", SELECTORS) == SELECTORS
+
+    for _ in range(8):
+        probed = reg.ordered("upwork", "description", SELECTORS)
+        winner = "div.new-description"
+        reg.record("upwork", "description", probed[: probed.index(winner) + 1], winner)
+
+    # The two selectors that stopped matching are dead after five misses
+    assert reg.ordered("upwork", "description", SELECTORS) == [
+        "div.new-description",
+        "div.old-description",
+        "div.legacy",
+    ]
+    stats = reg.stats()["platforms"]["upwork"]["description"]
+    assert stats["lookups"] == 8
+    # Five lookups probed all three, later ones one each
+    assert stats["avg_probes"] == 2.25
+    assert "skills" not in reg.stats()["platforms"]["upwork"]
+
+
+def test_registry_persists_across_restarts(tmp_path):
+    path = str(tmp_path / "selectors.sqlite3")
+    reg = SelectorRegistry(path)
+    for _ in range(5):
+        reg.record("mostaql", "title", ["h1.project-header__title", "h1"], "h1")
+    reg.close()
+
+    reloaded = SelectorRegistry(path)
+    assert reloaded.ordered("mostaql", "title", ["h1.project-header__title", "h1"]) == [
+        "h1",
+        "h1.project-header__title",
+    ]
+    reloaded.reset("mostaql")
+    assert (
+        reloaded.ordered("mostaql", "title", ["h1.project-header__title", "h1"])[0]
+        == "h1.project-header__title"
+    )
+    reloaded.close()
+
+
+FIXED_PAGE = """
+<h1 data-test="job-title">Build a sales dashboard</h1>
+<div data-test="job-description">React dashboard with charts.</div>
+<span data-test="job-type">Fixed-price</span><span>$1,500</span>
+"""
+HOURLY_PAGE = """
+<h1 class="up-card-header">Maintain a Django API</h1>
+<div data-test="job-description">Ongoing backend work.</div>
+<span data-test="job-type">Hourly</span>
+"""
+
+
+def test_alternating_page_shapes_keep_declared_order(monkeypatch):
+    from app.services import scraper
+
+    reg = SelectorRegistry()
+    reg.register("upwork", scraper.UPWORK_FIELDS)
+    monkeypatch.setattr(scraper, "_selectors", reg)
+    profile = scraper.platform_for("www.upwork.com")
+
+    for page in [FIXED_PAGE, HOURLY_PAGE, FIXED_PAGE, FIXED_PAGE] * 3:
+        parsed = scraper.parse_static_html(page, profile)
+        if page is FIXED_PAGE:
+            assert (
+                parsed["budget"] == "$1,500"
+                and parsed["title"] == "Build a sales dashboard"
+            )
+        else:
+            assert (
+                parsed["budget"] == "Hourly"
+                and parsed["title"] == "Maintain a Django API"
+            )
+
+    # A fallback that matched more recently never overtakes a selector that still hits
+    for field in ("title", "budget", "hourly"):
+        declared = scraper.UPWORK_FIELDS[field]
+        assert reg.ordered("upwork", field, declared) == declared
+
+
+def test_admin_selector_endpoint(monkeypatch):
+    from app.routers import admin
+
+    client = TestClient(app)
+    # No token configured: admin endpoints are disabled, not open
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "")
+    assert client.get("/api/v1/admin/selectors").status_code == 404
+    assert client.delete("/api/v1/admin/selectors").status_code == 404
+
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "secret")
+    assert client.get("/api/v1/admin/selectors").status_code == 401
+    res = client.get("/api/v1/admin/selectors", headers={"X-Admin-Token": "secret"})
+    assert res.status_code == 200
+    assert {"upwork", "freelancer", "mostaql"} <= set(res.json()["platforms"])
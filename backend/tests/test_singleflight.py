@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from app.services.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_execution():
+    sf = SingleFlight("test")
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "done"
+
+    async def main():
+        return await asyncio.gather(*(sf.do("k", work) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["done"] * 5
+    assert calls == 1
+    stats = sf.stats()
+    assert stats["executions"] == 1 and stats["coalesced"] == 4
+    assert stats["in_flight"] == 0 and stats["max_waiters"] == 5
+
+
+def test_cancelled_waiter_does_not_cancel_shared_work():
+    sf = SingleFlight("test")
+
+    async def work():
+        await asyncio.sleep(0.02)
+        return 42
+
+    async def main():
+        first = asyncio.create_task(sf.do("k", work))
+        second = asyncio.create_task(sf.do("k", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == 42
+    assert sf.stats()["cancelled"] == 0
+
+
+def test_work_is_cancelled_when_all_waiters_leave():
+    sf = SingleFlight("test")
+    started = []
+
+    async def work():
+        started.append(1)
+        await asyncio.sleep(10)
+
+    async def main():
+        task = asyncio.create_task(sf.do("k", work))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return sf.stats()
+
+    stats = asyncio.run(main())
+    assert stats["cancelled"] == 1 and stats["in_flight"] == 0
+
+
+def test_errors_propagate_to_every_waiter_and_are_not_kept():
+    sf = SingleFlight("test")
+
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def main():
+        return await asyncio.gather(
+            *(sf.do("k", boom) for _ in range(3)), return_exceptions=True
+        )
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert sf.stats()["executions"] == 1
+    assert isinstance(asyncio.run(main())[0], RuntimeError)
+    assert sf.stats()["executions"] == 2
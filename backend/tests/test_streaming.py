@@ -0,0 +1,123 @@
+import json
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import perplexity
+
+
+def test_contract_stream_relays_chunks(monkeypatch):
+    upstream_paths = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        upstream_paths.append(request.url.path)
+        if "streamGenerateContent" in request.url.path:
+            body = "".join(
+                "data: "
+                + json.dumps({"candidates": [{"content": {"parts": [{"text": t}]}}]})
+                + "\r\n\r\n"
+                for t in ["# Agreement\n", "## Scope\nBuild the app."]
+            )
+            return httpx.Response(
+                200, text=body, headers={"Content-Type": "text/event-stream"}
+            )
+        risk = {
+            "risk_score": 20,
+            "risk_level": "low",
+            "risk_flags": [],
+            "recommendations": [],
+        }
+        return httpx.Response(
+            200,
+            json={"candidates": [{"content": {"parts": [{"text": json.dumps(risk)}]}}]},
+        )
+
+    monkeypatch.setattr(perplexity, "GEMINI_API_KEY", "test")
+    monkeypatch.setattr(perplexity, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(
+        perplexity, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+
+    client = TestClient(app)
+    res = client.post(
+        "/api/v1/contract/generate-stream",
+        json={"project_description": "Build an authenticated web app with reporting."},
+    )
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/event-stream")
+    events = [block for block in res.text.split("\n\n") if block]
+    assert events[0].startswith("event: delta")
+    assert events[-1].startswith("event: done")
+    done = json.loads(events[-1].split("data: ", 1)[1])
+    assert done["contract_text"] == "# Agreement\n## Scope\nBuild the app."
+    # Risk is scored locally: the stream is the only upstream call
+    assert done["risk_level"] == "high"
+    assert len(upstream_paths) == 1
+
+
+def test_contract_stream_reports_rate_limits_and_error_text(monkeypatch):
+    replies = [
+        httpx.Response(429, text="slow down"),
+        httpx.Response(
+            200,
+            text="data: "
+            + json.dumps(
+                {"candidates": [{"content": {"parts": [{"text": "AI service error"}]}}]}
+            )
+            + "\r\n\r\n",
+            headers={"Content-Type": "text/event-stream"},
+        ),
+    ]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return replies.pop(0)
+
+    monkeypatch.setattr(perplexity, "GEMINI_API_KEY", "test")
+    monkeypatch.setattr(perplexity, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(perplexity._scheduler, "max_retries", 0)
+    monkeypatch.setattr(
+        perplexity, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+
+    client = TestClient(app)
+    body = {"project_description": "Build an authenticated web app with reporting."}
+    limited = client.post("/api/v1/contract/generate-stream", json=body)
+    assert limited.text.startswith("event: rate_limited")
+    failed = client.post("/api/v1/contract/generate-stream", json=body)
+    events = [block for block in failed.text.split("\n\n") if block]
+    assert events[-1].startswith("event: error")
+    assert "Unable to generate contract" in events[-1]
+
+
+def test_proposal_batch_streams_ndjson_per_item(monkeypatch):
+    from app.routers import proposal
+
+    async def fake_completion(prompt, bypass_cache=False, lane="batch"):
+        if "broken" in prompt:
+            return "AI service error"
+        return json.dumps(
+            {
+                "proposal_text": "Hello, I can build this for you.",
+                "pricing_strategy": "Fixed fee",
+                "estimated_timeline": "2 weeks",
+                "success_tips": ["a", "b", "c"],
+            }
+        )
+
+    monkeypatch.setattr(proposal, "get_proposal_completion_json", fake_completion)
+    client = TestClient(app)
+    res = client.post(
+        "/api/v1/proposal/generate-batch",
+        json={
+            "items": [
+                {"job_description": "Build a React dashboard with charts."},
+                {"job_description": "broken job description text"},
+            ]
+        },
+    )
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("application/x-ndjson")
+    items = {d["index"]: d for d in map(json.loads, res.text.splitlines())}
+    assert items[0]["ok"] and items[0]["result"]["estimated_timeline"] == "2 weeks"
+    assert not items[1]["ok"] and items[1]["status_code"] == 502
@@ -0,0 +1,346 @@
+import asyncio
+import os
+import time
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app.services import elevenlabs
+
+
+def _fake_upstream(monkeypatch, tmp_path, handler):
+    monkeypatch.setattr(elevenlabs, "ELEVENLABS_API_KEY", "test")
+    monkeypatch.setattr(elevenlabs, "AUDIO_DIR", str(tmp_path))
+    monkeypatch.setattr(
+        elevenlabs, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    monkeypatch.setattr(elevenlabs, "_max_in_flight", 0)
+    monkeypatch.setattr(elevenlabs, "_cache", None)
+
+
+def test_concurrent_synthesis_overlaps_and_persists(monkeypatch, tmp_path):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.2)
+        return httpx.Response(
+            200, content=b"ID3audio", headers={"Content-Type": "audio/mpeg"}
+        )
+
+    _fake_upstream(monkeypatch, tmp_path, handler)
+
+    async def main():
+        started = time.perf_counter()
+        urls = await asyncio.gather(
+            *(elevenlabs.text_to_speech(f"Reply number {i}") for i in range(5))
+        )
+        return urls, time.perf_counter() - started
+
+    urls, elapsed = asyncio.run(main())
+    # Five 200 ms upstream calls overlap instead of taking a second in a row
+    assert elapsed < 0.6
+    assert elevenlabs.stats()["max_in_flight"] == 5
+    assert len(set(urls)) == 5
+    for url in urls:
+        path = tmp_path / os.path.basename(url)
+        assert url.startswith("/audio/tts_") and path.read_bytes() == b"ID3audio"
+    assert not list(tmp_path.glob("*.part"))
+
+
+def test_repeat_text_reuses_cached_audio(monkeypatch, tmp_path):
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(
+            200, content=b"ID3audio", headers={"Content-Type": "audio/mpeg"}
+        )
+
+    _fake_upstream(monkeypatch, tmp_path, handler)
+    monkeypatch.setattr(elevenlabs, "_characters_saved", 0)
+
+    async def main():
+        first = await elevenlabs.text_to_speech("Thanks, I will  send the plan today.")
+        # Same words, different whitespace: same key, no second synthesis
+        again = await elevenlabs.text_to_speech(
+            " Thanks, I will send\nthe plan today. "
+        )
+        assert again == first and len(calls) == 1
+
+        # A fresh index (restart) still finds the file on disk
+        elevenlabs._cache = None
+        assert (
+            await elevenlabs.text_to_speech("Thanks, I will send the plan today.")
+            == first
+        )
+        assert len(calls) == 1
+
+        assert (
+            await elevenlabs.text_to_speech(
+                "Thanks, I will send the plan today.", bypass_cache=True
+            )
+            == first
+        )
+        assert len(calls) == 2
+
+        # A deleted file is a miss, not a broken URL
+        (tmp_path / os.path.basename(first)).unlink()
+        assert (
+            await elevenlabs.text_to_speech("Thanks, I will send the plan today.")
+            == first
+        )
+        assert len(calls) == 3
+        return first
+
+    first = asyncio.run(main())
+    assert (
+        first
+        == f"/audio/tts_{elevenlabs.audio_key('Thanks, I will send the plan today.')}.mp3"
+    )
+    assert elevenlabs.stats()["cache"]["characters_saved"] == 2 * len(
+        "Thanks, I will send the plan today."
+    )
+
+
+def test_voice_generate_maps_upstream_errors_to_502(monkeypatch, tmp_path):
+    from app.main import app
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if b"fail" in request.content:
+            return httpx.Response(401, json={"detail": "invalid key"})
+        return httpx.Response(
+            200, content=b"ID3audio", headers={"Content-Type": "audio/mpeg"}
+        )
+
+    _fake_upstream(monkeypatch, tmp_path, handler)
+    client = TestClient(app)
+    res = client.post(
+        "/api/v1/voice/generate",
+        json={"text_to_speak": "Hello there, thanks for reaching out."},
+    )
+    assert res.status_code == 200 and res.json()["audio_url"].startswith("/audio/tts_")
+    res = client.post(
+        "/api/v1/voice/generate", json={"text_to_speak": "Please fail this one."}
+    )
+    assert res.status_code == 502
+
+
+def _streaming_upstream(calls, chunks=(b"ID3", b"chunk-1", b"chunk-2")):
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if b"fail" in request.content:
+            return httpx.Response(401, json={"detail": "invalid key"})
+        assert request.url.path.endswith("/stream")
+
+        async def body():
+            for chunk in chunks:
+                yield chunk
+
+        return httpx.Response(
+            200, content=body(), headers={"Content-Type": "audio/mpeg"}
+        )
+
+    return handler
+
+
+def test_generate_stream_relays_audio_and_fills_cache(monkeypatch, tmp_path):
+    from app.main import app
+
+    calls = []
+    _fake_upstream(monkeypatch, tmp_path, _streaming_upstream(calls))
+    client = TestClient(app)
+    body = {"text_to_speak": "Streaming replies start playing right away."}
+    res = client.post("/api/v1/voice/generate-stream", json=body)
+    assert res.status_code == 200 and res.headers["content-type"] == "audio/mpeg"
+    assert res.content == b"ID3chunk-1chunk-2"
+    assert res.headers["x-audio-cache"] == "miss"
+    cached = tmp_path / os.path.basename(res.headers["x-audio-url"])
+    assert cached.read_bytes() == res.content
+
+    # The tee'd file serves both modes without another synthesis
+    again = client.post("/api/v1/voice/generate-stream", json=body)
+    assert again.headers["x-audio-cache"] == "hit" and again.content == res.content
+    plain = client.post("/api/v1/voice/generate", json=body)
+    assert plain.json()["audio_url"] == res.headers["x-audio-url"]
+    assert len(calls) == 1
+
+    assert (
+        client.post(
+            "/api/v1/voice/generate-stream", json={"text_to_speak": "Please fail."}
+        ).status_code
+        == 502
+    )
+
+
+def test_mood_reply_in_stream_mode_synthesizes_on_first_playback(monkeypatch, tmp_path):
+    from app.main import app
+    from app.routers import voice_mood
+
+    async def fake_completion(prompt, **kwargs):
+        return "Thanks for the update, I will share a plan today."
+
+    calls = []
+    _fake_upstream(monkeypatch, tmp_path, _streaming_upstream(calls))
+    monkeypatch.setattr(voice_mood, "get_text_completion", fake_completion)
+    client = TestClient(app)
+    res = client.post(
+        "/api/v1/voice/generate-response",
+        json={
+            "message_text": "Can you send the plan?",
+            "audio_stream": True,
+        },
+    )
+    audio_url = res.json()["audio_url"]
+    assert audio_url.startswith("/api/v1/voice/stream/") and calls == []
+
+    first = client.get(audio_url)
+    assert (
+        first.content == b"ID3chunk-1chunk-2"
+        and first.headers["x-audio-cache"] == "miss"
+    )
+    assert client.get(audio_url).headers["x-audio-cache"] == "hit"
+    assert len(calls) == 1
+    assert client.get("/api/v1/voice/stream/" + "0" * 64).status_code == 404
+    assert client.get("/api/v1/voice/stream/..%2F..%2Fetc").status_code == 404
+
+
+def test_abandoned_stream_leaves_no_partial_file(monkeypatch, tmp_path):
+    calls = []
+    _fake_upstream(monkeypatch, tmp_path, _streaming_upstream(calls))
+
+    async def main():
+        speech = await elevenlabs.open_speech_stream(
+            "A reply the listener skips halfway."
+        )
+        first = await speech.chunks.__anext__()
+        await speech.chunks.aclose()
+        return first
+
+    assert asyncio.run(main()) == b"ID3"
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_stream_keeps_audio_pinned_across_the_rename(monkeypatch, tmp_path):
+    from app.services import audio_storage
+
+    calls = []
+    _fake_upstream(monkeypatch, tmp_path, _streaming_upstream(calls))
+    seen = []
+    finish = elevenlabs._finish_part
+
+    def spy(f, tmp_path_, path):
+        seen.append((dict(audio_storage._pins), tmp_path_, path))
+        finish(f, tmp_path_, path)
+
+    monkeypatch.setattr(elevenlabs, "_finish_part", spy)
+
+    async def main():
+        speech = await elevenlabs.open_speech_stream("Pinned until published.")
+        return b"".join([chunk async for chunk in speech.chunks])
+
+    assert asyncio.run(main()) == b"ID3chunk-1chunk-2"
+    ((pins, part, final),) = seen
+    assert os.path.realpath(part) in pins and os.path.realpath(final) in pins
+    assert audio_storage._pins == {}
+
+
+def _paragraphs(n):
+    return [
+        f"Paragraph {i} explains one part of the delivery plan in enough words to matter."
+        for i in range(n)
+    ]
+
+
+def test_split_for_speech_keeps_edits_local():
+    assert elevenlabs.split_for_speech("  Short  reply. ") == ["Short reply."]
+    text = "\n\n".join(_paragraphs(12))
+    chunks = elevenlabs.split_for_speech(text, max_chars=200)
+    assert len(chunks) > 1 and all(len(c) <= 200 for c in chunks)
+    assert " ".join(chunks) == " ".join(text.split())
+
+    edited = elevenlabs.split_for_speech(
+        text.replace("Paragraph 5 ", "Paragraph five "), max_chars=200
+    )
+    assert len(set(edited) - set(chunks)) == 1
+
+    # One long paragraph falls back to sentences, then words
+    long = "First sentence here. " * 20 + "x" * 250
+    assert all(len(c) <= 200 for c in elevenlabs.split_for_speech(long, max_chars=200))
+
+
+def test_long_form_synthesizes_chunks_in_parallel_and_reuses_them(
+    monkeypatch, tmp_path
+):
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        await asyncio.sleep(0.2)
+        tag = b"ID3\x04\x00\x00\x00\x00\x00\x02ab"
+        return httpx.Response(
+            200,
+            content=tag + b"frames%d" % len(calls),
+            headers={"Content-Type": "audio/mpeg"},
+        )
+
+    _fake_upstream(monkeypatch, tmp_path, handler)
+    monkeypatch.setattr(elevenlabs, "TTS_CHUNK_CHARS", 200)
+    text = "\n\n".join(_paragraphs(12))
+
+    async def main():
+        started = time.perf_counter()
+        speech = await elevenlabs.synthesize_long_form(text)
+        return speech, time.perf_counter() - started
+
+    speech, elapsed = asyncio.run(main())
+    chunks = len(speech.parts)
+    assert chunks == len(calls) > elevenlabs.TTS_CHUNK_CONCURRENCY
+    # Bounded concurrency: ceil(chunks / 4) rounds of 200 ms, not one per chunk
+    assert elapsed < 0.2 * (chunks // elevenlabs.TTS_CHUNK_CONCURRENCY + 1) + 0.3
+    assert elevenlabs.stats()["max_in_flight"] == elevenlabs.TTS_CHUNK_CONCURRENCY
+    stitched = (tmp_path / os.path.basename(speech.url)).read_bytes()
+    # Only the first chunk keeps its ID3 tag
+    assert (
+        stitched.startswith(b"ID3")
+        and stitched.count(b"ID3") == 1
+        and stitched.count(b"frames") == chunks
+    )
+    assert not list(tmp_path.glob("*.part"))
+
+    edited = asyncio.run(
+        elevenlabs.synthesize_long_form(text.replace("Paragraph 5 ", "Paragraph five "))
+    )
+    assert len(calls) == chunks + 1 and edited.cached_chunks == chunks - 1
+    assert edited.url != speech.url
+    again = asyncio.run(elevenlabs.synthesize_long_form(text))
+    assert (
+        again.url == speech.url
+        and again.cached_chunks == chunks
+        and len(calls) == chunks + 1
+    )
+
+    # /generate takes the same path for text over one chunk
+    assert asyncio.run(elevenlabs.text_to_speech(text)) == speech.url
+
+
+def test_voice_generate_long_route(monkeypatch, tmp_path):
+    from app.main import app
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if b"fail" in request.content:
+            return httpx.Response(401, json={"detail": "invalid key"})
+        return httpx.Response(
+            200, content=b"ID3audio", headers={"Content-Type": "audio/mpeg"}
+        )
+
+    _fake_upstream(monkeypatch, tmp_path, handler)
+    monkeypatch.setattr(elevenlabs, "TTS_CHUNK_CHARS", 200)
+    client = TestClient(app)
+    text = "\n\n".join(_paragraphs(6))
+    res = client.post("/api/v1/voice/generate-long", json={"text_to_speak": text})
+    body = res.json()
+    assert res.status_code == 200 and body["chunks"] == len(body["parts"]) > 1
+    assert body["audio_url"] not in body["parts"] and body["cached_chunks"] == 0
+    res = client.post(
+        "/api/v1/voice/generate-long",
+        json={"text_to_speak": text + "\n\nPlease fail this one."},
+    )
+    assert res.status_code == 502